@@ -0,0 +1,246 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+
+Headless benchmarks for the annotator's hot paths.
+
+    python benchmarks/bench_hotpaths.py                      # quick sizes
+    python benchmarks/bench_hotpaths.py --full               # up to 500k files
+    python benchmarks/bench_hotpaths.py --save-baseline      # store results
+    python benchmarks/bench_hotpaths.py --compare            # fail on regressions
+
+Results are written as JSON (``--output``). With ``--compare`` every case is
+checked against the stored baseline and the script exits with status 1 when a
+case is slower than the baseline by more than ``--threshold`` percent.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src" / "utlis"))
+
+from PyQt5.QtWidgets import QApplication, QMessageBox, QFileDialog, QInputDialog  # noqa: E402
+from PyQt5.QtGui import QImage, QPixmap  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def timed(func, repeat):
+    func()  # warm-up, so one-off costs such as lazy imports are not timed
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {"seconds": statistics.median(samples), "min": min(samples), "runs": repeat}
+
+
+def synthetic_boxes(count, rng):
+    boxes = []
+    for _ in range(count):
+        w, h = rng.uniform(0.005, 0.1), rng.uniform(0.005, 0.1)
+        boxes.append({
+            'class': rng.randrange(8),
+            'bbox': [rng.uniform(w / 2, 1 - w / 2), rng.uniform(h / 2, 1 - h / 2), w, h]
+        })
+    return boxes
+
+
+def write_image(path, width=64, height=48):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(0xFF808080)
+    image.save(str(path))
+
+
+def bench_paint(box_counts, repeat, rng):
+    from image_canvas import ImageLabel
+
+    label = ImageLabel()
+    label.resize(1600, 1000)
+    pixmap = QPixmap(2000, 2000)
+    pixmap.fill()
+    label.original_pixmap = pixmap
+    label.zoom_factor = 0.5
+    label.scale_and_display()
+    target = QPixmap(label.size())
+
+    results = {}
+    for count in box_counts:
+        label.set_annotations(synthetic_boxes(count, rng))
+        results[f"paint_{count}_boxes"] = timed(lambda: label.render(target), repeat)
+    return results
+
+
+def bench_load_images(annotator, work_dir, file_counts, repeat):
+    results = {}
+    for count in file_counts:
+        folder = work_dir / f"images_{count}"
+        folder.mkdir()
+        write_image(folder / "00000000.png")
+        for i in range(1, count):
+            # Only the first image is decoded by load_images; the rest only
+            # need to exist for the directory scan.
+            (folder / f"{i:08d}.jpg").touch()
+        annotator.image_folder = str(folder)
+        results[f"load_images_{count}_files"] = timed(annotator.load_images, repeat)
+        shutil.rmtree(folder)
+    return results
+
+
+def bench_save_load(annotator, work_dir, image_count, boxes_per_image, repeat, rng):
+    folder = work_dir / "project_images"
+    folder.mkdir()
+    write_image(folder / "img_0000000.png")
+    annotator.image_folder = str(folder)
+    annotator.annotations = {
+        f"img_{i:07d}.png": synthetic_boxes(boxes_per_image, rng) for i in range(image_count)
+    }
+    project_path = work_dir / "project.json"
+    label = f"{image_count}x{boxes_per_image}"
+
+    results = {"save_project_" + label: timed(lambda: annotator._save_to_file(str(project_path)), repeat)}
+    with mock.patch.object(QFileDialog, "getOpenFileName", return_value=(str(project_path), "")):
+        results["load_project_" + label] = timed(annotator.load_project, repeat)
+    results["project_file_mb_" + label] = {"value": project_path.stat().st_size / 1e6}
+    shutil.rmtree(folder)
+    return results
+
+
+def bench_export(annotator, work_dir, image_count, repeat, rng):
+    folder = work_dir / "export_images"
+    folder.mkdir()
+    for i in range(image_count):
+        write_image(folder / f"img_{i:06d}.png")
+    annotator.image_folder = str(folder)
+    annotator.annotations = {f"img_{i:06d}.png": synthetic_boxes(20, rng) for i in range(image_count)}
+    export_root = work_dir / "export"
+
+    def run():
+        shutil.rmtree(export_root, ignore_errors=True)
+        export_root.mkdir()
+        annotator.export_dataset()
+        while annotator.validation_pending is not None:  # the export continues once validation is done
+            QApplication.processEvents()
+
+    with mock.patch.object(QInputDialog, "getDouble", return_value=(80.0, True)), \
+            mock.patch.object(QFileDialog, "getExistingDirectory", return_value=str(export_root)):
+        result = timed(run, repeat)
+    result["images_per_second"] = image_count / result["seconds"]
+    shutil.rmtree(folder)
+    return {f"export_dataset_{image_count}_images": result}
+
+
+def run_benchmarks(args):
+    rng = random.Random(args.seed)
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="labelsense_bench_") as tmp, \
+            mock.patch.dict(os.environ, {"HOME": tmp, "USERPROFILE": tmp,
+                                         "XDG_CACHE_HOME": os.path.join(tmp, ".cache"),
+                                         "XDG_DATA_HOME": os.path.join(tmp, ".local", "share")}), \
+            mock.patch.object(QMessageBox, "information"), \
+            mock.patch.object(QMessageBox, "warning"), \
+            mock.patch.object(QMessageBox, "critical", side_effect=lambda *a: print("error:", a[-1], file=sys.stderr)):
+        # Cache and telemetry folders are resolved from the home folder when
+        # the modules are imported, so importing here keeps the user's own
+        # caches and usage data out of the run.
+        from LabelSense import YOLOAnnotator
+
+        work_dir = Path(tmp)
+        annotator = YOLOAnnotator()
+
+        results.update(bench_paint([10, 1000, 10000], args.repeat, rng))
+        file_counts = [10000, 100000, 500000] if args.full else [10000]
+        results.update(bench_load_images(annotator, work_dir, file_counts, args.repeat))
+        image_count = 50000 if args.full else 5000
+        results.update(bench_save_load(annotator, work_dir, image_count, 20, args.repeat, rng))
+        results.update(bench_export(annotator, work_dir, 2000 if args.full else 200, args.repeat, rng))
+        annotator.close()
+    app.processEvents()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "full": args.full,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print a comparison table and return the names of regressed cases."""
+    regressions = []
+    print(f"{'case':<36} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        if "seconds" not in result:
+            continue
+        base = baseline["results"].get(name)
+        if not base or "seconds" not in base:
+            print(f"{name:<36} {'-':>10} {result['seconds']:>10.4f} {'new':>8}")
+            continue
+        change = (result["seconds"] - base["seconds"]) / base["seconds"] * 100
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<36} {base['seconds']:>10.4f} {result['seconds']:>10.4f} {change:>+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LabelSense hot paths headlessly.")
+    parser.add_argument("--full", action="store_true", help="use the large sizes (100k/500k files, 1M boxes)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the median is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="compare against the baseline")
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    current = run_benchmarks(args)
+    text = json.dumps(current, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        args.baseline.write_text(text)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            return 2
+        regressions = compare(current, json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold}%", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
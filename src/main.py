@@ -1,46 +1,25 @@
 import sys
+from utlis.startup_profile import startup_profile
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QPushButton, QMessageBox
 from PyQt5.QtCore import QProcess, Qt, QSize
 from PyQt5.QtGui import QIcon, QFont, QScreen
-from utlis.LabelSense import YOLOAnnotator
+# The annotator and its dependencies are imported on first use in open_annotator
 # from utlis.yoloTraining import YOLOTrainingUI
 from pathlib import Path
 
+startup_profile.mark("Qt imported")
 
-def find_project_root(start_path: Path) -> Path:
-    current_path = start_path.resolve()
-    markers = [
-        "requirements.txt",
-        ".env",
-        ".venv",
-        "venv"
-    ]
-    
-    for parent in [current_path] + list(current_path.parents):
-        for marker in markers:
-            marker_path = parent / marker
-            if marker_path.exists():
-                if marker_path.is_dir() and marker in [".env", ".venv", "venv"]:
-                    return parent
-                else:
-                    return parent
-                
-    print("Warning: No common project root marker found. Defaulting to script's directory.")
-    return start_path.resolve()
-
-
-script_directory = Path(__file__).resolve().parent
-BASE_DIR = find_project_root(script_directory)
-print(f"Determined project root (BASE_DIR): {BASE_DIR}")
-
+# Resources live next to this script, so there is no need to search parent
+# directories for a project root at import time.
+UTILS_DIR = Path(__file__).resolve().parent / "utlis"
 
-labelImgPath = BASE_DIR / "src" / "utlis" / "labelimg" / "labelImg.exe"
+labelImgPath = UTILS_DIR / "labelimg" / "labelImg.exe"
 
 # Icon paths
-icon_path = BASE_DIR / "src" / "utlis" / "icons" / "app_icon.png"
-annotator_icon = BASE_DIR / "src" / "utlis" / "icons" / "labelSense.png"
-labelimg_icon = BASE_DIR / "src" / "utlis" / "icons" / "labelimg.png"
-training_icon = BASE_DIR / "src" / "utlis" / "icons" / "training.png"
+icon_path = UTILS_DIR / "icons" / "app_icon.png"
+annotator_icon = UTILS_DIR / "icons" / "labelSense.png"
+labelimg_icon = UTILS_DIR / "icons" / "labelimg.png"
+training_icon = UTILS_DIR / "icons" / "training.png"
 
 
 class MainLauncher(QMainWindow):
@@ -146,7 +125,13 @@ class MainLauncher(QMainWindow):
     def open_annotator(self):
         try:
             if self.annotator_window is None:
+                startup_profile.reset()
+                from utlis.LabelSense import YOLOAnnotator
+                startup_profile.mark("annotator imported")
                 self.annotator_window = YOLOAnnotator()
+                startup_profile.mark("annotator constructed")
+                startup_profile.mark_first_paint(
+                    "annotator first paint", lambda: startup_profile.report("Annotator"))
             self.annotator_window.show()
             self.annotator_window.raise_()
             self.annotator_window.activateWindow()
@@ -164,8 +149,11 @@ class MainLauncher(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
+    startup_profile.mark("QApplication created")
     window = MainLauncher()
+    startup_profile.mark("launcher constructed")
     window.show()
+    startup_profile.mark_first_paint("launcher first paint", lambda: startup_profile.report("Launcher"))
     sys.exit(app.exec_())
 
 
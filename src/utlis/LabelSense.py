@@ -8,56 +8,60 @@ YouTube Channel GISsense
 
 import sys
 import os
-import random
+import time
+from bisect import bisect_left
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
-                             QWidget, QPushButton, QLabel, QListWidget, QTextEdit,
+                             QWidget, QPushButton, QLabel, QListWidget, QListView, QTextEdit,
                              QFileDialog, QMessageBox, QInputDialog, QSpinBox,
-                             QSplitter, QGroupBox, QDialog, QStyle, QAction, QMenuBar)
-from PyQt5.QtCore import Qt, QRect
-from PyQt5.QtGui import QPixmap, QPainter, QPen, QColor, QPalette, QScreen, QIcon
+                             QSplitter, QGroupBox, QDialog, QStyle, QAction, QMenuBar, QLineEdit,
+                             QStackedWidget, QCheckBox, QProgressDialog)
+from PyQt5.QtCore import Qt, QRect, QTimer, QThread, QItemSelectionModel, QFileSystemWatcher
+from PyQt5.QtGui import QPixmap, QPainter, QPen, QColor, QPalette, QScreen, QIcon, QFontDatabase
 from image_canvas import ImageCanvas
-import json
-import yaml
+from annotation_model import AnnotationListModel
+from undo_stack import UndoStack
+from profiler import profiler
+from class_ops import ClassChange
+from annotation_index import AnnotationIndex
+from image_metadata import MetadataScanner, read_image_header
+from telemetry import EventRecorder
+from label_sync import LABEL_SYNC_DELAY, LabelWriter, format_labels
 from pathlib import Path
-import shutil
+# json, yaml, random and shutil are only needed for save/load/export and are
+# imported there to keep start-up fast, as are the video, archive and remote
+# image sources, which are imported when a folder is opened, and the numpy
+# based project validation.
+
+ICON_DIR = Path(__file__).resolve().parent / "icons"
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+
+# Folder changes are applied once events stop for RESCAN_DELAY ms, and at
+# the latest RESCAN_MAX_WAIT seconds after the first one of a burst.
+RESCAN_DELAY = 500
+RESCAN_MAX_WAIT = 3.0
 
-def find_project_root(start_path: Path) -> Path:
-    current_path = start_path.resolve()
-    markers = [
-        "requirements.txt",
-        ".env",
-        ".venv",
-        "venv"
-    ]
-    
-    for parent in [current_path] + list(current_path.parents):
-        for marker in markers:
-            marker_path = parent / marker
-            if marker_path.exists():
-                if marker_path.is_dir() and marker in [".env", ".venv", "venv"]:
-                    return parent
-                else:
-                    return parent
-                
-    print("Warning: No common project root marker found. Defaulting to script's directory.")
-    return start_path.resolve()
 
-script_directory = Path(__file__).resolve().parent
-BASE_DIR = find_project_root(script_directory)
-print(f"Determined project root (BASE_DIR): {BASE_DIR}")
+def file_identity(entry):
+    """Return ``(inode, size, mtime_ns)`` of a scandir entry, which a rename keeps."""
+    try:
+        st = entry.stat()
+    except OSError:
+        return (entry.inode(), None, None)  # vanished meanwhile; matches nothing
+    return (entry.inode(), st.st_size, st.st_mtime_ns)
 
 # Icon paths
-selectAll = BASE_DIR / "src" / "utlis" / "icons" / "selectAll.png"
-deSelectAll = BASE_DIR / "src" / "utlis" / "icons" / "deSelectAll.png" 
-deleteSelected = BASE_DIR / "src" / "utlis" / "icons" / "deleteSelected.png"
-fileicon = BASE_DIR / "src" / "utlis" / "icons" / "menu.png"
-exportImages = BASE_DIR / "src" / "utlis" / "icons" / "export.png"
-selectFolder = BASE_DIR / "src" / "utlis" / "icons" / "file.png"
-previousImage = BASE_DIR / "src" / "utlis" / "icons" / "previous.png"
-nextImage = BASE_DIR / "src" / "utlis" / "icons" / "next.png"
-drawingMode = BASE_DIR / "src" / "utlis" / "icons" / "drawingMode.png" 
-editingMode = BASE_DIR / "src" / "utlis" / "icons" / "editingMode.png"
-panningMode = BASE_DIR / "src" / "utlis" / "icons" / "panningMode.png"
+selectAll = ICON_DIR / "selectAll.png"
+deSelectAll = ICON_DIR / "deSelectAll.png" 
+deleteSelected = ICON_DIR / "deleteSelected.png"
+fileicon = ICON_DIR / "menu.png"
+exportImages = ICON_DIR / "export.png"
+selectFolder = ICON_DIR / "file.png"
+previousImage = ICON_DIR / "previous.png"
+nextImage = ICON_DIR / "next.png"
+drawingMode = ICON_DIR / "drawingMode.png" 
+editingMode = ICON_DIR / "editingMode.png"
+panningMode = ICON_DIR / "panningMode.png"
 
 class YOLOAnnotator(QMainWindow):
     def __init__(self):
@@ -75,6 +79,53 @@ class YOLOAnnotator(QMainWindow):
         self.classes = ["Playground", "Brick Kiln", "Metro Shed", "Pond-1","Pond-2","Sheds","Solar Panel","STP"]
         self.annotations = {}
         self.project_file_path = None
+        self.undo_stack = UndoStack()
+        self._edit_origin = None
+        self._syncing_selection = False
+        self.annotation_index = AnnotationIndex()
+        self.image_query = None
+        self._image_set = set()
+        self._hidden_rows = set()
+        self.image_metadata = None
+        self.metadata_scanner = None
+        self.project_validator = None
+        self.validation_pending = None  # (callback, busy dialog) of an interactive validation
+        self.box_propagator = None
+        self.review_grid = None
+        # Containers (videos, archives) opened from the image folder, by file name;
+        # their frames are listed as "<file>#<member>" image names.
+        self.image_sources = {}
+        # Set when image_folder is a bucket URL; every image name is then one of its members
+        self.folder_source = None
+        self.telemetry = EventRecorder()
+        self.telemetry.record("start")
+        self.telemetry_timer = QTimer(self)
+        self.telemetry_timer.setInterval(10000)
+        self.telemetry_timer.timeout.connect(self.telemetry.flush)
+        self.telemetry_timer.start()
+        
+        self.team = None
+        self.team_timer = QTimer(self)
+        self.team_timer.timeout.connect(self.team_heartbeat)
+        
+        # Set while label sync is on: writes "<image>.txt" next to each image as it is edited
+        self.label_writer = None
+        self.label_sync_folder = None
+        self._label_sync_pending = set()
+        self.label_sync_timer = QTimer(self)
+        self.label_sync_timer.setSingleShot(True)
+        self.label_sync_timer.setInterval(LABEL_SYNC_DELAY)
+        self.label_sync_timer.timeout.connect(self.write_synced_labels)
+        
+        # File name -> file_identity of the plain image files last seen in image_folder
+        self._folder_files = {}
+        self._rescan_deadline = 0.0
+        self.folder_watcher = QFileSystemWatcher(self)
+        self.folder_watcher.directoryChanged.connect(self.folder_changed)
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(RESCAN_DELAY)
+        self.rescan_timer.timeout.connect(self.rescan_folder)
         
         self.init_ui()
         self.init_menu()
@@ -100,11 +151,124 @@ class YOLOAnnotator(QMainWindow):
         load_action.triggered.connect(self.load_project)
         file_menu.addAction(load_action)
         
+        remote_action = QAction("Open Remote Folder...", self)
+        remote_action.triggered.connect(self.select_remote_folder)
+        file_menu.addAction(remote_action)
+        
+        self.label_sync_action = QAction("Sync YOLO Labels to Image Folder", self)
+        self.label_sync_action.setCheckable(True)
+        self.label_sync_action.setToolTip("Keep a YOLO .txt label file next to every annotated image, updated as you edit")
+        self.label_sync_action.toggled.connect(self.toggle_label_sync)
+        file_menu.addAction(self.label_sync_action)
+        
+        edit_menu = menubar.addMenu("Edit")
+        undo_action = QAction("Undo", self)
+        undo_action.setShortcut("Ctrl+Z")
+        undo_action.triggered.connect(self.undo)
+        edit_menu.addAction(undo_action)
+        
+        redo_action = QAction("Redo", self)
+        redo_action.setShortcuts(["Ctrl+Y", "Ctrl+Shift+Z"])
+        redo_action.triggered.connect(self.redo)
+        edit_menu.addAction(redo_action)
+        
+        propagate_action = QAction("Propagate Boxes to Next Images...", self)
+        propagate_action.setShortcut("Ctrl+Shift+F")
+        propagate_action.setToolTip("Track this image's boxes through the following images and add them there")
+        propagate_action.triggered.connect(self.propagate_boxes)
+        edit_menu.addAction(propagate_action)
+        
+        view_menu = menubar.addMenu("View")
+        hud_action = QAction("Performance HUD", self)
+        hud_action.setShortcut("F12")
+        hud_action.setCheckable(True)
+        hud_action.toggled.connect(self.canvas.set_hud_visible)
+        view_menu.addAction(hud_action)
+        
+        self.profile_action = QAction("Record Profile", self)
+        self.profile_action.setShortcut("Ctrl+Shift+P")
+        self.profile_action.setCheckable(True)
+        self.profile_action.toggled.connect(self.toggle_profile_capture)
+        view_menu.addAction(self.profile_action)
+        
+        pixel_cache_action = QAction("Cache Decoded Images", self)
+        pixel_cache_action.setCheckable(True)
+        pixel_cache_action.setToolTip("Keep decoded pixels of slow-to-decode images in a disk cache")
+        pixel_cache_action.toggled.connect(self.toggle_pixel_cache)
+        view_menu.addAction(pixel_cache_action)
+        
+        self.review_action = QAction("Review Grid", self)
+        self.review_action.setShortcut("Ctrl+G")
+        self.review_action.setCheckable(True)
+        self.review_action.setToolTip("Page through the listed images as a grid of thumbnails with their boxes")
+        self.review_action.toggled.connect(self.toggle_review_grid)
+        view_menu.addAction(self.review_action)
+        
+        band_action = QAction("Band Mapping...", self)
+        band_action.setToolTip("Choose the bands and stretch used to display multiband TIFFs")
+        band_action.triggered.connect(self.edit_band_mapping)
+        view_menu.addAction(band_action)
+        
+        tools_menu = menubar.addMenu("Tools")
+        evaluate_action = QAction("Evaluate Predictions...", self)
+        evaluate_action.setToolTip("Compare YOLO prediction files against the project annotations")
+        evaluate_action.triggered.connect(self.evaluate_predictions)
+        tools_menu.addAction(evaluate_action)
+        
+        stats_action = QAction("Annotator Statistics...", self)
+        stats_action.setToolTip("Boxes per minute, time per image and idle time per day and annotator")
+        stats_action.triggered.connect(self.show_annotator_statistics)
+        tools_menu.addAction(stats_action)
+        
+        validate_action = QAction("Validate Project...", self)
+        validate_action.setToolTip("Find out-of-range and zero-area boxes, unknown class ids and missing images")
+        validate_action.triggered.connect(self.validate_project)
+        tools_menu.addAction(validate_action)
+        
+        telemetry_action = QAction("Record Annotator Activity", self)
+        telemetry_action.setCheckable(True)
+        telemetry_action.setChecked(True)
+        telemetry_action.setToolTip("Log annotation events to a local file for the statistics view")
+        telemetry_action.toggled.connect(self.toggle_telemetry)
+        tools_menu.addAction(telemetry_action)
+        
+        team_menu = menubar.addMenu("Team")
+        self.join_team_action = QAction("Join Team Session...", self)
+        self.join_team_action.setToolTip("Take batches of this folder's images through shared lease files")
+        self.join_team_action.triggered.connect(self.join_team)
+        team_menu.addAction(self.join_team_action)
+        
+        self.finish_batch_action = QAction("Finish Batch", self)
+        self.finish_batch_action.setShortcut("Ctrl+Shift+N")
+        self.finish_batch_action.setEnabled(False)
+        self.finish_batch_action.triggered.connect(self.finish_team_batch)
+        team_menu.addAction(self.finish_batch_action)
+        
+        self.leave_team_action = QAction("Leave Team Session", self)
+        self.leave_team_action.setEnabled(False)
+        self.leave_team_action.triggered.connect(self.leave_team)
+        team_menu.addAction(self.leave_team_action)
+        
+        merge_action = QAction("Merge Team Shards...", self)
+        merge_action.setToolTip("Combine every annotator's shard into one project file")
+        merge_action.triggered.connect(self.merge_team_shards)
+        team_menu.addAction(merge_action)
+        
         export_menu = menubar.addMenu("Export")
         export_action = QAction("Export YOLO Dataset", self)
         export_action.setShortcut("Ctrl+E")
         export_action.triggered.connect(self.export_dataset)
         export_menu.addAction(export_action)
+        
+        split_action = QAction("Export Split Lists / K-Fold...", self)
+        split_action.setToolTip("Link the images once and write train/val path lists, optionally for K stratified folds")
+        split_action.triggered.connect(self.export_split_lists)
+        export_menu.addAction(split_action)
+        
+        table_action = QAction("Export Annotation Table...", self)
+        table_action.setToolTip("Write all boxes to one Parquet or Arrow table for pandas / DuckDB")
+        table_action.triggered.connect(self.export_annotation_table)
+        export_menu.addAction(table_action)
         export_menu.setIcon(QIcon(str(exportImages)))
 
     def init_ui(self):
@@ -121,7 +285,12 @@ class YOLOAnnotator(QMainWindow):
         self.canvas = ImageCanvas()
         self.canvas.annotation_created.connect(self.add_annotation)
         self.canvas.annotation_updated.connect(self.update_annotation)
-        splitter.addWidget(self.canvas)
+        self.canvas.annotation_edit_started.connect(self.begin_annotation_edit)
+        self.canvas.selection_changed.connect(self.canvas_selection_changed)
+        self.annotation_model.colors = self.canvas.image_label.colors
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.canvas)
+        splitter.addWidget(self.view_stack)
         
         splitter.setSizes([300, 900])
     
@@ -187,6 +356,17 @@ class YOLOAnnotator(QMainWindow):
         image_group = QGroupBox("Images")
         image_layout = QVBoxLayout(image_group)
         
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter, e.g. class=STP AND boxes>20, unannotated")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(self.apply_image_filter)
+        self.filter_edit.textChanged.connect(self.filter_timer.start)
+        self.filter_edit.returnPressed.connect(self.apply_image_filter)
+        image_layout.addWidget(self.filter_edit)
+        
         self.image_list = QListWidget()
         self.image_list.itemClicked.connect(self.load_image)
         image_layout.addWidget(self.image_list)
@@ -215,10 +395,16 @@ class YOLOAnnotator(QMainWindow):
         self.add_class_btn.clicked.connect(self.add_class)
         self.remove_class_btn = QPushButton("Remove Class")
         self.remove_class_btn.clicked.connect(self.remove_class)
+        self.merge_class_btn = QPushButton("Merge Into...")
+        self.merge_class_btn.setToolTip("Move every box of the selected class to another class")
+        self.merge_class_btn.clicked.connect(self.merge_class)
         class_btn_layout.addWidget(self.add_class_btn)
         class_btn_layout.addWidget(self.remove_class_btn)
+        class_btn_layout.addWidget(self.merge_class_btn)
         class_layout.addLayout(class_btn_layout)
         
+        # Created before the class list, which passes the classes on to it
+        self.annotation_model = AnnotationListModel(parent=self)
         self.class_list = QListWidget()
         self.class_list.itemClicked.connect(self.select_class)
         self.update_class_list()
@@ -233,14 +419,22 @@ class YOLOAnnotator(QMainWindow):
         current_class_layout.addWidget(self.class_spinbox)
         class_layout.addLayout(current_class_layout)
         
+        self.apply_class_btn = QPushButton("Apply to Selected")
+        self.apply_class_btn.setToolTip("Set the current class on the selected annotations")
+        self.apply_class_btn.clicked.connect(self.change_annotation_class)
+        class_layout.addWidget(self.apply_class_btn)
+        
         layout.addWidget(class_group)
         
         ann_group = QGroupBox("Current Image Annotations")
         ann_layout = QVBoxLayout(ann_group)
         
-        self.annotation_list = QListWidget()
-        self.annotation_list.setSelectionMode(QListWidget.MultiSelection)
-        self.annotation_list.itemClicked.connect(self.handle_item_clicked)
+        self.annotation_list = QListView()
+        self.annotation_list.setModel(self.annotation_model)
+        self.annotation_list.setSelectionMode(QListView.MultiSelection)
+        self.annotation_list.setUniformItemSizes(True)
+        self.annotation_list.clicked.connect(self.handle_item_clicked)
+        self.annotation_list.selectionModel().selectionChanged.connect(self.annotation_selection_changed)
         ann_layout.addWidget(self.annotation_list)
         
         selection_btn_layout = QHBoxLayout()
@@ -266,20 +460,6 @@ class YOLOAnnotator(QMainWindow):
         
         layout.addWidget(ann_group)
         
-        self.setStyleSheet(self.styleSheet() + """
-            QPushButton#select_all_btn, QPushButton#deselect_all_btn, QPushButton#delete_ann_btn {
-                min-width: 30px;
-                max-width: 30px;
-                min-height: 30px;
-                max-height: 30px;
-                padding: 2px;
-            }
-            QPushButton#delete_ann_btn {
-                max-width: 60px;
-                font-size: 12px;
-            }
-        """)
-        
         return panel
     
     def apply_os_theme(self):
@@ -314,12 +494,12 @@ class YOLOAnnotator(QMainWindow):
                     padding: 0 3px;
                     color: #ffffff;
                 }
-                QListWidget {
+                QListView {
                     background-color: #353535;
                     color: #ffffff;
                     border: 1px solid #555555;
                 }
-                QListWidget::item:selected {
+                QListView::item:selected {
                     background-color: #4b4e4f;
                 }
                 QSpinBox {
@@ -333,18 +513,49 @@ class YOLOAnnotator(QMainWindow):
             """)
             self.canvas.set_dark_mode(True)
         else:
-            self.setStyleSheet("")
+            # Clearing an already empty stylesheet still re-polishes every child widget
+            if self.styleSheet():
+                self.setStyleSheet("")
             self.canvas.set_dark_mode(False)
     
-    def handle_item_clicked(self, item):
+    def handle_item_clicked(self, index):
         modifiers = QApplication.keyboardModifiers()
         if not (modifiers & Qt.ControlModifier or modifiers & Qt.ShiftModifier):
-            self.annotation_list.clearSelection()
-            item.setSelected(True)
+            self.annotation_list.selectionModel().select(index, QItemSelectionModel.ClearAndSelect)
+    
+    def selected_annotation_rows(self):
+        return sorted(index.row() for index in self.annotation_list.selectionModel().selectedIndexes())
+    
+    def annotation_selection_changed(self, selected, deselected):
+        if self._syncing_selection:
+            return
+        # The canvas highlights one box: the one clicked last, if still selected
+        selection = self.annotation_list.selectionModel()
+        current = selection.currentIndex()
+        if current.isValid() and selection.isSelected(current):
+            row = current.row()
+        else:
+            rows = self.selected_annotation_rows()
+            row = rows[-1] if rows else -1
+        self._syncing_selection = True
+        self.canvas.select_annotation(row)
+        self._syncing_selection = False
+    
+    def canvas_selection_changed(self, row):
+        if self._syncing_selection:
+            return
+        self._syncing_selection = True
+        selection = self.annotation_list.selectionModel()
+        if 0 <= row < self.annotation_model.rowCount():
+            index = self.annotation_model.index(row)
+            selection.setCurrentIndex(index, QItemSelectionModel.ClearAndSelect)
+            self.annotation_list.scrollTo(index)
+        else:
+            selection.clearSelection()
+        self._syncing_selection = False
     
     def select_all_annotations(self):
-        for index in range(self.annotation_list.count()):
-            self.annotation_list.item(index).setSelected(True)
+        self.annotation_list.selectAll()
     
     def deselect_all_annotations(self):
         self.annotation_list.clearSelection()
@@ -352,30 +563,489 @@ class YOLOAnnotator(QMainWindow):
     def select_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Image Folder")
         if folder:
+            self.write_synced_labels(force=True)
             self.image_folder = folder
             self.folder_label.setText(f"Folder: {folder}")
+            self.undo_stack.clear()
+            self.load_images()
+    
+    def select_remote_folder(self):
+        from remote_source import is_remote_url
+        
+        url, ok = QInputDialog.getText(
+            self, "Open Remote Folder",
+            "Bucket URL (s3://bucket/prefix or http://host:9000/bucket/prefix).\n"
+            "Credentials are read from AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY:",
+            text=self.image_folder if is_remote_url(self.image_folder) else "s3://")
+        url = url.strip()
+        if ok and is_remote_url(url):
+            self.write_synced_labels(force=True)
+            self.image_folder = url
+            self.folder_label.setText(f"Folder: {url}")
+            self.undo_stack.clear()
             self.load_images()
     
     def load_images(self):
         if not self.image_folder:
             return
+        from video_source import VIDEO_EXTENSIONS, VideoSource
+        from archive_source import ARCHIVE_EXTENSIONS, ArchiveSource
+        from remote_source import RemoteSource, is_remote_url
             
-        extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
+        extensions = IMAGE_EXTENSIONS
         self.image_files = []
+        containers = []
+        self._folder_files = {}
+        self.box_propagator = None  # its proposals are for the previous folder
+        self.close_image_sources()
+        if self.folder_watcher.directories():
+            self.folder_watcher.removePaths(self.folder_watcher.directories())
+        
+        if is_remote_url(self.image_folder):
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                self.folder_source = RemoteSource(self.image_folder, extensions)
+                self.image_files = self.folder_source.keys()
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to open remote folder:\n{str(e)}")
+            finally:
+                QApplication.restoreOverrideCursor()
+        else:
+            with os.scandir(self.image_folder) as entries:
+                for entry in entries:
+                    file = entry.name
+                    if file.lower().endswith(extensions):
+                        self.image_files.append(file)
+                        self._folder_files[file] = file_identity(entry)
+                    elif file.lower().endswith(VIDEO_EXTENSIONS + ARCHIVE_EXTENSIONS):
+                        containers.append(file)
+            self.folder_watcher.addPath(self.image_folder)
         
-        for file in os.listdir(self.image_folder):
-            if any(file.lower().endswith(ext) for ext in extensions):
-                self.image_files.append(file)
+        for file in sorted(containers):
+            path = os.path.join(self.image_folder, file)
+            try:
+                if file.lower().endswith(VIDEO_EXTENSIONS):
+                    source = VideoSource(path)
+                else:
+                    source = ArchiveSource(path, extensions)
+            except Exception as e:
+                self.statusBar().showMessage(f"Skipped {file}: {str(e)}", 10000)
+                continue
+            self.image_sources[file] = source
+            self.image_files.extend(f"{file}#{member}" for member in source.keys())
         
         self.image_files.sort()
         self.image_list.clear()
         self.image_list.addItems(self.image_files)
+        self._image_set = set(self.image_files)
+        self._hidden_rows = set()
+        if self.image_query:
+            self.apply_image_filter()
         self.update_image_counter()
+        self.start_metadata_scan()
+        self.refresh_review_grid()
+        if self.label_writer is not None:
+            if self.folder_source is not None:
+                self.label_sync_action.setChecked(False)
+            else:
+                self.label_sync_folder = self.image_folder
+                # Annotations of images from other folders have no place here
+                self.sync_labels(self.annotations.keys() & self._image_set)
         
         if self.image_files:
             self.current_image_index = 0
             self.load_current_image()
     
+    def folder_changed(self):
+        """Debounce directory change notifications into one rescan per burst."""
+        if not self.rescan_timer.isActive():
+            self._rescan_deadline = time.monotonic() + RESCAN_MAX_WAIT
+            self.rescan_timer.start()
+        elif time.monotonic() < self._rescan_deadline:
+            self.rescan_timer.start()
+    
+    def rescan_folder(self):
+        """Apply files added, removed or renamed in the image folder since the last scan.
+
+        The folder listing is read and only new names, and known names whose
+        inode changed (a file replaced by an editor's save), are stat'ed;
+        sizes and modification times of the other names are refreshed by the
+        background metadata scan. A removed and an added name with the same
+        inode, size and modification time are a rename: the annotations, undo
+        history and tags of the old name move to the new one; anything else
+        is a delete and an add. The current image and the annotation
+        selection are kept unless the current file was deleted.
+        """
+        if not self.image_folder or self.folder_source is not None:
+            return
+        if self.label_writer is not None and self.label_writer.busy():
+            # Our label writes trigger notifications too; look once they are all on disk
+            self.rescan_timer.start()
+            return
+        try:
+            found = {}
+            with os.scandir(self.image_folder) as entries:
+                for entry in entries:
+                    if entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        known = self._folder_files.get(entry.name)
+                        found[entry.name] = known if known and known[0] == entry.inode() else file_identity(entry)
+        except OSError:
+            return  # the folder went away; keep the list until another is chosen
+        removed = self._folder_files.keys() - found.keys()
+        added = found.keys() - self._folder_files.keys()
+        removed_files = {self._folder_files[name]: name for name in removed}
+        self._folder_files = found
+        if not removed and not added:
+            return
+        
+        current_name = self.image_files[self.current_image_index] if self.image_files else None
+        hidden_names = {self.image_files[row] for row in self._hidden_rows}
+        rows = (bisect_left(self.image_files, name) for name in removed)
+        for row in sorted(rows, reverse=True):
+            del self.image_files[row]
+            self.image_list.takeItem(row)
+        for name in sorted(added):
+            row = bisect_left(self.image_files, name)
+            self.image_files.insert(row, name)
+            self.image_list.insertItem(row, name)
+        self._image_set.difference_update(removed)
+        self._image_set.update(added)
+        if hidden_names:
+            self._hidden_rows = {row for row, name in enumerate(self.image_files) if name in hidden_names}
+        
+        renamed = {}
+        for name in added:
+            old_name = removed_files.get(found[name]) if found[name][1] is not None else None
+            if old_name is not None:
+                renamed[old_name] = name
+                self.rename_image(old_name, name)
+        current_name = renamed.get(current_name, current_name)
+        
+        if current_name in self._image_set:
+            self.current_image_index = bisect_left(self.image_files, current_name)
+            self.image_list.setCurrentRow(self.current_image_index)
+            self.current_image_path = os.path.join(self.image_folder, current_name)
+            self.setWindowTitle(f"YOLO Annotator - {current_name}")
+        elif self.image_files:
+            self.current_image_index = min(self.current_image_index, len(self.image_files) - 1)
+            self.load_current_image()
+        else:
+            self.current_image_index = 0
+            self.canvas.set_annotations([])
+            self.update_annotation_list()
+        
+        if self.image_query:
+            self.apply_image_filter()
+        else:
+            self.update_image_counter()
+            self.refresh_review_grid()
+        self.start_metadata_scan()
+        self.statusBar().showMessage(
+            f"Folder updated: {len(added) - len(renamed)} added, {len(removed) - len(renamed)} removed, "
+            f"{len(renamed)} renamed", 5000)
+    
+    def rename_image(self, old_name, new_name):
+        """Move the annotations and history of a renamed image file to its new name."""
+        if old_name in self.annotations:
+            self.annotations[new_name] = self.annotations.pop(old_name)
+        self.annotation_index.rename_image(old_name, new_name, self.annotations.get(new_name, []))
+        self.undo_stack.rename_image(old_name, new_name)
+        if self.review_grid is not None:
+            self.review_grid.invalidate(old_name)
+        self.sync_labels((old_name, new_name))
+    
+    def toggle_label_sync(self, enabled):
+        if not enabled:
+            if self.label_writer is not None:
+                self.write_synced_labels(force=True)
+                self.label_writer.close()
+                self.label_writer = None
+            return
+        if self.label_writer is not None:
+            return
+        if not self.image_folder or self.folder_source is not None:
+            QMessageBox.warning(self, "Warning", "Label sync needs a local image folder!")
+            self.label_sync_action.setChecked(False)
+            return
+        self.label_writer = LabelWriter()
+        self.label_sync_folder = self.image_folder
+        self.sync_labels(self.annotations.keys() & self._image_set)
+    
+    def sync_labels(self, image_names):
+        """Queue the label files of ``image_names`` to be rewritten once editing pauses."""
+        if self.label_writer is None:
+            return
+        self._label_sync_pending.update(image_names)
+        self.label_sync_timer.start()
+    
+    def write_synced_labels(self, force=False):
+        """Hand the queued label files to the background writer."""
+        if self.label_writer is None or not self._label_sync_pending:
+            return
+        if self.canvas.is_dragging() and not force:
+            # The dragged box changes in place; write it once it is released
+            self.label_sync_timer.start()
+            return
+        for image_name in self._label_sync_pending:
+            if self.split_source_key(image_name):
+                continue  # frames and archive members have no file of their own to sit next to
+            path = os.path.join(self.label_sync_folder, self.label_stem(image_name) + ".txt")
+            boxes = self.annotations.get(image_name)
+            self.label_writer.submit(path, format_labels(boxes) if boxes is not None else None)
+        self._label_sync_pending.clear()
+        self.label_sync_timer.stop()
+        if self.label_writer.last_error is not None:
+            self.statusBar().showMessage(f"Label sync failed: {self.label_writer.last_error}", 10000)
+            self.label_writer.last_error = None
+    
+    def start_metadata_scan(self):
+        """Read image dimensions from file headers in the background."""
+        self.image_metadata = None
+        if self.folder_source is not None:
+            return
+        files = [name for name in self.image_files if self.split_source_key(name) is None]
+        self.metadata_scanner = MetadataScanner(self.image_folder, files, self)
+        self.metadata_scanner.scanned.connect(self.metadata_scanned)
+        self.metadata_scanner.start()
+    
+    def metadata_scanned(self, cache, read, seconds):
+        if self.sender() is not self.metadata_scanner or cache.folder != self.image_folder:
+            return  # superseded by a newer folder
+        self.image_metadata = cache
+        self.metadata_scanner = None
+        # Files rewritten in place keep their inode but not their size and mtime
+        for name, identity in self._folder_files.items():
+            entry = cache.entries.get(name)
+            if entry and (identity[1], identity[2]) != (entry[1], entry[0]):
+                self._folder_files[name] = (identity[0], entry[1], entry[0])
+        self.statusBar().showMessage(
+            f"Image metadata ready: {len(cache.entries)} images ({read} headers read) in {seconds:.1f} s", 5000)
+    
+    def validation_sources(self):
+        """Return the ``(folder, known_images)`` arguments ``validate`` checks image files against."""
+        if not self.image_folder:
+            return None, None
+        return (self.image_folder if self.folder_source is None else None), set(self.image_files)
+    
+    def start_validation(self):
+        """Check the loaded project in the background and report problems in the status bar."""
+        from project_validation import ProjectValidator
+        
+        folder, known_images = self.validation_sources()
+        self.project_validator = ProjectValidator(self.annotations, self.classes, folder, known_images, self)
+        self.project_validator.validated.connect(self.project_validated)
+        self.project_validator.start()
+    
+    def project_validated(self, report):
+        if self.sender() is not self.project_validator:
+            return  # superseded by a newer project
+        validator, self.project_validator = self.project_validator, None
+        pending, self.validation_pending = self.validation_pending, None
+        if pending is not None:
+            then, progress = pending
+            progress.hide()
+            progress.deleteLater()
+            if report is None:
+                QMessageBox.critical(self, "Error", f"Failed to validate project:\n{str(validator.error)}")
+            else:
+                then(report)
+            return
+        if report is None:
+            self.statusBar().showMessage(f"Could not validate the project: {validator.error}", 15000)
+        elif not report.ok:
+            self.statusBar().showMessage(
+                f"Validation found {report.total()} problems - see Tools > Validate Project", 15000)
+    
+    def run_validation(self, then):
+        """Validate the project in the background and call ``then(report)`` from ``project_validated``.
+        
+        A modal busy dialog keeps the window painting but stops edits until
+        the report arrives, since the fixes offered then refer to box
+        positions in it. Cancelling it drops the report.
+        """
+        from project_validation import ProjectValidator
+        
+        progress = QProgressDialog("Validating project...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Validate Project")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        
+        def cancel():
+            if self.validation_pending is not None and self.validation_pending[1] is progress:
+                self.validation_pending = self.project_validator = None
+                progress.deleteLater()
+        
+        progress.canceled.connect(cancel)
+        folder, known_images = self.validation_sources()
+        self.project_validator = ProjectValidator(self.annotations, self.classes, folder, known_images, self)
+        self.project_validator.validated.connect(self.project_validated)
+        self.validation_pending = (then, progress)
+        self.project_validator.start()
+        progress.show()
+    
+    def validate_before_export(self, export):
+        """Offer fixes for any problems in the project, then call ``export`` unless cancelled."""
+        def validated(report):
+            if not report.ok:
+                choice = self.show_validation(report, exporting=True)
+                if choice is None:
+                    return
+                if choice:
+                    self.apply_validation_fixes(report, choice)
+            if self.annotations:
+                export()
+        
+        self.run_validation(validated)
+    
+    def validate_project(self):
+        if not self.annotations:
+            QMessageBox.warning(self, "Warning", "No annotations to validate!")
+            return
+        
+        def validated(report):
+            if report.ok:
+                QMessageBox.information(self, "Success", report.summary())
+                return
+            actions = self.show_validation(report)
+            if actions:
+                self.apply_validation_fixes(report, actions)
+        
+        self.run_validation(validated)
+    
+    def show_validation(self, report, exporting=False):
+        """Show the problems in ``report`` with a checkbox per fix.
+        
+        Returns the checked fix actions, an empty list to export without
+        fixing, or None when cancelled.
+        """
+        from project_validation import FIX_ACTIONS
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Validate Project")
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel(f"{report.box_count} boxes checked in {report.seconds:.2f} s:\n\n{report.summary()}"))
+        
+        counts = {kind: report.count(kind) for kind in FIX_ACTIONS if kind != "add_classes"}
+        if report.max_class_id >= len(self.classes):
+            counts["add_classes"] = report.max_class_id + 1 - len(self.classes)
+        checkboxes = {}
+        for action, label in FIX_ACTIONS.items():
+            if counts.get(action):
+                checkbox = QCheckBox(f"{label} ({counts[action]})")
+                checkbox.setChecked(action not in ("add_classes", "missing_image"))
+                layout.addWidget(checkbox)
+                checkboxes[action] = checkbox
+        
+        choice = []
+        
+        def fix_selected():
+            choice.extend(action for action, checkbox in checkboxes.items() if checkbox.isChecked())
+            dialog.accept()
+        
+        btn_layout = QHBoxLayout()
+        fix_btn = QPushButton("Fix Selected")
+        fix_btn.clicked.connect(fix_selected)
+        btn_layout.addStretch()
+        btn_layout.addWidget(fix_btn)
+        if exporting:
+            export_btn = QPushButton("Export Anyway")
+            export_btn.clicked.connect(dialog.accept)
+            btn_layout.addWidget(export_btn)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(dialog.reject)
+        btn_layout.addWidget(cancel_btn)
+        layout.addLayout(btn_layout)
+        
+        if dialog.exec_() != QDialog.Accepted:
+            return None
+        return choice
+    
+    def apply_validation_fixes(self, report, actions):
+        from project_validation import FIX_ACTIONS, fix_project
+        
+        done, changed = fix_project(self.annotations, self.classes, report, actions)
+        # Recorded edits refer to the old box positions
+        self.undo_stack.clear()
+        self.annotation_index.rebuild(self.annotations)
+        if self.team is not None:
+            for image_name in changed:
+                self.team.touch(image_name)
+        self.sync_labels(changed)
+        if self.review_grid is not None:
+            self.review_grid.invalidate()
+        if self.image_query:
+            self.apply_image_filter()
+        
+        self.update_class_list()
+        self.class_spinbox.setMaximum(len(self.classes) - 1)
+        if self.image_files:
+            image_name = self.image_files[self.current_image_index]
+            self.canvas.set_annotations(self.annotations.get(image_name, []))
+        self.update_annotation_list()
+        self.statusBar().showMessage(
+            "Fixed: " + ", ".join(f"{FIX_ACTIONS[action].lower()} ({count})" for action, count in done.items()), 10000)
+    
+    def closeEvent(self, event):
+        # Background workers are children of the window; let them finish
+        # before Qt destroys them.
+        for thread in self.findChildren(QThread):
+            thread.wait()
+        if self.review_grid is not None:
+            self.review_grid.shutdown()
+        self.close_image_sources()
+        if self.team is not None:
+            self.leave_team()
+        self.toggle_label_sync(False)
+        self.telemetry.record("end")
+        self.telemetry.flush()
+        super().closeEvent(event)
+    
+    def split_source_key(self, image_name):
+        """Return ``(source, member)`` for an image inside an opened video, archive or bucket, else None."""
+        if self.folder_source is not None:
+            return self.folder_source, image_name
+        index = image_name.find('#')
+        while index != -1:
+            # Member paths may contain '#' themselves, so match the container name
+            source = self.image_sources.get(image_name[:index])
+            if source is not None:
+                return source, image_name[index + 1:]
+            index = image_name.find('#', index + 1)
+        return None
+    
+    def read_source_image(self, image_name):
+        """Decode an image from an opened source as a QImage; None for ordinary image files."""
+        key = self.split_source_key(image_name)
+        return key[0].read(key[1]) if key else None
+    
+    def export_name(self, image_name):
+        """File name used for an image in exported datasets."""
+        key = self.split_source_key(image_name)
+        return key[0].export_name(key[1]) if key else image_name
+    
+    def label_stem(self, image_name):
+        """Label file name (without ``.txt``) of an image in exported datasets."""
+        return os.path.splitext(self.export_name(image_name))[0]
+    
+    def close_image_sources(self):
+        for source in self.image_sources.values():
+            source.close()
+        self.image_sources = {}
+        if self.folder_source is not None:
+            self.folder_source.close()
+            self.folder_source = None
+    
+    def image_size(self, image_name):
+        """Return the pixel ``(width, height)`` of an image without decoding it."""
+        key = self.split_source_key(image_name)
+        if key:
+            return key[0].size(key[1])
+        info = self.image_metadata.get(image_name) if self.image_metadata else None
+        if info:
+            return info['width'], info['height']
+        header = read_image_header(os.path.join(self.image_folder, image_name))
+        return (header[0], header[1]) if header else None
+    
     def load_image(self, item):
         self.current_image_index = self.image_files.index(item.text())
         self.load_current_image()
@@ -385,7 +1055,16 @@ class YOLOAnnotator(QMainWindow):
             return
             
         self.current_image_path = os.path.join(self.image_folder, self.image_files[self.current_image_index])
-        self.canvas.load_image(self.current_image_path)
+        key = self.split_source_key(self.image_files[self.current_image_index])
+        if key:
+            # Large and tiled TIFFs are read window by window rather than whole
+            tiled = key[0].open_tiled(key[1])
+            if tiled is not None:
+                self.canvas.set_tiled_image(tiled)
+            else:
+                self.canvas.set_image(key[0].read(key[1]))
+        else:
+            self.canvas.load_image(self.current_image_path)
         
         image_name = self.image_files[self.current_image_index]
         if image_name in self.annotations:
@@ -397,22 +1076,122 @@ class YOLOAnnotator(QMainWindow):
         self.image_list.setCurrentRow(self.current_image_index)
         self.setWindowTitle(f"YOLO Annotator - {image_name}")
         self.update_image_counter()
+        self.telemetry.record("image", image_name)
     
     def update_image_counter(self):
         total = len(self.image_files)
         current = self.current_image_index + 1 if self.image_files else 0
-        self.image_counter.setText(f"{current}/{total}")
+        text = f"{current}/{total}"
+        if self.image_query:
+            text += f"  ({total - len(self._hidden_rows)} match filter)"
+        self.image_counter.setText(text)
     
     def prev_image(self):
-        if self.current_image_index > 0:
-            self.current_image_index -= 1
+        index = self.current_image_index - 1
+        while index in self._hidden_rows:
+            index -= 1
+        if index >= 0:
+            self.current_image_index = index
             self.load_current_image()
     
     def next_image(self):
-        if self.current_image_index < len(self.image_files) - 1:
-            self.current_image_index += 1
+        index = self.current_image_index + 1
+        while index in self._hidden_rows:
+            index += 1
+        if index < len(self.image_files):
+            self.current_image_index = index
+            self.load_current_image()
+    
+    def apply_image_filter(self):
+        self.filter_timer.stop()
+        text = self.filter_edit.text().strip()
+        if not text:
+            self.image_query = None
+            visible = None
+        else:
+            try:
+                self.image_query = self.annotation_index.compile(text, self.classes)
+            except ValueError as e:
+                self.filter_edit.setToolTip(str(e))
+                self.statusBar().showMessage(f"Invalid filter: {e}", 5000)
+                return
+            self.filter_edit.setToolTip("")
+            visible = self.image_query.evaluate(self._image_set)
+        
+        # Only touch rows whose visibility changes; hiding keeps rows aligned
+        # with image_files so row numbers stay valid as image indices.
+        hidden = set() if visible is None else {
+            row for row, name in enumerate(self.image_files) if name not in visible
+        }
+        for row in hidden - self._hidden_rows:
+            self.image_list.setRowHidden(row, True)
+        for row in self._hidden_rows - hidden:
+            self.image_list.setRowHidden(row, False)
+        self._hidden_rows = hidden
+        self.update_image_counter()
+        self.refresh_review_grid()
+    
+    def toggle_review_grid(self, enabled):
+        if enabled:
+            if self.review_grid is None:
+                from review_grid import ReviewGrid
+                self.review_grid = ReviewGrid(self.canvas.image_label.colors)
+                self.review_grid.image_activated.connect(self.open_from_review_grid)
+                self.review_grid.image_reader = self.read_source_image
+                self.view_stack.addWidget(self.review_grid)
+            self.view_stack.setCurrentWidget(self.review_grid)
+            self.refresh_review_grid()
+            if self.image_files:
+                self.review_grid.show_page_of(self.image_files[self.current_image_index])
+        else:
+            self.view_stack.setCurrentWidget(self.canvas)
+    
+    def refresh_review_grid(self):
+        if self.review_grid is None or self.view_stack.currentWidget() is not self.review_grid:
+            return
+        visible = [name for row, name in enumerate(self.image_files) if row not in self._hidden_rows]
+        self.review_grid.set_images(self.image_folder, visible, self.annotations, self.review_grid.page)
+    
+    def open_from_review_grid(self, image_name):
+        self.current_image_index = self.image_files.index(image_name)
+        self.load_current_image()
+        self.review_action.setChecked(False)
+    
+    def review_images(self, tag, image_names):
+        """Filter the image list down to ``image_names`` and open the first of them."""
+        self.annotation_index.tags[tag] = set(image_names)
+        self.filter_edit.setText(f"tag={tag}")
+        self.apply_image_filter()
+        first = next((name for name in image_names if name in self._image_set), None)
+        if first is not None:
+            self.current_image_index = self.image_files.index(first)
             self.load_current_image()
     
+    def annotations_changed(self, image_name):
+        """Keep the annotation index and the image filter in step with an edit."""
+        self.annotation_index.update_image(image_name, self.annotations.get(image_name, []))
+        if self.team is not None:
+            self.team.touch(image_name)
+        self.sync_labels((image_name,))
+        if self.review_grid is not None:
+            self.review_grid.invalidate(image_name)
+        if self.image_query is None:
+            return
+        if self.image_files and self.image_files[self.current_image_index] == image_name:
+            row = self.current_image_index
+        elif image_name in self._image_set:
+            row = self.image_files.index(image_name)
+        else:
+            return
+        hidden = not self.image_query.matches(image_name)
+        if hidden != (row in self._hidden_rows):
+            self.image_list.setRowHidden(row, hidden)
+            if hidden:
+                self._hidden_rows.add(row)
+            else:
+                self._hidden_rows.discard(row)
+            self.update_image_counter()
+    
     def add_class(self):
         text, ok = QInputDialog.getText(self, 'Add Class', 'Enter class name:')
         if ok and text:
@@ -422,17 +1201,83 @@ class YOLOAnnotator(QMainWindow):
     
     def remove_class(self):
         current_row = self.class_list.currentRow()
-        if current_row >= 0 and len(self.classes) > 1:
-            self.classes.pop(current_row)
-            self.update_class_list()
-            self.class_spinbox.setMaximum(len(self.classes) - 1)
-            if self.class_spinbox.value() >= len(self.classes):
-                self.class_spinbox.setValue(len(self.classes) - 1)
+        if current_row < 0 or len(self.classes) <= 1:
+            return
+        
+        change = ClassChange.remove(self.classes, current_row)
+        in_use = change.preview(self.annotations)['per_class'][current_row]
+        if in_use:
+            box = QMessageBox(self)
+            box.setWindowTitle("Remove Class")
+            box.setText(f"'{self.classes[current_row]}' is used by {in_use} boxes.\n"
+                        "Delete those boxes, or reassign them to another class?")
+            delete_btn = box.addButton("Delete Boxes", QMessageBox.DestructiveRole)
+            reassign_btn = box.addButton("Reassign...", QMessageBox.AcceptRole)
+            box.addButton(QMessageBox.Cancel)
+            box.exec_()
+            if box.clickedButton() == reassign_btn:
+                self.merge_class()
+                return
+            if box.clickedButton() != delete_btn:
+                return
+        self.apply_class_change(change, confirm=False)
+    
+    def merge_class(self):
+        current_row = self.class_list.currentRow()
+        if current_row < 0 or len(self.classes) <= 1:
+            return
+        
+        targets = [f"{i}: {name}" for i, name in enumerate(self.classes) if i != current_row]
+        target, ok = QInputDialog.getItem(self, "Merge Class",
+                                          f"Move all '{self.classes[current_row]}' boxes to:", targets, 0, False)
+        if ok:
+            target_id = int(target.split(':')[0])
+            self.apply_class_change(ClassChange.merge(self.classes, [current_row], target_id))
+    
+    def apply_class_change(self, change, confirm=True):
+        """Apply a ClassChange to every image at once and refresh the views.
+
+        A change that deletes boxes is always confirmed, with the counts.
+        """
+        preview = change.preview(self.annotations)
+        if confirm or preview['deleted']:
+            reply = QMessageBox.question(
+                self, "Confirm",
+                f"{change.description}?\n\n"
+                f"{preview['changed']} boxes relabelled, {preview['deleted']} boxes deleted "
+                f"in {preview['images']} images.\nThis cannot be undone.",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+        
+        change.apply(self.annotations, preview)
+        self.classes = change.new_classes
+        # Recorded edits refer to the old class ids
+        self.undo_stack.clear()
+        self.annotation_index.rebuild(self.annotations)
+        self.sync_labels(self.annotations.keys() & self._image_set)
+        if self.review_grid is not None:
+            self.review_grid.invalidate()
+        if self.image_query:
+            self.apply_image_filter()
+        
+        self.update_class_list()
+        self.class_spinbox.setMaximum(len(self.classes) - 1)
+        current = change.mapping[self.class_spinbox.value()] if self.class_spinbox.value() < len(change.mapping) else None
+        self.class_spinbox.setValue(current if current is not None else 0)
+        self.canvas.current_class = self.class_spinbox.value()
+        if self.image_files:
+            image_name = self.image_files[self.current_image_index]
+            self.canvas.set_annotations(self.annotations.get(image_name, []))
+        self.update_annotation_list()
     
     def update_class_list(self):
         self.class_list.clear()
         for i, class_name in enumerate(self.classes):
             self.class_list.addItem(f"{i}: {class_name}")
+        # Box rows show class names, and the list may have been replaced
+        self.annotation_model.set_classes(self.classes)
     
     def select_class(self, item):
         class_id = int(item.text().split(':')[0])
@@ -446,53 +1291,251 @@ class YOLOAnnotator(QMainWindow):
         if image_name not in self.annotations:
             self.annotations[image_name] = []
         
-        self.annotations[image_name].append({
+        ann = {
             'class': class_id,
             'bbox': bbox
-        })
+        }
+        boxes = self.annotations[image_name]
+        boxes.append(ann)
+        self.undo_stack.push(('create', image_name, len(boxes) - 1, ann))
         
-        self.update_annotation_list()
+        if self.annotation_model.boxes is boxes:
+            # The canvas already shares this list and repaints after the release
+            self.annotation_model.rows_inserted(len(boxes) - 1)
+        else:
+            self.canvas.set_annotations(boxes)
+            self.update_annotation_list()
+        self.annotations_changed(image_name)
+        self.telemetry.record("create", image_name)
+    
+    def begin_annotation_edit(self, index):
+        # Remember the box as it was before the drag so the whole drag
+        # becomes a single undo entry when the canvas reports the result.
+        image_name = self.image_files[self.current_image_index]
+        if image_name in self.annotations and 0 <= index < len(self.annotations[image_name]):
+            self._edit_origin = (image_name, index, tuple(self.annotations[image_name][index]['bbox']))
     
     def update_annotation(self, index, bbox):
         image_name = self.image_files[self.current_image_index]
         if image_name in self.annotations and 0 <= index < len(self.annotations[image_name]):
+            old_bbox = tuple(self.annotations[image_name][index]['bbox'])
+            if self._edit_origin and self._edit_origin[:2] == (image_name, index):
+                old_bbox = self._edit_origin[2]
+            self._edit_origin = None
+            
             self.annotations[image_name][index]['bbox'] = bbox
+            if old_bbox != tuple(bbox):
+                self.undo_stack.push(('update', image_name, index, old_bbox, tuple(bbox)))
+                self.telemetry.record("update", image_name)
+                self.annotations_changed(image_name)
+            self.annotation_model.rows_changed(index)
+    
+    def change_annotation_class(self):
+        selected_rows = self.selected_annotation_rows()
+        if not selected_rows or not self.image_files:
+            return
+        
+        image_name = self.image_files[self.current_image_index]
+        if image_name not in self.annotations:
+            return
+        
+        new_class = self.class_spinbox.value()
+        changes = []
+        for index in selected_rows:
+            ann = self.annotations[image_name][index]
+            if ann['class'] != new_class:
+                changes.append((index, ann['class'], new_class))
+                ann['class'] = new_class
+        
+        if changes:
+            self.undo_stack.push(('class', image_name, tuple(changes)))
+            self.telemetry.record("class", image_name)
+            self.canvas.set_annotations(self.annotations[image_name])
+            self.annotation_model.rows_changed(changes[0][0], changes[-1][0])
+            self.annotations_changed(image_name)
+    
+    def propagate_boxes(self):
+        if not self.image_files:
+            return
+        image_name = self.image_files[self.current_image_index]
+        boxes = self.annotations.get(image_name, [])
+        if not boxes:
+            QMessageBox.warning(self, "Warning", "No boxes on this image to propagate!")
+            return
+        if self.box_propagator is not None:
+            QMessageBox.warning(self, "Warning", "Boxes are still being propagated!")
+            return
+        remaining = len(self.image_files) - 1 - self.current_image_index
+        if remaining < 1:
+            QMessageBox.warning(self, "Warning", "This is the last image!")
+            return
+        count, ok = QInputDialog.getInt(
+            self, "Propagate Boxes", f"Track the {len(boxes)} boxes through the next N images:",
+            min(10, remaining), 1, remaining)
+        if not ok:
+            return
+        
+        from functools import partial
+        from box_tracking import BoxPropagator, load_frame
+        
+        names = self.image_files[self.current_image_index:self.current_image_index + count + 1]
+        # Resolved now, so opening another folder meanwhile cannot change where the frames come from
+        folder = self.image_folder
+        sources = {name: self.split_source_key(name) for name in names}
+        
+        def load(name):
+            key = sources[name]
+            return load_frame(os.path.join(folder, name), partial(key[0].read, key[1]) if key else None)
+        
+        self.box_propagator = BoxPropagator(names, boxes, load, self)
+        self.box_propagator.propagated.connect(self.boxes_propagated)
+        self.box_propagator.start()
+        self.statusBar().showMessage(f"Propagating {len(boxes)} boxes through {count} images...")
+    
+    def boxes_propagated(self, proposals, lost, seconds):
+        if self.sender() is not self.box_propagator:
+            return
+        propagator, self.box_propagator = self.box_propagator, None
+        if propagator.error is not None:
+            QMessageBox.critical(self, "Error", f"Failed to propagate boxes:\n{str(propagator.error)}")
+            return
+        from box_tracking import DUPLICATE_IOU, box_iou
+        
+        added_boxes = 0
+        for image_name, anns in proposals.items():
+            if image_name not in self._image_set:
+                continue  # renamed or deleted meanwhile
+            boxes = self.annotations.setdefault(image_name, [])
+            added = []
+            for ann in anns:
+                # Skip boxes already there, e.g. from an earlier propagation
+                if any(other['class'] == ann['class'] and box_iou(other['bbox'], ann['bbox']) > DUPLICATE_IOU
+                       for other in boxes):
+                    continue
+                boxes.append(ann)
+                added.append((len(boxes) - 1, ann))
+            if added:
+                self.undo_stack.push(('insert', image_name, tuple(added)))
+                self.annotations_changed(image_name)
+                added_boxes += len(added)
+        
+        if self.image_files:
+            image_name = self.image_files[self.current_image_index]
+            if image_name in proposals:
+                self.canvas.set_annotations(self.annotations.get(image_name, []))
+                self.update_annotation_list()
+        self.statusBar().showMessage(
+            f"Propagated {added_boxes} boxes to {len(proposals)} images in {seconds:.1f} s"
+            f" ({lost} boxes lost along the way)", 10000)
+    
+    def undo(self):
+        image_name = self.undo_stack.undo(self.annotations)
+        if image_name is not None:
+            self.telemetry.record("undo", image_name)
+        self.refresh_after_history(image_name)
+    
+    def redo(self):
+        image_name = self.undo_stack.redo(self.annotations)
+        if image_name is not None:
+            self.telemetry.record("redo", image_name)
+        self.refresh_after_history(image_name)
+    
+    def refresh_after_history(self, image_name):
+        if image_name is None or not self.image_files:
+            return
+        self.annotations_changed(image_name)
+        if image_name == self.image_files[self.current_image_index]:
+            self.canvas.set_annotations(self.annotations[image_name])
             self.update_annotation_list()
-            self.canvas.set_annotations(self.annotations[image_name])  # Refresh canvas
     
     def update_annotation_list(self):
-        self.annotation_list.clear()
         image_name = self.image_files[self.current_image_index] if self.image_files else ""
-        
-        if image_name in self.annotations:
-            for i, ann in enumerate(self.annotations[image_name]):
-                class_name = self.classes[ann['class']]
-                bbox_str = f"[{ann['bbox'][0]:.3f}, {ann['bbox'][1]:.3f}, {ann['bbox'][2]:.3f}, {ann['bbox'][3]:.3f}]"
-                self.annotation_list.addItem(f"{i}: {class_name} {bbox_str}")
+        self.annotation_model.set_boxes(self.annotations.get(image_name, []), self.classes)
     
     def delete_annotation(self):
-        selected_items = self.annotation_list.selectedItems()
-        if not selected_items:
+        selected_indices = self.selected_annotation_rows()
+        if not selected_indices:
             return
 
         image_name = self.image_files[self.current_image_index]
         if image_name not in self.annotations:
             return
 
-        selected_indices = sorted([self.annotation_list.row(item) for item in selected_items], reverse=True)
-        for index in selected_indices:
-            if 0 <= index < len(self.annotations[image_name]):
-                self.annotations[image_name].pop(index)
+        removed = tuple(
+            (index, self.annotations[image_name][index])
+            for index in selected_indices
+            if 0 <= index < len(self.annotations[image_name])
+        )
+        for index, _ in reversed(removed):
+            self.annotations[image_name].pop(index)
+        if removed:
+            self.undo_stack.push(('delete', image_name, removed))
+            self.telemetry.record("delete", image_name)
+            self.annotations_changed(image_name)
 
+        self.canvas.select_annotation(-1)
         self.canvas.set_annotations(self.annotations[image_name])
-        self.update_annotation_list()
+        self.annotation_model.rows_removed(index for index, _ in removed)
+    
+    def toggle_pixel_cache(self, enabled):
+        if enabled:
+            from pixel_cache import PixelCache
+            try:
+                self.canvas.set_pixel_cache(PixelCache())
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to open the image cache:\n{str(e)}")
+        else:
+            self.canvas.set_pixel_cache(None)
+    
+    def edit_band_mapping(self):
+        label = self.canvas.image_label
+        current = ",".join(str(b + 1) for b in label.band_mapping) if label.band_mapping else "1,2,3"
+        text, ok = QInputDialog.getText(self, "Band Mapping", "Bands shown as R,G,B (1-based, or one band for grey):",
+                                        text=current)
+        if not ok:
+            return
+        low, high = label.stretch_percentiles
+        stretch, ok = QInputDialog.getText(self, "Band Mapping", "Percentile stretch (low,high):",
+                                           text=f"{low:g},{high:g}")
+        if not ok:
+            return
+        try:
+            bands = [int(b) - 1 for b in text.split(',') if b.strip()]
+            low, high = (float(p) for p in stretch.split(','))
+            if not bands or min(bands) < 0 or not 0 <= low < high <= 100:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Warning", "Enter band numbers like 4,3,2 and percentiles like 2,98.")
+            return
+        self.canvas.set_band_mapping(bands, (low, high))
+    
+    def toggle_profile_capture(self, recording):
+        if recording:
+            profiler.start_capture()
+            self.statusBar().showMessage("Recording profile... toggle Record Profile again to save it")
+            return
+        
+        self.statusBar().clearMessage()
+        save_path, _ = QFileDialog.getSaveFileName(self, "Save Profile", "labelsense_profile.json",
+                                                   "Trace Event JSON (*.json)")
+        if not save_path:
+            profiler.cancel_capture()
+            return
+        try:
+            written = profiler.stop_capture(save_path)
+            QMessageBox.information(self, "Success", "Profile saved to:\n" + "\n".join(written))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save profile:\n{str(e)}")
     
     def save_project(self):
         if not self.image_folder:
             QMessageBox.warning(self, "Warning", "No project data to save!")
             return
         
-        if self.project_file_path:
+        if self.team is not None:
+            # In a team session each annotator only writes their own shard
+            self.write_team_shard()
+        elif self.project_file_path:
             self._save_to_file(self.project_file_path)
         else:
             self.save_project_as()
@@ -504,6 +1547,8 @@ class YOLOAnnotator(QMainWindow):
             self.project_file_path = save_path
     
     def _save_to_file(self, save_path):
+        import json
+        
         project_data = {
             'image_folder': self.image_folder,
             'current_image_index': self.current_image_index,
@@ -513,6 +1558,8 @@ class YOLOAnnotator(QMainWindow):
         try:
             with open(save_path, 'w') as f:
                 json.dump(project_data, f, indent=4)
+            self.telemetry.record("save")
+            self.telemetry.flush()
             QMessageBox.information(self, "Success", f"Project saved to:\n{save_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save project:\n{str(e)}")
@@ -520,16 +1567,23 @@ class YOLOAnnotator(QMainWindow):
     def load_project(self):
         load_path, _ = QFileDialog.getOpenFileName(self, "Load Project", "", "JSON Files (*.json)")
         if load_path:
+            import json
+            from remote_source import is_remote_url
+            
             try:
                 with open(load_path, 'r') as f:
                     project_data = json.load(f)
                 
+                self.write_synced_labels(force=True)
+                self.box_propagator = None  # its proposals are for the previous project
                 self.image_folder = project_data.get('image_folder', '')
                 self.current_image_index = project_data.get('current_image_index', 0)
                 self.classes = project_data.get('classes', ["Military Helicopter", "Helicopter", "Passenger Airplane", "SAM Site"])
                 self.annotations = project_data.get('annotations', {})
+                self.undo_stack.clear()
+                self.annotation_index.rebuild(self.annotations)
                 
-                if self.image_folder and os.path.exists(self.image_folder):
+                if self.image_folder and (os.path.exists(self.image_folder) or is_remote_url(self.image_folder)):
                     self.folder_label.setText(f"Folder: {self.image_folder}")
                     self.load_images()
                     if self.image_files:
@@ -538,6 +1592,7 @@ class YOLOAnnotator(QMainWindow):
                     self.update_class_list()
                     self.class_spinbox.setMaximum(len(self.classes) - 1)
                     self.project_file_path = load_path
+                    self.start_validation()
                     QMessageBox.information(self, "Success", f"Project loaded from:\n{load_path}")
                 else:
                     QMessageBox.warning(self, "Warning", "Image folder not found. Please select a new folder.")
@@ -549,7 +1604,9 @@ class YOLOAnnotator(QMainWindow):
         if not self.image_folder or not self.annotations:
             QMessageBox.warning(self, "Warning", "No images or annotations to export!")
             return
-        
+        self.validate_before_export(self.export_dataset_validated)
+    
+    def export_dataset_validated(self):
         train_ratio, ok = QInputDialog.getDouble(
             self, 
             "Train/Val Split", 
@@ -566,8 +1623,12 @@ class YOLOAnnotator(QMainWindow):
         if not export_folder:
             return
         
+        import random
+        import shutil
+        import yaml
+        
         try:
-            dataset_name = os.path.basename(self.image_folder)
+            dataset_name = os.path.basename(self.image_folder.rstrip("/"))
             dataset_path = os.path.join(export_folder, dataset_name)
             
             os.makedirs(os.path.join(dataset_path, "images", "train"), exist_ok=True)
@@ -584,12 +1645,17 @@ class YOLOAnnotator(QMainWindow):
 
             
             for img_list, split in [(train_images, "train"), (val_images, "val")]:
-                for img_name in img_list:
-                    src_img = os.path.join(self.image_folder, img_name)
-                    dst_img = os.path.join(dataset_path, "images", split, img_name)
-                    shutil.copy2(src_img, dst_img)
+                # Sorted so video frames and archive members are read in file order
+                for img_name in sorted(img_list):
+                    dst_img = os.path.join(dataset_path, "images", split, self.export_name(img_name))
+                    key = self.split_source_key(img_name)
+                    if key:
+                        key[0].export(key[1], dst_img)
+                    else:
+                        src_img = os.path.join(self.image_folder, img_name)
+                        shutil.copy2(src_img, dst_img)
                     
-                    label_name = os.path.splitext(img_name)[0] + ".txt"
+                    label_name = self.label_stem(img_name) + ".txt"
                     label_path = os.path.join(dataset_path, "labels", split, label_name)
                     
                     with open(label_path, 'w') as f:
@@ -618,12 +1684,351 @@ class YOLOAnnotator(QMainWindow):
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to export dataset:\n{str(e)}")
+    
+    def export_split_lists(self):
+        if not self.image_folder or not self.annotations:
+            QMessageBox.warning(self, "Warning", "No images or annotations to export!")
+            return
+        self.validate_before_export(self.export_split_lists_validated)
+    
+    def export_split_lists_validated(self):
+        folds, ok = QInputDialog.getInt(
+            self, "Split Lists", "Number of stratified folds (1 for a single train/val split):", 5, 1, 20)
+        if not ok:
+            return
+        train_ratio = 80.0
+        if folds == 1:
+            train_ratio, ok = QInputDialog.getDouble(
+                self, "Train/Val Split", "Enter training data percentage (0-100):", 80.0, 0.0, 100.0, 1)
+            if not ok:
+                return
+        
+        export_folder = QFileDialog.getExistingDirectory(self, "Select Export Folder")
+        if not export_folder:
+            return
+        
+        from split_export import export_split_lists, link_or_copy
+        
+        def place_image(image_name, path):
+            key = self.split_source_key(image_name)
+            if key:
+                key[0].export(key[1], path)
+            else:
+                link_or_copy(os.path.join(self.image_folder, image_name), path)
+        
+        try:
+            dataset_name = os.path.basename(self.image_folder.rstrip("/"))
+            dataset_path = os.path.join(export_folder, dataset_name)
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                splits = export_split_lists(dataset_path, self.annotations, self.classes, place_image,
+                                            self.export_name, self.label_stem, folds, train_ratio / 100.0)
+            finally:
+                QApplication.restoreOverrideCursor()
+            lines = "\n".join(f"{os.path.basename(path)}: train {train}, val {val}" for path, train, val in splits)
+            QMessageBox.information(self, "Success", f"Split lists exported to:\n{dataset_path}\n{lines}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export split lists:\n{str(e)}")
+    
+    def join_team(self):
+        if not self.image_folder or self.folder_source is not None:
+            QMessageBox.warning(self, "Warning", "Open a shared local image folder first!")
+            return
+        import getpass
+        user, ok = QInputDialog.getText(self, "Join Team Session", "Annotator name:", text=getpass.getuser())
+        if not ok or not user.strip():
+            return
+        
+        from team import TEAM_DIR, HEARTBEAT_SECONDS, TeamSession, merge_shards
+        
+        try:
+            team = TeamSession(os.path.join(self.image_folder, TEAM_DIR), user.strip())
+            team.plan(self.image_files)
+            annotations, classes, _ = merge_shards(team.folder)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to join team session:\n{str(e)}")
+            return
+        new_classes = [name for name in dict.fromkeys(classes) if name not in self.classes]
+        # Shards use their own class lists; bring their ids onto ours by name
+        all_classes = self.classes + new_classes
+        remap = [all_classes.index(name) for name in classes]
+        for boxes in annotations.values():
+            for ann in boxes:
+                if 0 <= ann['class'] < len(remap):
+                    ann['class'] = remap[ann['class']]
+        
+        def box_key(boxes):
+            return [(ann['class'], list(ann['bbox'][:4])) for ann in boxes]
+        
+        # Local boxes carry no edit time, so ask before the team's copy replaces them
+        differing = [name for name, boxes in annotations.items()
+                     if self.annotations.get(name) and box_key(self.annotations[name]) != box_key(boxes)]
+        keep = set()
+        if differing:
+            box = QMessageBox(self)
+            box.setWindowTitle("Join Team Session")
+            box.setText(f"{len(differing)} images have boxes here that differ from the team's latest copy.\n"
+                        "Keep your boxes (they are shared as the newest edit) or replace them with the team's?")
+            keep_btn = box.addButton("Keep Mine", QMessageBox.AcceptRole)
+            team_btn = box.addButton("Use Team Copy", QMessageBox.DestructiveRole)
+            box.addButton(QMessageBox.Cancel)
+            box.exec_()
+            if box.clickedButton() == keep_btn:
+                keep = set(differing)
+            elif box.clickedButton() != team_btn:
+                return
+        
+        self.team = team
+        self.classes.extend(new_classes)
+        for image_name, boxes in annotations.items():
+            if image_name in keep:
+                team.touch(image_name)
+            else:
+                self.annotations[image_name] = boxes
+        self.sync_labels(annotations.keys() - keep)
+        if keep:
+            self.write_team_shard()
+        self.update_class_list()
+        self.class_spinbox.setMaximum(len(self.classes) - 1)
+        self.undo_stack.clear()
+        self.annotation_index.rebuild(self.annotations)
+        self.team_timer.start(HEARTBEAT_SECONDS * 1000)
+        self.join_team_action.setEnabled(False)
+        self.finish_batch_action.setEnabled(True)
+        self.leave_team_action.setEnabled(True)
+        self.next_team_batch()
+    
+    def next_team_batch(self):
+        try:
+            leased = self.team.acquire()
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to lease a batch:\n{str(e)}")
+            return
+        if leased is None:
+            finished, _, total = self.team.progress()
+            QMessageBox.information(self, "Success",
+                                    f"No batch left to take: {finished}/{total} batches are finished "
+                                    "and the rest are leased by other annotators.")
+            return
+        batch, names = leased
+        self.review_images("batch", names)
+        finished, leased_count, total = self.team.progress()
+        self.statusBar().showMessage(
+            f"Batch {batch}: {len(names)} images  ({finished}/{total} batches finished, {leased_count} leased)", 10000)
+    
+    def write_team_shard(self):
+        try:
+            self.team.write_shard(self.annotations, self.classes)
+        except OSError as e:
+            self.statusBar().showMessage(f"Could not write team shard: {e}", 10000)
+            return False
+        self.statusBar().showMessage(f"Saved shard {self.team.shard_path}", 5000)
+        return True
+    
+    def team_heartbeat(self):
+        self.write_team_shard()
+        try:
+            alive = self.team.heartbeat()
+        except OSError:
+            return  # share unreachable; retry on the next beat
+        if not alive:
+            QMessageBox.warning(self, "Warning",
+                                "Your batch lease expired and was taken over by another annotator. "
+                                "Your edits are kept in your shard; use Finish Batch to take a new batch.")
+    
+    def finish_team_batch(self):
+        if self.team is None or not self.write_team_shard():
+            return
+        try:
+            self.team.release(done=True)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to finish batch:\n{str(e)}")
+            return
+        self.next_team_batch()
+    
+    def leave_team(self):
+        if self.team is None:
+            return
+        self.write_team_shard()
+        try:
+            self.team.release()
+        except OSError:
+            pass  # the lease simply expires
+        self.team = None
+        self.team_timer.stop()
+        self.join_team_action.setEnabled(True)
+        self.finish_batch_action.setEnabled(False)
+        self.leave_team_action.setEnabled(False)
+        if self.filter_edit.text() == "tag=batch":
+            self.filter_edit.clear()
+            self.apply_image_filter()
+    
+    def merge_team_shards(self):
+        from team import TEAM_DIR, merge_shards
+        
+        team_folder = os.path.join(self.image_folder, TEAM_DIR) if self.image_folder else ""
+        if not os.path.isdir(os.path.join(team_folder, "shards")):
+            team_folder = QFileDialog.getExistingDirectory(self, "Select Team Folder", self.image_folder)
+            if not team_folder:
+                return
+        save_path, _ = QFileDialog.getSaveFileName(self, "Save Merged Project", "", "JSON Files (*.json)")
+        if not save_path:
+            return
+        
+        import json
+        
+        try:
+            annotations, classes, conflicts = merge_shards(team_folder)
+            project_data = {
+                'image_folder': os.path.dirname(os.path.abspath(team_folder)),
+                'current_image_index': 0,
+                'classes': classes or self.classes,
+                'annotations': annotations,
+            }
+            with open(save_path, 'w') as f:
+                json.dump(project_data, f, indent=4)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to merge team shards:\n{str(e)}")
+            return
+        QMessageBox.information(
+            self, "Success",
+            f"Merged {len(annotations)} images into:\n{save_path}\n"
+            f"{conflicts} images edited differently by more than one annotator kept their latest edit.")
+    
+    def toggle_telemetry(self, enabled):
+        if not enabled:
+            self.telemetry.record("end")
+            self.telemetry.flush()
+        self.telemetry.enabled = enabled
+        if enabled:
+            self.telemetry.record("start")
+    
+    def show_annotator_statistics(self):
+        from telemetry import format_summary, summarize
+        
+        days, ok = QInputDialog.getInt(self, "Annotator Statistics", "Summarize the last N days:", 30, 1, 3650)
+        if not ok:
+            return
+        self.telemetry.flush()
+        try:
+            text = format_summary(summarize(self.telemetry.folder, days))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to read annotator statistics:\n{str(e)}")
+            return
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Annotator Statistics")
+        layout = QVBoxLayout(dialog)
+        report = QTextEdit()
+        report.setReadOnly(True)
+        report.setLineWrapMode(QTextEdit.NoWrap)
+        report.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        report.setPlainText(text)
+        layout.addWidget(report)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(dialog.accept)
+        layout.addWidget(close_btn, alignment=Qt.AlignRight)
+        dialog.resize(860, 420)
+        dialog.exec_()
+    
+    def evaluate_predictions(self):
+        if not self.annotations:
+            QMessageBox.warning(self, "Warning", "No annotations to evaluate against!")
+            return
+        
+        folder = QFileDialog.getExistingDirectory(self, "Select Prediction Labels Folder")
+        if not folder:
+            return
+        conf_threshold, ok = QInputDialog.getDouble(
+            self, "Evaluate Predictions", "Minimum confidence for P, R and the confusion matrix:",
+            0.25, 0.0, 1.0, 2)
+        if not ok:
+            return
+        
+        from evaluation import evaluate, read_predictions
+        
+        try:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                # Unannotated images still count: their predictions are all false positives
+                ground_truth = {name: self.annotations.get(name, []) for name in self.image_files}
+                ground_truth.update(self.annotations)
+                predictions = read_predictions(folder, list(ground_truth), stem=self.label_stem)
+                result = evaluate(ground_truth, predictions, self.classes, conf_threshold)
+            finally:
+                QApplication.restoreOverrideCursor()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to evaluate predictions:\n{str(e)}")
+            return
+        self.show_evaluation(result)
+    
+    def show_evaluation(self, result):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Evaluation")
+        layout = QVBoxLayout(dialog)
+        
+        report = QTextEdit()
+        report.setReadOnly(True)
+        report.setLineWrapMode(QTextEdit.NoWrap)
+        report.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        report.setPlainText(result.report())
+        layout.addWidget(report)
+        
+        btn_layout = QHBoxLayout()
+        review_btn = QPushButton("Review Worst Images")
+        review_btn.setToolTip("Show only the images with the most errors in the image list")
+        review_btn.setEnabled(bool(result.worst))
+        review_btn.clicked.connect(dialog.accept)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(dialog.reject)
+        btn_layout.addStretch()
+        btn_layout.addWidget(review_btn)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+        
+        dialog.resize(760, 560)
+        if dialog.exec_() == QDialog.Accepted:
+            self.review_images("worst", [name for name, *_ in result.worst])
+    
+    def export_annotation_table(self):
+        if not self.annotations:
+            QMessageBox.warning(self, "Warning", "No annotations to export!")
+            return
+        
+        save_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Annotation Table", "", "Parquet (*.parquet);;Arrow IPC (*.arrow *.feather)")
+        if not save_path:
+            return
+        if not save_path.lower().endswith(('.parquet', '.arrow', '.feather')):
+            save_path += '.arrow' if selected_filter.startswith('Arrow') else '.parquet'
+        
+        image_size = None
+        if self.image_folder and QMessageBox.question(
+                self, "Export Annotation Table", "Include image pixel dimensions?",
+                QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
+            image_size = self.image_size
+        
+        from columnar_export import export_columnar
+        
+        try:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                rows = export_columnar(save_path, self.annotations, self.classes, image_size)
+            finally:
+                QApplication.restoreOverrideCursor()
+            QMessageBox.information(self, "Success", f"Exported {rows} boxes to:\n{save_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export annotation table:\n{str(e)}")
 
 def main():
+    from startup_profile import startup_profile
+    
     app = QApplication(sys.argv)
     
     window = YOLOAnnotator()
+    startup_profile.mark("annotator constructed")
     window.show()
+    startup_profile.mark_first_paint("annotator first paint", startup_profile.report)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import operator
+import re
+from collections import Counter
+
+_COMPARISONS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '!=': operator.ne,
+    '=': operator.eq,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+_TERM_RE = re.compile(r'^(class|boxes|tag)\s*(>=|<=|!=|=|>|<)\s*(.+)$', re.IGNORECASE)
+
+
+class AnnotationIndex:
+    """Inverted index over the project's annotations.
+
+    Keeps, per class id, the set of images containing it, and per image its
+    box count and class histogram. ``update_image`` refreshes one image in
+    time proportional to its own boxes, so the index can follow every edit.
+    ``tags`` holds named image sets produced by tools (e.g. the evaluator's
+    worst images) so they can be filtered with ``tag=<name>``.
+    """
+
+    def __init__(self):
+        self.class_images = {}
+        self.image_classes = {}
+        self.box_counts = {}
+        self.annotated = set()
+        self.tags = {}
+
+    def rebuild(self, annotations):
+        self.class_images = {}
+        self.image_classes = {}
+        self.box_counts = {}
+        self.annotated = set()
+        for image_name, boxes in annotations.items():
+            self.update_image(image_name, boxes)
+
+    def update_image(self, image_name, boxes):
+        for class_id in self.image_classes.pop(image_name, ()):
+            images = self.class_images.get(class_id)
+            if images is not None:
+                images.discard(image_name)
+        self.annotated.discard(image_name)
+        self.box_counts.pop(image_name, None)
+
+        if not boxes:
+            return
+        counts = Counter(ann['class'] for ann in boxes)
+        self.image_classes[image_name] = counts
+        self.box_counts[image_name] = len(boxes)
+        self.annotated.add(image_name)
+        for class_id in counts:
+            self.class_images.setdefault(class_id, set()).add(image_name)
+
+    def rename_image(self, old_name, new_name, boxes):
+        self.update_image(old_name, [])
+        self.update_image(new_name, boxes)
+        for names in self.tags.values():
+            if old_name in names:
+                names.discard(old_name)
+                names.add(new_name)
+
+    def box_count(self, image_name):
+        return self.box_counts.get(image_name, 0)
+
+    def compile(self, text, classes):
+        """Parse a filter expression into an ``ImageQuery``.
+
+        Terms are ``class=<name or id>``, ``class!=...``, ``boxes<op><n>``,
+        ``tag=<name>``, ``annotated``, ``unannotated`` or any other word, which matches file
+        names containing it. Terms may be prefixed with ``NOT`` and combined
+        with ``AND`` / ``OR`` (AND binds tighter). Raises ValueError on
+        malformed input.
+        """
+        groups = []
+        for group_text in re.split(r'\s+OR\s+', text.strip(), flags=re.IGNORECASE):
+            group = []
+            for term_text in re.split(r'\s+AND\s+', group_text, flags=re.IGNORECASE):
+                group.append(self._parse_term(term_text.strip(), classes))
+            groups.append(group)
+        return ImageQuery(self, groups)
+
+    def _parse_term(self, text, classes):
+        negate = False
+        if text.upper().startswith('NOT '):
+            negate = True
+            text = text[4:].strip()
+        if not text:
+            raise ValueError("Empty filter term")
+
+        lowered = text.lower()
+        if lowered in ('annotated', 'unannotated'):
+            return (lowered, None, None, negate)
+
+        match = _TERM_RE.match(text)
+        if not match:
+            return ('name', None, lowered, negate)
+
+        field, op, value = match.group(1).lower(), match.group(2), match.group(3).strip()
+        if field == 'tag':
+            if op not in ('=', '!='):
+                raise ValueError(f"Tags can only be compared with = or !=: {text}")
+            if value not in self.tags:
+                raise ValueError(f"Unknown tag: {value}")
+            return ('tag', None, value, negate != (op == '!='))
+        if field == 'class':
+            if op not in ('=', '!='):
+                raise ValueError(f"Classes can only be compared with = or !=: {text}")
+            if value.isdigit():
+                class_id = int(value)
+            else:
+                names = [name.lower() for name in classes]
+                if value.lower() not in names:
+                    raise ValueError(f"Unknown class: {value}")
+                class_id = names.index(value.lower())
+            return ('class', None, class_id, negate != (op == '!='))
+
+        if not value.isdigit():
+            raise ValueError(f"Box count must be a number: {text}")
+        return ('boxes', _COMPARISONS[op], int(value), negate)
+
+
+class ImageQuery:
+    """A compiled filter that can be evaluated for all images or a single one."""
+
+    def __init__(self, index, groups):
+        self.index = index
+        self.groups = groups
+
+    def _hit(self, term, image_name):
+        kind, compare, value, _ = term
+        index = self.index
+        if kind == 'class':
+            return value in index.image_classes.get(image_name, ())
+        if kind == 'tag':
+            return image_name in index.tags.get(value, ())
+        if kind == 'annotated':
+            return image_name in index.annotated
+        if kind == 'unannotated':
+            return image_name not in index.annotated
+        if kind == 'boxes':
+            return compare(index.box_counts.get(image_name, 0), value)
+        return value in image_name.lower()
+
+    def _seed(self, group, all_images):
+        """Pick the cheapest starting set for an AND group from the index."""
+        index = self.index
+        seeds = []
+        for term in group:
+            kind, compare, value, negate = term
+            if negate:
+                continue
+            if kind == 'class':
+                seeds.append((index.class_images.get(value, set()), term))
+            elif kind == 'tag':
+                seeds.append((index.tags.get(value, set()), term))
+            elif kind == 'annotated':
+                seeds.append((index.annotated, term))
+            elif kind == 'boxes' and not compare(0, value):
+                # Only annotated images can match, and box_counts holds exactly those
+                images = {name for name, count in index.box_counts.items() if compare(count, value)}
+                seeds.append((images, term))
+        if not seeds:
+            return all_images, None
+        images, term = min(seeds, key=lambda seed: len(seed[0]))
+        return images & all_images, term
+
+    def evaluate(self, all_images):
+        """Return the subset of the ``all_images`` set that matches the query."""
+        index = self.index
+        result = set()
+        for group in self.groups:
+            matched, seed_term = self._seed(group, all_images)
+            for term in group:
+                if term is seed_term or not matched:
+                    continue
+                kind, _, value, negate = term
+                if kind == 'unannotated':
+                    kind, negate = 'annotated', not negate
+                if kind in ('class', 'annotated', 'tag'):
+                    if kind == 'annotated':
+                        images = index.annotated
+                    elif kind == 'tag':
+                        images = index.tags.get(value, set())
+                    else:
+                        images = index.class_images.get(value, set())
+                    matched = matched - images if negate else matched & images
+                else:
+                    matched = {name for name in matched if self._hit(term, name) != negate}
+            result |= matched
+        return result
+
+    def matches(self, image_name):
+        return any(
+            all(self._hit(term, image_name) != term[3] for term in group)
+            for group in self.groups
+        )
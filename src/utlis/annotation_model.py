@@ -0,0 +1,88 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+
+class AnnotationListModel(QAbstractListModel):
+    """List model over the boxes of the current image.
+
+    The model reads the annotator's box list directly and formats rows only
+    when the view asks for them, so switching images does not touch every
+    box. The annotator edits the list itself and then reports the edit with
+    ``rows_inserted``, ``rows_changed`` or ``rows_removed``; the row count
+    is tracked separately so the begin/end notifications stay consistent
+    with what the view has already seen.
+    """
+
+    def __init__(self, colors=(), parent=None):
+        super().__init__(parent)
+        self.boxes = []
+        self.classes = []
+        self.colors = list(colors)
+        self._count = 0
+
+    def set_boxes(self, boxes, classes):
+        self.beginResetModel()
+        self.boxes = boxes
+        self.classes = classes
+        self._count = len(boxes)
+        self.endResetModel()
+
+    def set_classes(self, classes):
+        self.classes = classes
+        self.rows_changed(0, self._count - 1)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or row >= len(self.boxes):
+            return None
+        ann = self.boxes[row]
+        if role == Qt.DisplayRole:
+            class_id = ann['class']
+            class_name = self.classes[class_id] if 0 <= class_id < len(self.classes) else str(class_id)
+            x, y, w, h = ann['bbox'][:4]
+            return f"{row}: {class_name} [{x:.3f}, {y:.3f}, {w:.3f}, {h:.3f}]"
+        if role == Qt.DecorationRole and self.colors:
+            return QColor(self.colors[ann['class'] % len(self.colors)])
+        return None
+
+    def rows_inserted(self, first, last=None):
+        last = first if last is None else last
+        self.beginInsertRows(QModelIndex(), first, last)
+        self._count += last - first + 1
+        self.endInsertRows()
+        if last + 1 < self._count:
+            # Rows are labelled with their index, which shifts after an insert
+            self.rows_changed(last + 1, self._count - 1)
+
+    def rows_changed(self, first, last=None):
+        last = first if last is None else last
+        if self._count and first <= last:
+            self.dataChanged.emit(self.index(first), self.index(min(last, self._count - 1)))
+
+    def rows_removed(self, rows):
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        # Remove contiguous runs from the bottom up so earlier rows keep their index
+        runs = []
+        for row in rows:
+            if runs and row == runs[-1][1] + 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._count -= last - first + 1
+            self.endRemoveRows()
+        self.rows_changed(rows[0], self._count - 1)
@@ -0,0 +1,170 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import tarfile
+import threading
+import zipfile
+import zlib
+
+from PyQt5.QtGui import QImage
+
+from image_metadata import parse_image_header
+from tiff_source import open_tiled_tiff
+
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "labelsense", "archive")
+CACHE_VERSION = 1
+
+# Bytes of a member read to parse its image header
+HEADER_BYTES = 64 * 1024
+
+# Member record: name, data offset, stored size, size, method
+STORED = zipfile.ZIP_STORED
+DEFLATED = zipfile.ZIP_DEFLATED
+
+
+def _zip_members(path, extensions):
+    members = []
+    with open(path, "rb") as f, zipfile.ZipFile(f) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if (info.is_dir() or info.flag_bits & 0x1 or not name.lower().endswith(extensions)
+                    or name.startswith("__MACOSX/") or os.path.basename(name).startswith("._")):
+                continue
+            # The data starts after the local header, whose name and extra
+            # fields may differ in length from the central directory's.
+            f.seek(info.header_offset)
+            local = f.read(30)
+            if local[:4] != b"PK\x03\x04":
+                continue
+            name_length, extra_length = struct.unpack("<HH", local[26:30])
+            offset = info.header_offset + 30 + name_length + extra_length
+            members.append([name, offset, info.compress_size, info.file_size, info.compress_type])
+    return members
+
+
+def _tar_members(path, extensions):
+    members = []
+    with tarfile.open(path, "r:") as archive:
+        for info in archive:
+            if info.isfile() and info.name.lower().endswith(extensions):
+                members.append([info.name, info.offset_data, info.size, info.size, STORED])
+    return members
+
+
+def build_member_index(path, extensions, cache_dir=CACHE_DIR):
+    """Return the ``[name, offset, stored_size, size, method]`` records of the images in an archive.
+
+    Only the ZIP central directory or the tar headers are read. The index is
+    cached per archive under ``cache_dir`` keyed by path, mtime and size.
+    """
+    lower = path.lower()
+    if lower.endswith(ARCHIVE_EXTENSIONS[2:]):
+        raise ValueError("compressed tar archives cannot be read without unpacking them; "
+                         "repack as .tar or .zip")
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{','.join(extensions)}"
+    cache_path = os.path.join(cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+    try:
+        with open(cache_path, "r") as f:
+            data = json.load(f)
+        if data.get("version") == CACHE_VERSION:
+            return data["members"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    members = _zip_members(path, extensions) if lower.endswith(".zip") else _tar_members(path, extensions)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "members": members}, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return members
+
+
+class ArchiveSource:
+    """Images inside a ZIP or uncompressed tar, read without extracting the archive.
+
+    The archive is memory-mapped once. Stored members (every tar member and
+    ZIP entries without compression) are sliced straight out of the mapping;
+    deflated ZIP entries are inflated from their slice with zlib, and any
+    other compression goes through ``zipfile``. Reads are safe from several
+    threads. Members are keyed by their path in the archive.
+    """
+
+    def __init__(self, path, extensions, cache_dir=CACHE_DIR):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.members = {record[0]: record for record in build_member_index(path, tuple(extensions), cache_dir)}
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.members else None
+        self._zip = None
+        self._lock = threading.Lock()
+
+    def keys(self):
+        return list(self.members)
+
+    def read_bytes(self, member, limit=None):
+        """Return the content of ``member``, or only its first ``limit`` bytes."""
+        name, offset, stored, size, method = self.members[member]
+        if method == STORED:
+            end = offset + (size if limit is None else min(size, limit))
+            return self._map[offset:end]
+        if method == DEFLATED:
+            raw = self._map[offset:offset + stored]
+            if limit is None:
+                return zlib.decompress(raw, -zlib.MAX_WBITS)
+            return zlib.decompressobj(-zlib.MAX_WBITS).decompress(raw, limit)
+        with self._lock:
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.path)
+            data = self._zip.read(name)
+        return data if limit is None else data[:limit]
+
+    def read(self, member):
+        return QImage.fromData(self.read_bytes(member))
+
+    def open_tiled(self, member):
+        """Open a stored TIFF member for windowed reading (None for other members)."""
+        name, offset, stored, size, method = self.members[member]
+        if method != STORED:
+            return None
+
+        def read_range(start, length):
+            start = min(start, size)
+            return self._map[offset + start:offset + min(start + length, size)]
+
+        return open_tiled_tiff(name, read_range)
+
+    def size(self, member):
+        header = parse_image_header(io.BytesIO(self.read_bytes(member, HEADER_BYTES)), member)
+        return (header[0], header[1]) if header else None
+
+    def export_name(self, member):
+        return f"{os.path.splitext(self.name)[0]}_{member.replace('/', '_')}"
+
+    def export(self, member, path):
+        """Write the member's original bytes to ``path``, without re-encoding."""
+        with open(path, "wb") as f:
+            f.write(self.read_bytes(member))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._zip is not None:
+            self._zip.close()
+        self._file.close()
@@ -0,0 +1,264 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PyQt5.QtCore import QSize, QThread, Qt, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from review_grid import decode_thumbnail
+
+# Frames are tracked in grayscale, downscaled to fit this many pixels
+WORK_SIDE = 1024
+
+# Templates are block-averaged to about this size before matching; the
+# match is refined to sub-pixel precision from the correlation peak.
+TEMPLATE_SIDE = 32
+
+# The search window extends this fraction of the box size (at least
+# MIN_MARGIN pixels of the downscaled frame) beyond the box on every side.
+SEARCH_FACTOR = 0.5
+MIN_MARGIN = 8
+
+# Below this normalized cross-correlation the object is considered lost;
+# below REFRESH_SCORE the template is re-cut from the latest frame.
+MIN_SCORE = 0.6
+REFRESH_SCORE = 0.8
+
+# Proposals overlapping a box of the same class by more than this are dropped
+DUPLICATE_IOU = 0.5
+
+
+def to_gray(image):
+    """Return a QImage as a float32 grayscale array."""
+    image = image.convertToFormat(QImage.Format_Grayscale8)
+    width, height, stride = image.width(), image.height(), image.bytesPerLine()
+    bits = image.constBits()
+    bits.setsize(stride * height)
+    return np.frombuffer(bits, np.uint8).reshape(height, stride)[:, :width].astype(np.float32)
+
+
+def load_frame(path, reader=None):
+    """Decode one frame as a grayscale array no larger than WORK_SIDE.
+
+    ``reader()`` may return an already decoded QImage (a video frame or an
+    archive member) to use instead of decoding ``path``.
+    """
+    size = QSize(WORK_SIDE, WORK_SIDE)
+    image = reader() if reader is not None else None
+    if image is not None:
+        if max(image.width(), image.height()) > WORK_SIDE:
+            image = image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    else:
+        image = decode_thumbnail(path, size)
+    return None if image.isNull() else to_gray(image)
+
+
+def _fast_length(n):
+    """Smallest length >= n with no prime factors above 5, which pocketfft handles fastest."""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def _window_sums(image, th, tw):
+    sums = np.zeros((image.shape[0] + 1, image.shape[1] + 1))
+    sums[1:, 1:] = image.cumsum(0).cumsum(1)
+    return sums[th:, tw:] - sums[:-th, tw:] - sums[th:, :-tw] + sums[:-th, :-tw]
+
+
+def _peak_offset(before, peak, after):
+    curvature = before - 2 * peak + after
+    return 0.5 * (before - after) / curvature if curvature < 0 else 0.0
+
+
+def match_template(image, template, cache=None):
+    """Return ``(y, x, score)`` of the best normalized cross-correlation of ``template`` in ``image``.
+
+    The correlation is computed with FFTs and the per-window normalization
+    from integral images, so the cost does not grow with the template size.
+    ``y`` and ``x`` are refined to sub-pixel precision by fitting a parabola
+    through the peak. Returns None for a template without texture.
+
+    Matching the same template again, pass the same ``cache`` dict to reuse
+    its spectrum.
+    """
+    th, tw = template.shape
+    h, w = image.shape
+    if h < th or w < tw:
+        return None
+    cache = {} if cache is None else cache
+    if "norm" not in cache:
+        t = template - template.sum() / template.size
+        cache["zero_mean"], cache["norm"] = t, math.sqrt(float((t * t).sum()))
+    t_norm = cache["norm"]
+    if t_norm < 1e-3:
+        return None
+    shape = (_fast_length(h), _fast_length(w))
+    if shape not in cache:
+        cache[shape] = np.conj(np.fft.rfft2(cache["zero_mean"], shape))
+    corr = np.fft.irfft2(np.fft.rfft2(image, shape) * cache[shape], shape)[:h - th + 1, :w - tw + 1]
+
+    image = image.astype(np.float64)
+    window_sum = _window_sums(image, th, tw)
+    variance = _window_sums(image * image, th, tw) - window_sum * window_sum / (th * tw)
+    score = np.where(variance > 1e-3, corr / (np.sqrt(np.maximum(variance, 1e-3)) * t_norm), 0.0)
+    y, x = np.unravel_index(int(score.argmax()), score.shape)
+    peak = float(score[y, x])
+    dy = _peak_offset(score[y - 1, x], peak, score[y + 1, x]) if 0 < y < score.shape[0] - 1 else 0.0
+    dx = _peak_offset(score[y, x - 1], peak, score[y, x + 1]) if 0 < x < score.shape[1] - 1 else 0.0
+    return y + dy, x + dx, peak
+
+
+def block_factor(bbox, shape):
+    """Block size that brings the box down to about TEMPLATE_SIDE pixels in a frame of ``shape``."""
+    return max(1, math.ceil(max(bbox[2] * shape[1], bbox[3] * shape[0]) / TEMPLATE_SIDE))
+
+
+def downscale(frame, factor):
+    """Average ``factor`` x ``factor`` blocks of a frame (None stays None)."""
+    if frame is None or factor == 1:
+        return frame
+    h, w = frame.shape[0] // factor * factor, frame.shape[1] // factor * factor
+    return frame[:h, :w].reshape(h // factor, factor, w // factor, factor).mean(axis=(1, 3), dtype=np.float32)
+
+
+def _cut_template(frame, box_x, box_y, box_w, box_h):
+    """Return ``(template, anchor, cache)`` for a box, or None if too little of it is inside the frame.
+
+    ``anchor`` is the template's offset from the box corner, which differs
+    from zero where the box is clipped at the frame border; ``cache`` is
+    for ``match_template``.
+    """
+    h, w = frame.shape
+    x0, y0 = max(0, int(round(box_x))), max(0, int(round(box_y)))
+    x1, y1 = min(w, int(round(box_x + box_w))), min(h, int(round(box_y + box_h)))
+    if x1 - x0 < 4 or y1 - y0 < 4:
+        return None
+    return frame[y0:y1, x0:x1], (x0 - box_x, y0 - box_y), {}
+
+
+def _locate(frame, cut, box_x, box_y, min_score):
+    """Search for the template of ``cut`` around the box; returns the new box corner or None."""
+    template, anchor, cache = cut
+    h, w = frame.shape
+    th, tw = template.shape
+    margin = max(MIN_MARGIN, int(SEARCH_FACTOR * max(th, tw)))
+    tx, ty = int(round(box_x + anchor[0])), int(round(box_y + anchor[1]))
+    left, top = max(0, tx - margin), max(0, ty - margin)
+    match = match_template(frame[top:min(h, ty + th + margin), left:min(w, tx + tw + margin)], template, cache)
+    if match is None or match[2] < min_score:
+        return None
+    return left + match[1] - anchor[0], top + match[0] - anchor[1]
+
+
+def track_box(frames, bbox, scale):
+    """Follow a YOLO box from ``frames[0]`` through the following frames.
+
+    ``frames`` are the grayscale frames, downscaled so that the box is
+    about TEMPLATE_SIDE pixels, and ``scale`` is their ``(x, y)`` pixels
+    per unit of YOLO coordinates. The box keeps its size; its position is
+    found by template matching. The template is kept while it still
+    matches well and only re-cut from the latest frame when the object's
+    appearance has changed, so small matching errors do not add up into
+    drift. Returns one bbox per following frame, ending early where the
+    object is lost.
+    """
+    cx, cy, bw, bh = bbox[:4]
+    sx, sy = scale
+    track = []
+    cut = None
+    for previous, frame in zip(frames, frames[1:]):
+        if previous is None or frame is None or previous.shape != frame.shape:
+            break
+        box_x, box_y = (cx - bw / 2) * sx, (cy - bh / 2) * sy
+        found = None
+        if cut is not None:
+            found = _locate(frame, cut, box_x, box_y, REFRESH_SCORE)
+        if found is None:
+            cut = _cut_template(previous, box_x, box_y, bw * sx, bh * sy)
+            if cut is None:
+                break
+            found = _locate(frame, cut, box_x, box_y, MIN_SCORE)
+            if found is None:
+                break
+        cx = min(max(found[0] / sx + bw / 2, bw / 2), 1 - bw / 2)
+        cy = min(max(found[1] / sy + bh / 2, bh / 2), 1 - bh / 2)
+        track.append([float(cx), float(cy), bw, bh])
+    return track
+
+
+def box_iou(a, b):
+    ax0, ay0, ax1, ay1 = a[0] - a[2] / 2, a[1] - a[3] / 2, a[0] + a[2] / 2, a[1] + a[3] / 2
+    bx0, by0, bx1, by1 = b[0] - b[2] / 2, b[1] - b[3] / 2, b[0] + b[2] / 2, b[1] + b[3] / 2
+    inter = max(0.0, min(ax1, bx1) - max(ax0, bx0)) * max(0.0, min(ay1, by1) - max(ay0, by0))
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+class BoxPropagator(QThread):
+    """Tracks the boxes of one image through the images after it, off the GUI thread.
+
+    ``load(name)`` returns the grayscale frame of an image (see
+    ``load_frame``); an image that fails to load ends the tracks there.
+    Frames are decoded, downscaled once per block size in use and boxes
+    tracked in a thread pool; ``propagated`` carries ``({image name:
+    [proposed boxes]}, lost, seconds)`` where ``lost`` counts boxes that
+    were not followed to the last image. It is emitted even if tracking
+    fails, with the error in ``error``.
+    """
+
+    propagated = pyqtSignal(object, int, float)
+
+    def __init__(self, image_names, boxes, load, parent=None):
+        super().__init__(parent)
+        self.image_names = list(image_names)
+        self.boxes = [{'class': ann['class'], 'bbox': list(ann['bbox'][:4])} for ann in boxes]
+        self.load = load
+        self.error = None
+
+    def _load(self, name):
+        try:
+            return self.load(name)
+        except Exception:
+            return None  # unreadable image: tracks stop before it
+
+    def run(self):
+        start = time.perf_counter()
+        tracks = [[] for _ in self.boxes]
+        try:
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4)) as pool:
+                frames = list(pool.map(self._load, self.image_names))
+                if frames and frames[0] is not None:
+                    h, w = frames[0].shape
+                    factors = [block_factor(ann['bbox'], frames[0].shape) for ann in self.boxes]
+                    levels = {factor: list(pool.map(lambda frame, f=factor: downscale(frame, f), frames))
+                              for factor in set(factors)}
+                    tracks = list(pool.map(lambda ann, f: track_box(levels[f], ann['bbox'], (w / f, h / f)),
+                                           self.boxes, factors))
+        except Exception as e:
+            # Still emit, so the annotator can start another propagation
+            self.error = e
+            tracks = [[] for _ in self.boxes]
+
+        proposals = {}
+        lost = 0
+        for ann, track in zip(self.boxes, tracks):
+            lost += len(track) < len(self.image_names) - 1
+            for name, bbox in zip(self.image_names[1:], track):
+                proposals.setdefault(name, []).append({'class': ann['class'], 'bbox': bbox})
+        self.propagated.emit(proposals, lost, time.perf_counter() - start)
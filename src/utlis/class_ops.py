@@ -0,0 +1,107 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+from collections import Counter
+
+# Not a valid class id, so stale ids such as -1 are never mistaken for it
+DROP = None
+
+
+class ClassChange:
+    """A planned restructuring of the class list.
+
+    ``mapping[old_id]`` is the new id of every annotation that currently uses
+    ``old_id``, or ``DROP`` when those annotations are deleted. The change is
+    computed against the whole project in a single pass by ``preview``;
+    ``apply`` then commits it in place.
+    """
+
+    def __init__(self, new_classes, mapping, description=""):
+        self.new_classes = new_classes
+        self.mapping = mapping
+        self.description = description
+
+    @classmethod
+    def remove(cls, classes, class_id, reassign_to=None):
+        """Remove ``class_id``; its boxes are deleted or moved to ``reassign_to``."""
+        return cls.merge(classes, [class_id], reassign_to)
+
+    @classmethod
+    def merge(cls, classes, sources, target):
+        """Fold every class in ``sources`` into ``target`` and drop them from the list.
+
+        With ``target=None`` the source classes and their boxes are deleted.
+        The remaining ids are compacted so the list stays contiguous.
+        """
+        sources = set(sources) - {target}
+        new_classes = []
+        compacted = []
+        for old_id, name in enumerate(classes):
+            if old_id in sources:
+                compacted.append(DROP)
+            else:
+                compacted.append(len(new_classes))
+                new_classes.append(name)
+
+        mapping = [compacted[target] if (old_id in sources and target is not None) else new_id
+                   for old_id, new_id in enumerate(compacted)]
+        names = ", ".join(classes[i] for i in sorted(sources))
+        if target is None:
+            description = f"Remove {names}"
+        else:
+            description = f"Merge {names} into {classes[target]}"
+        return cls(new_classes, mapping, description)
+
+    def preview(self, annotations):
+        """Work out what the change does to ``annotations`` without modifying it.
+
+        Returns the counts shown to the user (boxes relabelled, boxes deleted,
+        images touched, boxes per old class id) together with the new ids of
+        every image that changes, which ``apply`` then commits. Boxes whose id
+        is already out of range (stale projects) keep it unchanged.
+        """
+        lookup = dict(enumerate(self.mapping))
+        per_class = Counter()
+        pending = []
+        changed = deleted = 0
+        for boxes in annotations.values():
+            ids = [ann['class'] for ann in boxes]
+            per_class.update(ids)
+            new_ids = [lookup.get(class_id, class_id) for class_id in ids]
+            if new_ids != ids:
+                pending.append((boxes, new_ids))
+                dropped = new_ids.count(DROP)
+                deleted += dropped
+                changed += sum(old != new for old, new in zip(ids, new_ids)) - dropped
+        return {
+            'changed': changed,
+            'deleted': deleted,
+            'images': len(pending),
+            'per_class': [per_class[i] for i in range(len(self.mapping))],
+            'pending': pending,
+        }
+
+    def apply(self, annotations, preview=None):
+        """Rewrite the class ids of every annotation in place.
+
+        All new ids are computed by ``preview`` before anything is touched;
+        the commit below only assigns integers and filters lists, so it cannot
+        fail half way. Pass the preview that was shown to the user to avoid a
+        second pass.
+        """
+        if preview is None:
+            preview = self.preview(annotations)
+        for boxes, new_ids in preview['pending']:
+            has_dropped = False
+            for ann, new_id in zip(boxes, new_ids):
+                if new_id is DROP:
+                    has_dropped = True
+                else:
+                    ann['class'] = new_id
+            if has_dropped:
+                boxes[:] = [ann for ann, new_id in zip(boxes, new_ids) if new_id is not DROP]
@@ -0,0 +1,138 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+ROW_GROUP_SIZE = 1_000_000
+
+_get_class = itemgetter('class')
+_get_bbox = itemgetter('bbox')
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet/Arrow export (pip install pyarrow)") from None
+    return pyarrow
+
+
+def annotation_schema(pa, with_size=False, image_dictionary=True):
+    image_type = pa.dictionary(pa.int32(), pa.string()) if image_dictionary else pa.string()
+    fields = [
+        pa.field("image", image_type),
+        pa.field("class_id", pa.int32()),
+        pa.field("class_name", pa.dictionary(pa.int32(), pa.string())),
+        pa.field("cx", pa.float64()),
+        pa.field("cy", pa.float64()),
+        pa.field("w", pa.float64()),
+        pa.field("h", pa.float64()),
+    ]
+    if with_size:
+        fields += [pa.field("image_width", pa.int32()), pa.field("image_height", pa.int32())]
+    return pa.schema(fields)
+
+
+class _BatchBuilder:
+    """Accumulates flat column values, one image at a time.
+
+    Per-image values (name, size) are stored once and expanded to rows with
+    ``np.repeat`` when the batch is built.
+    """
+
+    def __init__(self, with_size):
+        self.with_size = with_size
+        self.clear()
+
+    def clear(self):
+        self.names = []
+        self.counts = []
+        self.sizes = []
+        self.class_ids = []
+        self.coords = []
+
+    def __len__(self):
+        return len(self.class_ids)
+
+    def add(self, image_name, boxes, size=None):
+        self.names.append(image_name)
+        self.counts.append(len(boxes))
+        self.class_ids.extend(map(_get_class, boxes))
+        self.coords.extend(chain.from_iterable(map(_get_bbox, boxes)))
+        if self.with_size:
+            self.sizes.append(size or (0, 0))
+
+    def to_batch(self, pa, schema, class_names):
+        counts = np.array(self.counts, dtype=np.int64)
+        class_ids = np.array(self.class_ids, dtype=np.int32)
+        coords = np.array(self.coords, dtype=np.float64).reshape(-1, 4)
+        stale = (class_ids < 0) | (class_ids >= len(class_names))
+        image_ids = np.repeat(np.arange(len(self.names), dtype=np.int32), counts)
+        images = pa.DictionaryArray.from_arrays(image_ids, pa.array(self.names, pa.string()))
+        if not pa.types.is_dictionary(schema.field("image").type):
+            images = images.cast(pa.string())
+        columns = [
+            images,
+            pa.array(class_ids),
+            pa.DictionaryArray.from_arrays(pa.array(np.where(stale, 0, class_ids).astype(np.int32), mask=stale), class_names),
+        ]
+        columns += [pa.array(coords[:, i]) for i in range(4)]
+        if self.with_size:
+            sizes = np.repeat(np.array(self.sizes, dtype=np.int32).reshape(-1, 2), counts, axis=0)
+            for values in (sizes[:, 0], sizes[:, 1]):
+                columns.append(pa.array(values, mask=values == 0))
+        return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def export_columnar(path, annotations, classes, image_size=None,
+                    row_group_size=ROW_GROUP_SIZE, compression="zstd"):
+    """Write every box in ``annotations`` as one row of a columnar table.
+
+    ``.arrow`` / ``.feather`` paths are written as an Arrow IPC file, anything
+    else as Parquet. Rows are buffered as flat lists and flushed every
+    ``row_group_size`` boxes, so memory stays bounded by one row group.
+    ``image_size(name)`` may return ``(width, height)`` or None to add the
+    pixel dimensions of each image. Returns the number of rows written.
+    """
+    pa = _load_pyarrow()
+    arrow_ipc = path.lower().endswith((".arrow", ".feather"))
+    # Arrow IPC files allow one dictionary per column, but each batch has its own image names
+    schema = annotation_schema(pa, image_size is not None, image_dictionary=not arrow_ipc)
+    class_names = pa.array([str(name) for name in classes], pa.string())
+    if arrow_ipc:
+        writer = pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+    else:
+        writer = pa.parquet.ParquetWriter(path, schema, compression=compression)
+
+    builder = _BatchBuilder(image_size is not None)
+    rows = 0
+
+    def flush():
+        if arrow_ipc:
+            writer.write_batch(builder.to_batch(pa, schema, class_names))
+        else:
+            writer.write_batch(builder.to_batch(pa, schema, class_names), row_group_size=row_group_size)
+        builder.clear()
+
+    try:
+        for image_name, boxes in annotations.items():
+            if not boxes:
+                continue
+            builder.add(image_name, boxes, image_size(image_name) if image_size else None)
+            rows += len(boxes)
+            if len(builder) >= row_group_size:
+                flush()
+        if len(builder):
+            flush()
+    finally:
+        writer.close()
+    return rows
@@ -0,0 +1,296 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+CONF_THRESHOLD = 0.25
+WORST_COUNT = 100
+
+_get_class = itemgetter('class')
+_get_bbox = itemgetter('bbox')
+_EMPTY_PREDICTIONS = np.zeros((0, 6))
+
+
+def read_prediction_file(path):
+    """Read a YOLO prediction file as an ``(n, 6)`` array of class, cx, cy, w, h, conf.
+
+    Files without a confidence column get a confidence of 1. A missing file
+    means the model found nothing.
+    """
+    try:
+        with open(path, 'rb') as f:
+            lines = f.read().split(b'\n')
+    except FileNotFoundError:
+        return _EMPTY_PREDICTIONS
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return _EMPTY_PREDICTIONS
+    values = np.array(b' '.join(lines).split(), dtype=np.float64)
+    if len(values) == len(lines) * 5:
+        return np.hstack([values.reshape(-1, 5), np.ones((len(lines), 1))])
+    if len(values) != len(lines) * 6:
+        raise ValueError(f"Expected 5 or 6 values per line in {path}")
+    return values.reshape(-1, 6)
+
+
+def read_predictions(folder, image_names, workers=None, stem=None):
+    """Read the prediction file of every image in ``image_names`` from ``folder``.
+
+    ``stem(name)`` gives the label file name without ``.txt``; by default the
+    image name without its extension.
+    """
+    stem = stem or (lambda name: os.path.splitext(name)[0])
+    paths = [os.path.join(folder, stem(name) + '.txt') for name in image_names]
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(image_names, pool.map(read_prediction_file, paths, chunksize=256)))
+
+
+def _xyxy(boxes):
+    half = boxes[:, 2:4] / 2
+    return np.hstack([boxes[:, 0:2] - half, boxes[:, 0:2] + half])
+
+
+def _pairs(gt_key, pr_key):
+    """Every (prediction, ground truth) index pair that shares a key, without a Python loop."""
+    order = np.argsort(gt_key, kind='stable')
+    sorted_keys = gt_key[order]
+    starts = np.searchsorted(sorted_keys, pr_key, 'left')
+    counts = np.searchsorted(sorted_keys, pr_key, 'right') - starts
+    pred_idx = np.repeat(np.arange(len(pr_key)), counts)
+    offsets = np.cumsum(counts) - counts
+    gt_pos = np.arange(counts.sum()) + np.repeat(starts - offsets, counts)
+    return pred_idx, order[gt_pos]
+
+
+def _iou(a, b):
+    top_left = np.maximum(a[:, :2], b[:, :2])
+    bottom_right = np.minimum(a[:, 2:], b[:, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a + area_b - inter, 1e-12)
+
+
+def _candidates(pr_box, gt_box, pred_idx, gt_idx):
+    """Drop pairs below the lowest IoU threshold and sort the rest by decreasing IoU."""
+    iou = _iou(pr_box[pred_idx], gt_box[gt_idx])
+    keep = np.flatnonzero(iou >= IOU_THRESHOLDS[0])
+    keep = keep[np.argsort(-iou[keep], kind='stable')]
+    return pred_idx[keep], gt_idx[keep], iou[keep]
+
+
+def _match(pred_idx, gt_idx, iou, threshold):
+    """One-to-one matching of candidate pairs sorted by decreasing IoU.
+
+    Keeps the best pair per prediction and then per ground-truth box, the
+    same approximation of greedy matching the Ultralytics validator uses.
+    Pairs at or above ``threshold`` are a prefix of the sorted candidates.
+    """
+    count = np.searchsorted(-iou, -threshold, side='right')
+    pred_idx, gt_idx = pred_idx[:count], gt_idx[:count]
+    _, first = np.unique(pred_idx, return_index=True)
+    first.sort()
+    pred_idx, gt_idx = pred_idx[first], gt_idx[first]
+    _, first = np.unique(gt_idx, return_index=True)
+    return pred_idx[first], gt_idx[first]
+
+
+def _evaluate_shard(gt, pr, conf_threshold):
+    """Match predictions to ground truth for a contiguous range of images."""
+    gt_img, gt_cls, gt_box = gt
+    pr_img, pr_cls, pr_box, pr_conf = pr
+    num_keys = int(max(gt_cls.max(initial=0), pr_cls.max(initial=0))) + 1
+    confident = pr_conf >= conf_threshold
+
+    # Class-aware pairs give the TP table for AP and the per-image errors
+    pred_idx, gt_idx = _pairs(gt_img * num_keys + gt_cls, pr_img * num_keys + pr_cls)
+    pred_idx, gt_idx, iou = _candidates(pr_box, gt_box, pred_idx, gt_idx)
+    tp = np.zeros((len(pr_img), len(IOU_THRESHOLDS)), dtype=bool)
+    for column, threshold in enumerate(IOU_THRESHOLDS):
+        tp[_match(pred_idx, gt_idx, iou, threshold)[0], column] = True
+
+    ok = confident[pred_idx]
+    hit_pred, hit_gt = _match(pred_idx[ok], gt_idx[ok], iou[ok], IOU_THRESHOLDS[0])
+    tp_confident = np.zeros(len(pr_img), dtype=bool)
+    tp_confident[hit_pred] = True
+    gt_found = np.zeros(len(gt_img), dtype=bool)
+    gt_found[hit_gt] = True
+
+    # Class-agnostic pairs of confident predictions feed the confusion matrix
+    confident_idx = np.flatnonzero(confident)
+    pred_idx, gt_idx = _pairs(gt_img, pr_img[confident_idx])
+    pred_idx, gt_idx, iou = _candidates(pr_box, gt_box, confident_idx[pred_idx], gt_idx)
+    matched_pred, matched_gt = _match(pred_idx, gt_idx, iou, IOU_THRESHOLDS[0])
+    return tp, tp_confident, gt_found, matched_pred, matched_gt
+
+
+def _average_precision(tp, num_gt):
+    """COCO-style 101-point interpolated AP for each column of the sorted TP table."""
+    if num_gt == 0 or len(tp) == 0:
+        return np.zeros(tp.shape[1])
+    tp_sum = np.cumsum(tp, axis=0)
+    fp_sum = np.cumsum(~tp, axis=0)
+    recall = tp_sum / num_gt
+    precision = tp_sum / (tp_sum + fp_sum)
+    # Precision envelope: best precision at any recall at least this high
+    precision = np.flip(np.maximum.accumulate(np.flip(precision, axis=0), axis=0), axis=0)
+    points = np.linspace(0, 1, 101)
+    ap = np.zeros(tp.shape[1])
+    for column in range(tp.shape[1]):
+        index = np.searchsorted(recall[:, column], points, side='left')
+        valid = index < len(recall)
+        ap[column] = precision[index[valid], column].sum() / len(points)
+    return ap
+
+
+class EvaluationResult:
+    def __init__(self, classes, per_class, confusion, worst, image_count, seconds):
+        self.classes = classes
+        self.per_class = per_class
+        self.confusion = confusion
+        self.worst = worst
+        self.image_count = image_count
+        self.seconds = seconds
+
+    @property
+    def map50(self):
+        scored = [row['ap50'] for row in self.per_class if row['gt']]
+        return float(np.mean(scored)) if scored else 0.0
+
+    @property
+    def map(self):
+        scored = [row['ap'] for row in self.per_class if row['gt']]
+        return float(np.mean(scored)) if scored else 0.0
+
+    def report(self):
+        """Plain-text tables of the per-class metrics and the confusion matrix."""
+        width = max([len(name) for name in self.classes] + [10])
+        lines = [
+            f"{self.image_count} images evaluated in {self.seconds:.2f} s",
+            f"mAP50 {self.map50:.3f}   mAP50-95 {self.map:.3f}",
+            "",
+            f"{'Class':<{width}} {'GT':>8} {'Pred':>8} {'P':>7} {'R':>7} {'AP50':>7} {'AP50-95':>8}",
+        ]
+        for row in self.per_class:
+            if row['gt'] or row['pred']:
+                lines.append(f"{row['name']:<{width}} {row['gt']:>8} {row['pred']:>8} {row['precision']:>7.3f} "
+                             f"{row['recall']:>7.3f} {row['ap50']:>7.3f} {row['ap']:>8.3f}")
+
+        labels = [name[:8] for name in self.classes] + ["(none)"]
+        lines += ["", "Confusion matrix at IoU 0.5 (rows: ground truth, columns: predicted)",
+                  " " * width + "".join(f"{label:>9}" for label in labels)]
+        for label, row in zip(self.classes + ["(none)"], self.confusion):
+            if row.any():
+                lines.append(f"{label:<{width}}" + "".join(f"{int(value):>9}" for value in row))
+
+        if self.worst:
+            name_width = max(len(name) for name, *_ in self.worst)
+            lines += ["", "Worst images (false positives + false negatives at IoU 0.5)",
+                      f"{'Image':<{name_width}} {'FP':>6} {'FN':>6} {'GT':>6}"]
+            for name, false_pos, false_neg, num_gt in self.worst:
+                lines.append(f"{name:<{name_width}} {false_pos:>6} {false_neg:>6} {num_gt:>6}")
+        return "\n".join(lines)
+
+
+def evaluate(annotations, predictions, classes, conf_threshold=CONF_THRESHOLD,
+             worst_count=WORST_COUNT, workers=None):
+    """Compare ``predictions`` against the ground truth in ``annotations``.
+
+    ``predictions`` maps image names to arrays from ``read_prediction_file``.
+    All images are flattened into a few numpy arrays and split into
+    contiguous shards; candidate pairs, IoUs and matches are computed per
+    shard in a thread pool (numpy releases the GIL for the heavy work) and
+    the AP curves are computed per class over the merged results.
+    """
+    start = time.perf_counter()
+    names = list(annotations)
+    gt_counts = np.array([len(annotations[name]) for name in names], dtype=np.int64)
+    gt_img = np.repeat(np.arange(len(names)), gt_counts)
+    gt_boxes = list(chain.from_iterable(annotations[name] for name in names))
+    gt_cls = np.fromiter(map(_get_class, gt_boxes), dtype=np.int64, count=len(gt_boxes))
+    gt_box = np.array(list(chain.from_iterable(map(_get_bbox, gt_boxes))), dtype=np.float64).reshape(-1, 4)
+    del gt_boxes
+
+    pred_arrays = [predictions.get(name, _EMPTY_PREDICTIONS) for name in names]
+    pr_counts = np.array([len(array) for array in pred_arrays], dtype=np.int64)
+    pr = np.concatenate(pred_arrays) if pred_arrays else _EMPTY_PREDICTIONS
+    pr_img = np.repeat(np.arange(len(names)), pr_counts)
+    pr_cls = pr[:, 0].astype(np.int64)
+    pr_box = pr[:, 1:5]
+    pr_conf = pr[:, 5]
+    gt_xyxy, pr_xyxy = _xyxy(gt_box), _xyxy(pr_box)
+
+    # Contiguous image ranges, so shard slices never split an image
+    workers = workers or os.cpu_count() or 1
+    bounds = np.linspace(0, len(names), min(workers, max(len(names), 1)) + 1).astype(np.int64)
+    gt_ends, pr_ends = np.concatenate([[0], np.cumsum(gt_counts)]), np.concatenate([[0], np.cumsum(pr_counts)])
+    shards = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        g, p = slice(gt_ends[lo], gt_ends[hi]), slice(pr_ends[lo], pr_ends[hi])
+        shards.append((g, p, (gt_img[g], gt_cls[g], gt_xyxy[g]), (pr_img[p], pr_cls[p], pr_xyxy[p], pr_conf[p])))
+
+    tp = np.zeros((len(pr), len(IOU_THRESHOLDS)), dtype=bool)
+    tp_confident = np.zeros(len(pr), dtype=bool)
+    gt_found = np.zeros(len(gt_cls), dtype=bool)
+    matched_pred, matched_gt = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda shard: _evaluate_shard(shard[2], shard[3], conf_threshold), shards)
+        for (g, p, _, _), (shard_tp, shard_tp_conf, shard_found, shard_pred, shard_gt) in zip(shards, results):
+            tp[p], tp_confident[p], gt_found[g] = shard_tp, shard_tp_conf, shard_found
+            matched_pred.append(shard_pred + p.start)
+            matched_gt.append(shard_gt + g.start)
+    matched_pred = np.concatenate(matched_pred) if matched_pred else np.zeros(0, dtype=np.int64)
+    matched_gt = np.concatenate(matched_gt) if matched_gt else np.zeros(0, dtype=np.int64)
+
+    num_classes = int(max(len(classes), gt_cls.max(initial=-1) + 1, pr_cls.max(initial=-1) + 1))
+    class_names = [classes[i] if i < len(classes) else str(i) for i in range(num_classes)]
+    confident = pr_conf >= conf_threshold
+    order = np.argsort(-pr_conf, kind='stable')
+    per_class = []
+    for class_id, name in enumerate(class_names):
+        class_order = order[pr_cls[order] == class_id]
+        num_gt = int(np.count_nonzero(gt_cls == class_id))
+        ap = _average_precision(tp[class_order], num_gt)
+        predicted = int(np.count_nonzero(confident[class_order]))
+        correct = int(np.count_nonzero(tp_confident[class_order]))
+        per_class.append({
+            'name': name,
+            'gt': num_gt,
+            'pred': predicted,
+            'precision': correct / predicted if predicted else 0.0,
+            'recall': correct / num_gt if num_gt else 0.0,
+            'ap50': float(ap[0]),
+            'ap': float(ap.mean()),
+        })
+
+    background = num_classes
+    confusion = np.zeros((num_classes + 1, num_classes + 1), dtype=np.int64)
+    np.add.at(confusion, (gt_cls[matched_gt], pr_cls[matched_pred]), 1)
+    missed = np.ones(len(gt_cls), dtype=bool)
+    missed[matched_gt] = False
+    np.add.at(confusion, (gt_cls[missed], background), 1)
+    spurious = confident.copy()
+    spurious[matched_pred] = False
+    np.add.at(confusion, (background, pr_cls[spurious]), 1)
+
+    false_pos = np.bincount(pr_img[confident & ~tp_confident], minlength=len(names))
+    false_neg = np.bincount(gt_img[~gt_found], minlength=len(names))
+    errors = false_pos + false_neg
+    worst = [
+        (names[i], int(false_pos[i]), int(false_neg[i]), int(gt_counts[i]))
+        for i in np.argsort(-errors, kind='stable')[:worst_count] if errors[i]
+    ]
+    return EvaluationResult(class_names, per_class, confusion, worst, len(names), time.perf_counter() - start)
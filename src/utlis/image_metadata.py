@@ -0,0 +1,256 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QImageReader
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "labelsense", "metadata")
+CACHE_VERSION = 1
+
+# Fields of a metadata record, in the order they are stored in the cache file
+FIELDS = ("width", "height", "format", "bands", "bit_depth")
+
+_PNG_BANDS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+_TIFF_TYPES = {3: ("H", 2), 4: ("I", 4)}
+
+
+def _read_png(f):
+    data = f.read(29)
+    if data[:8] != b"\x89PNG\r\n\x1a\n" or data[12:16] != b"IHDR":
+        return None
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", data[16:26])
+    return width, height, "png", _PNG_BANDS.get(color_type, 0), bit_depth
+
+
+def _read_jpeg(f):
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        # SOF0..SOF15 carry the frame size, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            bit_depth, height, width, bands = struct.unpack(">BHHB", f.read(6))
+            return width, height, "jpeg", bands, bit_depth
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_bmp(f):
+    data = f.read(30)
+    if data[:2] != b"BM" or len(data) < 30:
+        return None
+    header_size = struct.unpack("<I", data[14:18])[0]
+    if header_size == 12:
+        width, height, _, bit_count = struct.unpack("<HHHH", data[18:26])
+    else:
+        width, height, _, bit_count = struct.unpack("<iiHH", data[18:30])
+    bands = 4 if bit_count == 32 else 3 if bit_count >= 16 else 1
+    return width, abs(height), "bmp", bands, min(bit_count, 8)
+
+
+def read_tiff_tags(f, wanted):
+    """Return ``{tag: value}`` for the ``wanted`` tags of the first TIFF IFD.
+
+    Single values are returned as ints, multi-valued tags as tuples. Values
+    that do not fit in the entry are followed to their offset. Returns None
+    if the file is not a TIFF.
+    """
+    header = f.read(8)
+    if header[:4] == b"II*\x00":
+        endian = "<"
+    elif header[:4] == b"MM\x00*":
+        endian = ">"
+    else:
+        return None
+    offset = struct.unpack(endian + "I", header[4:8])[0]
+    f.seek(offset)
+    count = struct.unpack(endian + "H", f.read(2))[0]
+    entries = f.read(count * 12)
+    tags = {}
+    for i in range(count):
+        tag, type_, n, raw = struct.unpack(endian + "HHI4s", entries[i * 12:(i + 1) * 12])
+        if tag not in wanted or type_ not in _TIFF_TYPES:
+            continue
+        code, size = _TIFF_TYPES[type_]
+        if n * size <= 4:
+            values = struct.unpack(endian + code * n, raw[:n * size])
+        else:
+            here = f.tell()
+            f.seek(struct.unpack(endian + "I", raw)[0])
+            values = struct.unpack(endian + code * n, f.read(n * size))
+            f.seek(here)
+        tags[tag] = values[0] if n == 1 else values
+    return tags
+
+
+def _read_tiff(f):
+    tags = read_tiff_tags(f, {256, 257, 258, 277})
+    if not tags or 256 not in tags or 257 not in tags:
+        return None
+    bits = tags.get(258, 1)
+    bit_depth = bits[0] if isinstance(bits, tuple) else bits
+    return tags[256], tags[257], "tiff", tags.get(277, 1), bit_depth
+
+
+_PARSERS = {
+    ".png": _read_png,
+    ".jpg": _read_jpeg,
+    ".jpeg": _read_jpeg,
+    ".bmp": _read_bmp,
+    ".tif": _read_tiff,
+    ".tiff": _read_tiff,
+}
+
+
+def parse_image_header(f, name):
+    """Parse the header of an open binary file; the parser is chosen by the extension of ``name``."""
+    parser = _PARSERS.get(os.path.splitext(name)[1].lower())
+    if parser:
+        try:
+            return parser(f)
+        except (OSError, struct.error):
+            pass
+    return None
+
+
+def read_image_header(path):
+    """Read ``(width, height, format, bands, bit_depth)`` from the file header only.
+
+    Falls back to QImageReader, which also stops at the header for the formats
+    Qt supports, when there is no parser for the extension or parsing fails.
+    Returns None when the size cannot be determined.
+    """
+    if os.path.splitext(path)[1].lower() in _PARSERS:
+        try:
+            with open(path, "rb") as f:
+                result = parse_image_header(f, path)
+            if result:
+                return result
+        except OSError:
+            pass
+
+    reader = QImageReader(path)
+    size = reader.size()
+    if not size.isValid():
+        return None
+    image_format = bytes(reader.format()).decode(errors="replace")
+    return size.width(), size.height(), image_format, 0, 8
+
+
+class MetadataCache:
+    """Per-folder cache of image header metadata keyed by file mtime and size.
+
+    The cache lives under ``~/.cache/labelsense`` so image folders are never
+    written to. ``scan`` only re-reads files whose mtime or size changed.
+    """
+
+    def __init__(self, folder, cache_dir=CACHE_DIR):
+        self.folder = folder
+        digest = hashlib.sha1(os.path.abspath(folder).encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"{digest}.json")
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION and data.get("folder") == os.path.abspath(self.folder):
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        # Scans of the same folder may overlap, so each writes its own temporary file
+        tmp_path = f"{self.path}.{os.getpid()}-{id(self)}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "version": CACHE_VERSION,
+                    "folder": os.path.abspath(self.folder),
+                    "entries": self.entries,
+                }, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # the cache is rebuilt from the headers next time
+
+    def get(self, name):
+        """Return the metadata of ``name`` as a dict, or None if it is not known."""
+        entry = self.entries.get(name)
+        if not entry or entry[2] is None:
+            return None
+        return dict(zip(FIELDS, entry[2:]))
+
+    def _refresh(self, names):
+        results = []
+        for name in names:
+            path = os.path.join(self.folder, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            cached = self.entries.get(name)
+            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                results.append((name, cached))
+                continue
+            header = read_image_header(path)
+            results.append((name, [st.st_mtime_ns, st.st_size] + list(header if header else (None,) * len(FIELDS))))
+        return results
+
+    def scan(self, names, workers=None):
+        """Bring the cache up to date for ``names``; returns the number of files read.
+
+        Stat calls and header reads run in a thread pool, since both spend
+        most of their time waiting on the file system.
+        """
+        workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        names = list(names)
+        chunks = [names[i:i + 256] for i in range(0, len(names), 256)]
+        read = 0
+        entries = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for results in pool.map(self._refresh, chunks):
+                for name, entry in results:
+                    if entry is not self.entries.get(name):
+                        read += 1
+                    entries[name] = entry
+        changed = read or len(entries) != len(self.entries)
+        self.entries = entries
+        if changed:
+            self.save()
+        return read
+
+
+class MetadataScanner(QThread):
+    """Runs ``MetadataCache.scan`` off the GUI thread."""
+
+    scanned = pyqtSignal(object, int, float)
+
+    def __init__(self, folder, names, parent=None):
+        super().__init__(parent)
+        self.folder = folder
+        self.names = list(names)
+
+    def run(self):
+        start = time.perf_counter()
+        cache = MetadataCache(self.folder)
+        read = cache.scan(self.names)
+        self.scanned.emit(cache, read, time.perf_counter() - start)
@@ -0,0 +1,78 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Milliseconds without further edits before changed labels are written
+LABEL_SYNC_DELAY = 300
+
+
+def format_labels(boxes):
+    """Return the YOLO label file content for one image's boxes."""
+    return "".join(f"{ann['class']} {ann['bbox'][0]} {ann['bbox'][1]} {ann['bbox'][2]} {ann['bbox'][3]}\n"
+                   for ann in boxes)
+
+
+class LabelWriter:
+    """Writes label files on one background thread.
+
+    Each file is written to a temporary file next to it and renamed over
+    the old one, so a training job never reads a half-written label.
+    Writes still queued for the same path are coalesced: only the newest
+    content is written. A content of None deletes the file.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self.written = 0
+        self.last_error = None
+
+    def submit(self, path, text):
+        with self._lock:
+            self._pending[path] = text
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._writer.submit(self._write_pending)
+
+    def _write_pending(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._scheduled = False
+                    return
+                path, text = self._pending.popitem()
+            try:
+                if text is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    tmp_path = path + ".tmp"
+                    with open(tmp_path, "w") as f:
+                        f.write(text)
+                    os.replace(tmp_path, path)
+                self.written += 1
+            except OSError as e:
+                self.last_error = e
+
+    def busy(self):
+        """Return True while submitted writes are still being written."""
+        with self._lock:
+            return self._scheduled
+
+    def flush(self):
+        """Block until every submitted write is on disk."""
+        self._writer.submit(lambda: None).result()
+
+    def close(self):
+        self._writer.shutdown(wait=True)
@@ -0,0 +1,145 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtGui import QImage
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "labelsense", "pixels")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Images that decode faster than this are cheaper to decode than to cache
+MIN_DECODE_MS = 40
+
+_MAGIC = b"LSPX0001"
+_HEADER = struct.Struct("<8sIIII")
+
+
+class PixelCache:
+    """Disk cache of decoded images stored as raw, memory-mapped pixel files.
+
+    ``get`` maps the cached file and wraps it in a QImage without copying, so
+    re-opening an image costs about as much as reading it from the page cache.
+    Entries are keyed by path, mtime and size, and the least recently used
+    files are deleted once the cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._sizes = {}
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith(".px"):
+                self._sizes[entry.path] = entry.stat().st_size
+        self._total = sum(self._sizes.values())
+
+    def _entry_path(self, image_path):
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(image_path)}|{st.st_mtime_ns}|{st.st_size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".px")
+
+    def get(self, image_path):
+        """Return the cached QImage for ``image_path`` or None on a miss."""
+        entry_path = self._entry_path(image_path)
+        if entry_path is None or entry_path not in self._sizes:
+            return None
+        try:
+            with open(entry_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            self._forget(entry_path)
+            return None
+
+        magic, width, height, bytes_per_line, image_format = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or len(mapped) < _HEADER.size + bytes_per_line * height:
+            mapped.close()
+            self._forget(entry_path)
+            return None
+        try:
+            os.utime(entry_path)  # mtime doubles as the LRU timestamp
+        except OSError:
+            # Evicted or made read-only meanwhile; treat it as a miss
+            mapped.close()
+            self._forget(entry_path)
+            return None
+
+        pixels = memoryview(mapped)[_HEADER.size:]
+        image = QImage(pixels, width, height, bytes_per_line, QImage.Format(image_format))
+        # The QImage points into the mapping; keep it alive as long as the image
+        image._mapped = (mapped, pixels)
+        return image
+
+    def put(self, image_path, image):
+        """Store a decoded image. Non-32-bit formats are converted first."""
+        entry_path = self._entry_path(image_path)
+        if entry_path is None or image.isNull():
+            return
+        if image.format() not in (QImage.Format_RGB32, QImage.Format_ARGB32):
+            image = image.convertToFormat(
+                QImage.Format_ARGB32 if image.hasAlphaChannel() else QImage.Format_RGB32)
+
+        pixels = image.constBits()
+        pixels.setsize(image.bytesPerLine() * image.height())
+        tmp_path = entry_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, image.width(), image.height(),
+                                     image.bytesPerLine(), int(image.format())))
+                f.write(pixels)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            size = os.path.getsize(entry_path)
+            self._total += size - self._sizes.get(entry_path, 0)
+            self._sizes[entry_path] = size
+        self.evict()
+
+    def put_async(self, image_path, image):
+        """Queue ``put`` on a background writer so the GUI does not wait for the disk."""
+        self._writer.submit(self.put, image_path, image)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            by_age = sorted(self._sizes, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+            for path in by_age:
+                if self._total <= self.max_bytes:
+                    break
+                self._forget(path, locked=True)
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._sizes):
+                self._forget(path, locked=True)
+
+    def _forget(self, path, locked=False):
+        if not locked:
+            with self._lock:
+                return self._forget(path, locked=True)
+        self._total -= self._sizes.pop(path, 0)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
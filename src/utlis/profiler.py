@@ -0,0 +1,167 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Upper bounds in milliseconds of the histogram buckets; the last bucket is open.
+HISTOGRAM_BUCKETS_MS = (1, 2, 4, 8, 16, 33, 66, 133, 266)
+
+
+class LatencyStats:
+    """Rolling window of the most recent samples of one instrumented section."""
+
+    def __init__(self, window=500):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.count += 1
+
+    @property
+    def last(self):
+        return self.samples[-1] if self.samples else 0.0
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def histogram(self):
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for ms in self.samples:
+            for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if ms <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+
+class Profiler:
+    """Lightweight timing hooks for the canvas.
+
+    ``timed(name)`` wraps a function and records its latency; ``hit`` and
+    ``miss`` count cache lookups. While a capture is running every timed call
+    is also recorded as a trace event and, optionally, under cProfile so one
+    interaction can be dumped for offline analysis.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.cache_counts = {}
+        self._trace = None
+        self._cprofile = None
+        self._capture_start = 0.0
+
+    def timed(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, start, time.perf_counter())
+            return wrapper
+        return decorator
+
+    def record(self, name, start, end):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = LatencyStats()
+        stats.add((end - start) * 1000)
+        if self._trace is not None:
+            self._trace.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._capture_start) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            })
+
+    def hit(self, cache):
+        self.cache_counts.setdefault(cache, [0, 0])[0] += 1
+
+    def miss(self, cache):
+        self.cache_counts.setdefault(cache, [0, 0])[1] += 1
+
+    def hit_rate(self, cache):
+        hits, misses = self.cache_counts.get(cache, (0, 0))
+        total = hits + misses
+        return hits / total if total else 0.0
+
+    def reset(self):
+        self.stats.clear()
+        self.cache_counts.clear()
+
+    def summary_lines(self):
+        lines = []
+        for name, stats in sorted(self.stats.items()):
+            lines.append(f"{name}: {stats.last:.1f} ms (p50 {stats.percentile(50):.1f}, "
+                         f"p95 {stats.percentile(95):.1f}, n={stats.count})")
+        for cache in sorted(self.cache_counts):
+            hits, misses = self.cache_counts[cache]
+            lines.append(f"{cache} cache: {self.hit_rate(cache) * 100:.0f}% hit ({hits}/{hits + misses})")
+        return lines
+
+    @property
+    def capturing(self):
+        return self._trace is not None
+
+    def start_capture(self, with_cprofile=True):
+        self._trace = []
+        self._capture_start = time.perf_counter()
+        if with_cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop_capture(self, path):
+        """Write the capture as trace-event JSON to ``path`` (plus ``.prof`` for cProfile).
+
+        The JSON opens in chrome://tracing or Perfetto; the ``.prof`` file in
+        ``pstats`` or snakeviz. Returns the list of files written.
+        """
+        trace, self._trace = self._trace or [], None
+        # Stop profiling before anything that can fail, so a bad path cannot
+        # leave cProfile running for the rest of the session
+        cprofile, self._cprofile = self._cprofile, None
+        if cprofile is not None:
+            cprofile.disable()
+        histograms = {
+            name: dict(zip([f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + ["slower"], stats.histogram()))
+            for name, stats in self.stats.items()
+        }
+        written = []
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms",
+                       "otherData": {"histograms": histograms, "caches": self.cache_counts}}, f)
+        written.append(path)
+        if cprofile is not None:
+            prof_path = os.path.splitext(path)[0] + ".prof"
+            cprofile.dump_stats(prof_path)
+            written.append(prof_path)
+        return written
+
+    def cancel_capture(self):
+        self._trace = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile = None
+
+
+profiler = Profiler()
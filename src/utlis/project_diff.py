@@ -0,0 +1,380 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+
+Compare and merge LabelSense project files without loading them whole:
+
+    python project_diff.py diff old.json new.json
+    python project_diff.py merge -o merged.json --policy union a.json b.json c.json
+"""
+
+import argparse
+import json
+import re
+import sys
+
+import numpy as np
+
+CHUNK_SIZE = 1024 * 1024
+IOU_THRESHOLD = 0.5
+POLICIES = ("union", "ours", "theirs")
+
+# Matched boxes whose coordinates differ by less than this count as unchanged
+COORD_TOLERANCE = 1e-6
+
+_decoder = json.JSONDecoder()
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+
+
+class _Scanner:
+    """Incremental tokenizer over a JSON file read in chunks.
+
+    The bytes are decoded as latin-1, which maps every byte to one
+    character, so positions in the buffer are byte offsets in the file.
+    Values containing non-ASCII text are decoded again as UTF-8.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.base = 0
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk.decode("latin-1")
+        self.base += self.pos
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            match = _NON_WHITESPACE.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at byte {self.base + self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next value; returns ``(value, start, end)`` with byte offsets."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            break
+        text = self.buf[self.pos:end]
+        if not text.isascii():
+            value = json.loads(text.encode("latin-1").decode("utf-8"))
+        start = self.base + self.pos
+        self.pos = end
+        return value, start, self.base + end
+
+
+def _walk(f):
+    """Yield ``('field', key, value)`` for top-level fields and ``('image', name, boxes, start, end)`` per image."""
+    scanner = _Scanner(f)
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+    while True:
+        key = scanner.value()[0]
+        scanner.expect(":")
+        if key == "annotations" and scanner.peek() == "{":
+            scanner.expect("{")
+            if scanner.peek() == "}":
+                scanner.pos += 1
+            else:
+                while True:
+                    name = scanner.value()[0]
+                    scanner.expect(":")
+                    boxes, start, end = scanner.value()
+                    yield "image", name, boxes, start, end
+                    separator = scanner.peek()
+                    scanner.pos += 1
+                    if separator == "}":
+                        break
+                    if separator != ",":
+                        raise ValueError(f"Expected ',' or '}}' at byte {scanner.base + scanner.pos - 1}")
+        else:
+            yield "field", key, scanner.value()[0]
+        separator = scanner.peek()
+        scanner.pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' at byte {scanner.base + scanner.pos - 1}")
+
+
+class ProjectReader:
+    """Streams the images of a project file one at a time.
+
+    ``header`` holds every field except the annotations. ``index`` keeps
+    only the byte range of each image's box list, so ``read`` can fetch any
+    image later without holding the boxes of the whole project.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header = {}
+        self._index = None
+        with open(path, "rb") as f:
+            for item in _walk(f):
+                if item[0] == "field":
+                    self.header[item[1]] = item[2]
+                elif "classes" in self.header:
+                    break  # the usual layout: everything else precedes the annotations
+        self.classes = [str(name) for name in self.header.get("classes", [])]
+
+    def images(self):
+        with open(self.path, "rb") as f:
+            for item in _walk(f):
+                if item[0] == "image":
+                    yield item[1], item[2]
+
+    def index(self):
+        if self._index is None:
+            with open(self.path, "rb") as f:
+                self._index = {item[1]: (item[3], item[4]) for item in _walk(f) if item[0] == "image"}
+        return self._index
+
+    def read(self, name, f):
+        """Return the boxes of ``name`` (None if absent), reading through the open file ``f``."""
+        span = self.index().get(name)
+        if span is None:
+            return None
+        f.seek(span[0])
+        return json.loads(f.read(span[1] - span[0]).decode("utf-8"))
+
+
+def unify_classes(class_lists):
+    """Return the combined class list and, per input list, the id remap into it (by class name)."""
+    classes = []
+    ids = {}
+    remaps = []
+    for names in class_lists:
+        remap = []
+        for name in names:
+            if name not in ids:
+                ids[name] = len(classes)
+                classes.append(name)
+            remap.append(ids[name])
+        remaps.append(remap)
+    return classes, remaps
+
+
+def remap_boxes(boxes, remap):
+    if all(old == new for old, new in enumerate(remap)):
+        return boxes
+    return [{**ann, 'class': remap[ann['class']]} if 0 <= ann['class'] < len(remap) else ann
+            for ann in boxes]
+
+
+def _iou_matrix(a, b):
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    a_min, a_max = a[:, None, :2] - a[:, None, 2:] / 2, a[:, None, :2] + a[:, None, 2:] / 2
+    b_min, b_max = b[None, :, :2] - b[None, :, 2:] / 2, b[None, :, :2] + b[None, :, 2:] / 2
+    inter = np.prod(np.clip(np.minimum(a_max, b_max) - np.maximum(a_min, b_min), 0, None), axis=2)
+    union = np.prod(a[:, None, 2:], axis=2) + np.prod(b[None, :, 2:], axis=2) - inter
+    return inter / np.maximum(union, 1e-12)
+
+
+def match_boxes(a, b, iou_threshold=IOU_THRESHOLD):
+    """Greedy one-to-one matching of two box lists by decreasing IoU, ignoring classes.
+
+    Returns ``(pairs, unmatched_a, unmatched_b)`` with indices into ``a`` and ``b``.
+    """
+    if not a or not b:
+        return [], list(range(len(a))), list(range(len(b)))
+    iou = _iou_matrix([ann['bbox'][:4] for ann in a], [ann['bbox'][:4] for ann in b])
+    rows, cols = np.nonzero(iou >= iou_threshold)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    used_a, used_b = set(), set()
+    pairs = []
+    for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+        if i not in used_a and j not in used_b:
+            used_a.add(i)
+            used_b.add(j)
+            pairs.append((i, j))
+    return (pairs, [i for i in range(len(a)) if i not in used_a],
+            [j for j in range(len(b)) if j not in used_b])
+
+
+def diff_boxes(a, b, iou_threshold=IOU_THRESHOLD):
+    """Classify the changes from box list ``a`` to ``b``.
+
+    Returns a dict of counts: ``added``, ``removed``, ``moved`` (matched but
+    coordinates changed), ``relabeled`` (matched, class changed) and
+    ``unchanged``. Class ids must already refer to the same class list.
+    """
+    if a == b:
+        return {"added": 0, "removed": 0, "moved": 0, "relabeled": 0, "unchanged": len(a)}
+    pairs, removed, added = match_boxes(a, b, iou_threshold)
+    counts = {"added": len(added), "removed": len(removed), "moved": 0, "relabeled": 0, "unchanged": 0}
+    for i, j in pairs:
+        relabeled = a[i]['class'] != b[j]['class']
+        moved = max(abs(p - q) for p, q in zip(a[i]['bbox'][:4], b[j]['bbox'][:4])) > COORD_TOLERANCE
+        if relabeled:
+            counts["relabeled"] += 1
+        if moved:
+            counts["moved"] += 1
+        if not relabeled and not moved:
+            counts["unchanged"] += 1
+    return counts
+
+
+def diff_projects(path_a, path_b, iou_threshold=IOU_THRESHOLD):
+    """Yield ``(image_name, counts)`` for every image whose boxes differ between two projects.
+
+    Images missing from one side count as all boxes added or removed.
+    Classes are compared by name.
+    """
+    old, new = ProjectReader(path_a), ProjectReader(path_b)
+    _, (remap_a, remap_b) = unify_classes([old.classes, new.classes])
+    seen = set()
+    with open(path_b, "rb") as f:
+        for name, boxes in old.images():
+            seen.add(name)
+            other = new.read(name, f)
+            counts = diff_boxes(remap_boxes(boxes, remap_a), remap_boxes(other or [], remap_b), iou_threshold)
+            if counts["unchanged"] != len(boxes) or counts["added"]:
+                yield name, counts
+        for name in new.index():
+            boxes = new.read(name, f) if name not in seen else None
+            if boxes:
+                yield name, {"added": len(boxes), "removed": 0, "moved": 0, "relabeled": 0, "unchanged": 0}
+
+
+def resolve(versions, policy, iou_threshold=IOU_THRESHOLD):
+    """Combine the box lists one image has in several projects (in project order)."""
+    if policy == "ours":
+        return versions[0]
+    if policy == "theirs":
+        return versions[-1]
+    merged = list(versions[0])
+    for boxes in versions[1:]:
+        _, _, extra = match_boxes(merged, boxes, iou_threshold)
+        merged.extend(boxes[j] for j in extra)
+    return merged
+
+
+def merge_projects(paths, out_path, policy="union", iou_threshold=IOU_THRESHOLD):
+    """Merge project files image by image into ``out_path``; returns ``(images, boxes, conflicts)``.
+
+    An image present in several projects with different boxes is a
+    conflict, settled by ``policy``: ``ours`` keeps the first project's
+    boxes, ``theirs`` the last one's, ``union`` keeps every box of the first
+    and adds the boxes of the others that do not overlap one already kept
+    (IoU below ``iou_threshold``). Class lists are unified by name. Only
+    the per-image byte offsets of the other projects are held in memory.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown conflict policy: {policy}")
+    readers = [ProjectReader(path) for path in paths]
+    classes, remaps = unify_classes([reader.classes for reader in readers])
+    files = [open(path, "rb") for path in paths]
+    images = boxes_written = conflicts = 0
+    try:
+        with open(out_path, "w") as out:
+            header = {
+                "image_folder": readers[0].header.get("image_folder", ""),
+                "current_image_index": 0,
+                "classes": classes,
+            }
+            out.write("{\n")
+            for key, value in header.items():
+                out.write(f"    {json.dumps(key)}: {json.dumps(value)},\n")
+            out.write('    "annotations": {')
+
+            seen = set()
+            for position, reader in enumerate(readers):
+                # The first project is streamed; the others are only visited
+                # for images none of the projects before them had.
+                if position == 0:
+                    images_of = reader.images()
+                else:
+                    images_of = ((name, reader.read(name, files[position]))
+                                 for name in reader.index() if name not in seen)
+                for name, boxes in images_of:
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                    versions = [remap_boxes(boxes, remaps[position])]
+                    for later in range(position + 1, len(readers)):
+                        other = readers[later].read(name, files[later])
+                        if other is not None:
+                            versions.append(remap_boxes(other, remaps[later]))
+                    if any(version != versions[0] for version in versions[1:]):
+                        conflicts += 1
+                        merged = resolve(versions, policy, iou_threshold)
+                    else:
+                        merged = versions[0]
+                    out.write(",\n" if images else "\n")
+                    out.write(f"        {json.dumps(name)}: {json.dumps(merged)}")
+                    images += 1
+                    boxes_written += len(merged)
+            out.write("\n    }\n}\n" if images else "}\n}\n")
+    finally:
+        for f in files:
+            f.close()
+    return images, boxes_written, conflicts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare or merge LabelSense project files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff_parser = commands.add_parser("diff", help="list the images whose boxes differ")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new")
+    diff_parser.add_argument("--iou", type=float, default=IOU_THRESHOLD, help="IoU needed to match two boxes")
+    diff_parser.add_argument("--summary", action="store_true", help="only print the totals")
+    merge_parser = commands.add_parser("merge", help="merge projects into one")
+    merge_parser.add_argument("projects", nargs="+")
+    merge_parser.add_argument("-o", "--output", required=True)
+    merge_parser.add_argument("--policy", choices=POLICIES, default="union")
+    merge_parser.add_argument("--iou", type=float, default=IOU_THRESHOLD, help="IoU at which two boxes are the same")
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        totals = {"images": 0, "added": 0, "removed": 0, "moved": 0, "relabeled": 0}
+        for name, counts in diff_projects(args.old, args.new, args.iou):
+            totals["images"] += 1
+            for key in ("added", "removed", "moved", "relabeled"):
+                totals[key] += counts[key]
+            if not args.summary:
+                print(f"{name}: +{counts['added']} -{counts['removed']} "
+                      f"~{counts['moved']} moved, {counts['relabeled']} relabeled")
+        print(f"{totals['images']} images changed: {totals['added']} boxes added, {totals['removed']} removed, "
+              f"{totals['moved']} moved, {totals['relabeled']} relabeled")
+    else:
+        images, boxes, conflicts = merge_projects(args.projects, args.output, args.policy, args.iou)
+        print(f"Wrote {images} images, {boxes} boxes to {args.output} "
+              f"({conflicts} conflicting images resolved with '{args.policy}')")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import numbers
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+# Coordinates may overshoot the image by this much before a box counts as out of range
+EDGE_TOLERANCE = 1e-6
+
+ISSUE_LABELS = {
+    "malformed": "malformed boxes (bbox is not four finite numbers, or no class) or box lists",
+    "stale_class": "boxes with a class id outside the class list",
+    "zero_area": "boxes with zero or negative width or height",
+    "out_of_range": "boxes extending outside the image",
+    "missing_image": "annotated images missing from the image folder",
+}
+
+FIX_ACTIONS = {
+    "malformed": "Remove malformed boxes",
+    "add_classes": "Add placeholder classes for unknown class ids",
+    "stale_class": "Remove boxes with unknown class ids",
+    "zero_area": "Remove zero-area boxes",
+    "out_of_range": "Clip boxes to the image",
+    "missing_image": "Drop the annotations of missing images",
+}
+
+
+def _valid_box(ann):
+    try:
+        bbox = ann['bbox']
+        return (isinstance(ann['class'], numbers.Integral) and len(bbox) >= 4
+                and all(isinstance(v, numbers.Real) for v in bbox[:4]))
+    except (KeyError, TypeError):
+        return False
+
+
+_INT_TYPES = {int}
+_REAL_TYPES = {int, float}
+
+
+def _flatten(box_lists):
+    """Return ``(class_ids, coords, malformed)`` arrays over every box, in order."""
+    total = sum(map(len, box_lists))
+    try:
+        class_list = list(chain.from_iterable((ann['class'] for ann in boxes) for boxes in box_lists))
+        coord_list = list(chain.from_iterable(ann['bbox'][:4] for boxes in box_lists for ann in boxes))
+        # numpy would quietly convert strings and truncate float class ids, so
+        # only plain ints and floats take the fast path
+        if (len(coord_list) == total * 4 and set(map(type, class_list)) <= _INT_TYPES
+                and set(map(type, coord_list)) <= _REAL_TYPES):
+            return (np.array(class_list, np.int64).reshape(total),
+                    np.array(coord_list, np.float64).reshape(total, 4), np.zeros(total, bool))
+    except (KeyError, TypeError, IndexError, OverflowError):
+        pass
+
+    # Slow path: at least one box is not {'class': int, 'bbox': [4 numbers]}
+    class_ids = np.zeros(total, np.int64)
+    coords = np.zeros((total, 4), np.float64)
+    malformed = np.zeros(total, bool)
+    for row, ann in enumerate(chain.from_iterable(box_lists)):
+        if _valid_box(ann):
+            try:
+                class_ids[row] = ann['class']
+                coords[row] = ann['bbox'][:4]
+                continue
+            except OverflowError:
+                pass
+        malformed[row] = True
+    return class_ids, coords, malformed
+
+
+def _existing(folder, names):
+    def check(chunk):
+        return [name for name in chunk if os.path.exists(os.path.join(folder, name))]
+
+    chunks = [names[i:i + 256] for i in range(0, len(names), 256)]
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        return set(chain.from_iterable(pool.map(check, chunks)))
+
+
+class ValidationReport:
+    """Problems found in a project.
+
+    ``boxes[kind]`` maps an image name to the indices of its boxes with
+    that problem; ``malformed_images`` lists images whose value is not a
+    list of boxes; ``missing_images`` lists annotated images that are not
+    in the image folder; ``max_class_id`` is the largest class id in use.
+    """
+
+    def __init__(self, boxes, malformed_images, missing_images, max_class_id, box_count, seconds):
+        self.boxes = boxes
+        self.malformed_images = malformed_images
+        self.missing_images = missing_images
+        self.max_class_id = max_class_id
+        self.box_count = box_count
+        self.seconds = seconds
+
+    def count(self, kind):
+        if kind == "missing_image":
+            return len(self.missing_images)
+        count = sum(map(len, self.boxes[kind].values()))
+        return count + len(self.malformed_images) if kind == "malformed" else count
+
+    def total(self):
+        return sum(self.count(kind) for kind in ISSUE_LABELS)
+
+    @property
+    def ok(self):
+        return self.total() == 0
+
+    def summary(self):
+        lines = [f"{self.count(kind)} {label}" for kind, label in ISSUE_LABELS.items() if self.count(kind)]
+        if not lines:
+            return f"No problems found in {self.box_count} boxes."
+        return "\n".join(lines)
+
+
+def validate(annotations, classes, folder=None, known_images=None):
+    """Check every box of ``annotations`` and whether the annotated images still exist.
+
+    Box checks run on flat numpy arrays of all boxes at once. Images in
+    ``known_images`` are taken to exist; the others are looked up in
+    ``folder`` with parallel ``stat`` calls (or reported missing when the
+    folder is not a local directory).
+    """
+    start = time.perf_counter()
+    names = list(annotations)
+    malformed_images = [name for name in names if not isinstance(annotations[name], list)]
+    box_lists = [annotations[name] if isinstance(annotations[name], list) else [] for name in names]
+    counts = np.fromiter(map(len, box_lists), np.int64, len(box_lists))
+    class_ids, coords, malformed = _flatten(box_lists)
+    image_of = np.repeat(np.arange(len(names)), counts)
+    first_box = np.cumsum(counts) - counts
+
+    cx, cy, w, h = coords.T
+    finite = np.isfinite(coords).all(axis=1)
+    malformed |= ~finite
+    valid = ~malformed
+    with np.errstate(invalid="ignore"):
+        masks = {
+            "malformed": malformed,
+            "stale_class": valid & ((class_ids < 0) | (class_ids >= len(classes))),
+            "zero_area": valid & ((w <= 0) | (h <= 0)),
+            "out_of_range": valid & ((cx - w / 2 < -EDGE_TOLERANCE) | (cy - h / 2 < -EDGE_TOLERANCE)
+                                     | (cx + w / 2 > 1 + EDGE_TOLERANCE) | (cy + h / 2 > 1 + EDGE_TOLERANCE)),
+        }
+    boxes = {}
+    for kind, mask in masks.items():
+        rows = np.flatnonzero(mask)
+        found = {}
+        for image, index in zip(image_of[rows].tolist(), (rows - first_box[image_of[rows]]).tolist()):
+            found.setdefault(names[image], []).append(index)
+        boxes[kind] = found
+
+    known = known_images if known_images is not None else set()
+    unknown = [name for name in names if name not in known]
+    if unknown and folder and os.path.isdir(folder):
+        present = _existing(folder, unknown)
+        missing = [name for name in unknown if name not in present]
+    else:
+        missing = unknown if known_images is not None else []
+
+    max_class_id = int(class_ids[valid].max()) if valid.any() else -1
+    return ValidationReport(boxes, malformed_images, missing, max_class_id, len(class_ids),
+                            time.perf_counter() - start)
+
+
+def fix_project(annotations, classes, report, actions):
+    """Apply the chosen ``FIX_ACTIONS`` keys to ``annotations`` (and ``classes``) in place.
+
+    ``report`` must describe the current annotations. Returns
+    ``({action: number of boxes or images affected}, names of the changed images)``.
+    """
+    done = {action: 0 for action in actions}
+    changed = set()
+    if "add_classes" in actions and report.max_class_id >= len(classes):
+        added = report.max_class_id + 1 - len(classes)
+        classes.extend(f"class {class_id}" for class_id in range(len(classes), report.max_class_id + 1))
+        done["add_classes"] = added
+
+    remove = {}
+    for kind in ("malformed", "stale_class", "zero_area"):
+        if kind not in actions:
+            continue
+        for name, indices in report.boxes[kind].items():
+            if kind == "stale_class" and "add_classes" in actions:
+                indices = [i for i in indices if annotations[name][i]['class'] < 0]
+            remove.setdefault(name, set()).update(indices)
+            done[kind] += len(indices)
+
+    if "out_of_range" in actions:
+        for name, indices in report.boxes["out_of_range"].items():
+            boxes = annotations[name]
+            for i in indices:
+                if i in remove.get(name, ()):
+                    continue
+                cx, cy, w, h = boxes[i]['bbox'][:4]
+                x0, y0 = max(0.0, cx - w / 2), max(0.0, cy - h / 2)
+                x1, y1 = min(1.0, cx + w / 2), min(1.0, cy + h / 2)
+                if x1 <= x0 or y1 <= y0:
+                    remove.setdefault(name, set()).add(i)  # nothing of it is inside the image
+                else:
+                    boxes[i]['bbox'] = [(x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0] + list(boxes[i]['bbox'][4:])
+                    changed.add(name)
+                done["out_of_range"] += 1
+
+    if "malformed" in actions:
+        for name in report.malformed_images:
+            if name in annotations:
+                annotations[name] = []
+                changed.add(name)
+        done["malformed"] += len(report.malformed_images)
+
+    for name, indices in remove.items():
+        if indices:
+            boxes = annotations[name]
+            boxes[:] = [ann for i, ann in enumerate(boxes) if i not in indices]
+            changed.add(name)
+
+    if "missing_image" in actions:
+        for name in report.missing_images:
+            annotations.pop(name, None)
+        done["missing_image"] = len(report.missing_images)
+        changed.update(report.missing_images)
+    return done, changed
+
+
+class ProjectValidator(QThread):
+    """Runs ``validate`` off the GUI thread on a snapshot of the annotations."""
+
+    validated = pyqtSignal(object)
+
+    def __init__(self, annotations, classes, folder, known_images, parent=None):
+        super().__init__(parent)
+        # Shallow copies, so edits made meanwhile cannot change the dict or lists being read
+        self.annotations = {name: list(boxes) if isinstance(boxes, list) else boxes
+                            for name, boxes in annotations.items()}
+        self.classes = list(classes)
+        self.folder = folder
+        self.known_images = set(known_images) if known_images is not None else None
+        self.error = None
+
+    def run(self):
+        try:
+            report = validate(self.annotations, self.classes, self.folder, self.known_images)
+        except Exception as e:
+            # Still emit, so the annotator does not wait for this validator forever
+            self.error = e
+            report = None
+        self.validated.emit(report)
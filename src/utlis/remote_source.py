@@ -0,0 +1,332 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import datetime
+import hashlib
+import hmac
+import http.client
+import io
+import json
+import os
+import queue
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+from PyQt5.QtGui import QImage
+
+from image_metadata import parse_image_header
+from tiff_source import open_tiled_tiff
+
+REMOTE_SCHEMES = ("s3://", "http://", "https://")
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "labelsense", "remote")
+CACHE_BYTES = 2 * 1024 ** 3
+BLOCK_SIZE = 1024 * 1024
+CONNECTIONS = 8
+
+# A cached bucket listing is reused for this long before the prefix is listed again
+LISTING_TTL = 3600
+
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+def is_remote_url(folder):
+    return folder.lower().startswith(REMOTE_SCHEMES)
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class BlockCache:
+    """Fixed-size blocks of remote objects kept on local disk.
+
+    Blocks are files named after the object (URL and ETag, so a changed
+    object never hits stale blocks) and the block number. The least
+    recently used blocks are deleted once the cache grows past
+    ``max_bytes``; the access order survives restarts through file mtimes.
+    """
+
+    def __init__(self, folder=CACHE_DIR, max_bytes=CACHE_BYTES):
+        self.folder = os.path.join(folder, "blocks")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total = 0
+        os.makedirs(self.folder, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                files.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total += size
+
+    def get(self, object_id, index, fetch):
+        """Return block ``index`` of ``object_id``, calling ``fetch()`` to download it on a miss."""
+        name = f"{object_id}-{index}"
+        path = os.path.join(self.folder, name)
+        with self._lock:
+            cached = name in self._entries
+            if cached:
+                self._entries.move_to_end(name)
+        if cached:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+                return data
+            except OSError:
+                pass
+
+        data = fetch()
+        try:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return data
+        with self._lock:
+            self._total += len(data) - self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old, size = self._entries.popitem(last=False)
+                self._total -= size
+                try:
+                    os.remove(os.path.join(self.folder, old))
+                except OSError:
+                    pass
+        return data
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, shared by the reader threads."""
+
+    def __init__(self, scheme, netloc, size=CONNECTIONS):
+        self.connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.netloc = netloc
+        self._idle = queue.LifoQueue(size)
+
+    def request(self, method, target, headers):
+        """Send one request; returns ``(status, headers, body)``. Retried once on a dropped connection."""
+        for attempt in (0, 1):
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self.connection_class(self.netloc, timeout=60)
+            try:
+                connection.request(method, target, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                connection.close()
+            else:
+                try:
+                    self._idle.put_nowait(connection)
+                except queue.Full:
+                    connection.close()
+            return response.status, response.headers, body
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _hmac(key, text):
+    return hmac.new(key, text.encode("utf-8"), hashlib.sha256).digest()
+
+
+def sign_request(method, host, path, query, headers, region, access_key, secret_key, now=None):
+    """Add AWS Signature Version 4 headers for an S3 request to ``headers``.
+
+    ``path`` must already be URI-encoded. The payload is not hashed
+    (``UNSIGNED-PAYLOAD``) unless ``x-amz-content-sha256`` is set.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    day = amz_date[:8]
+    headers["x-amz-date"] = amz_date
+    headers.setdefault("x-amz-content-sha256", "UNSIGNED-PAYLOAD")
+    headers["host"] = host
+
+    canonical_headers = {name.lower(): " ".join(str(value).split()) for name, value in headers.items()}
+    signed = ";".join(sorted(canonical_headers))
+    canonical_query = "&".join(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(query.items()))
+    canonical_request = "\n".join([
+        method, path, canonical_query,
+        "".join(f"{name}:{canonical_headers[name]}\n" for name in sorted(canonical_headers)),
+        signed, canonical_headers["x-amz-content-sha256"],
+    ])
+    scope = f"{day}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()])
+    key = _hmac(_hmac(_hmac(_hmac(("AWS4" + secret_key).encode("utf-8"), day), region), "s3"), "aws4_request")
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    headers["Authorization"] = (f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+                                f"SignedHeaders={signed}, Signature={signature}")
+    return headers
+
+
+class RemoteSource:
+    """Images under a prefix of an S3-compatible bucket.
+
+    ``url`` is ``s3://bucket/prefix`` (endpoint from ``AWS_ENDPOINT_URL``,
+    default AWS) or a path-style ``http(s)://host/bucket/prefix`` such as a
+    MinIO server. Credentials come from ``AWS_ACCESS_KEY_ID`` /
+    ``AWS_SECRET_ACCESS_KEY`` (and ``AWS_SESSION_TOKEN``); without them
+    requests are anonymous. The prefix is listed page by page and the
+    listing cached for ``LISTING_TTL`` seconds. Objects are read as
+    ``BLOCK_SIZE`` range requests over pooled keep-alive connections and
+    every block goes through the on-disk ``BlockCache``, so tiled TIFFs
+    only fetch the tiles in view and revisited images never touch the
+    network. Members are object keys relative to the prefix.
+    """
+
+    def __init__(self, url, extensions, cache_dir=CACHE_DIR, max_cache_bytes=CACHE_BYTES):
+        self.url = url
+        self.name = url.rstrip("/").rsplit("/", 1)[-1]
+        self.region = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION") or "us-east-1"
+        if url.lower().startswith("s3://"):
+            # The regional endpoint, so buckets outside us-east-1 need no redirect
+            endpoint = urlsplit(os.environ.get("AWS_ENDPOINT_URL", f"https://s3.{self.region}.amazonaws.com"))
+            bucket, _, prefix = url[5:].partition("/")
+        else:
+            endpoint = urlsplit(url)
+            bucket, _, prefix = endpoint.path.lstrip("/").partition("/")
+        if not bucket:
+            raise ValueError(f"No bucket in {url}")
+        self.bucket = bucket
+        self.prefix = prefix.rstrip("/") + "/" if prefix.strip("/") else ""
+        self.host = endpoint.netloc
+        self.access_key = os.environ.get("AWS_ACCESS_KEY_ID")
+        self.secret_key = os.environ.get("AWS_SECRET_ACCESS_KEY")
+        self.session_token = os.environ.get("AWS_SESSION_TOKEN")
+        self.pool = _ConnectionPool(endpoint.scheme or "https", self.host)
+        self.cache = BlockCache(cache_dir, max_cache_bytes)
+        self._readers = ThreadPoolExecutor(max_workers=CONNECTIONS)
+        self._listing_path = os.path.join(cache_dir, f"listing-{_digest(self.host + '/' + bucket + '/' + self.prefix)}.json")
+        self.members = self._list(tuple(extensions))
+
+    def _get(self, key=None, query=None, headers=None):
+        path = "/" + quote(self.bucket, safe="") + ("/" + quote(key, safe="/-_.~") if key is not None else "/")
+        query = query or {}
+        headers = dict(headers or {})
+        if self.access_key and self.secret_key:
+            if self.session_token:
+                headers["x-amz-security-token"] = self.session_token
+            sign_request("GET", self.host, path, query, headers, self.region, self.access_key, self.secret_key)
+        target = path
+        if query:
+            target += "?" + "&".join(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(query.items()))
+        status, response_headers, body = self.pool.request("GET", target, headers)
+        if status >= 300:
+            message = body[:300].decode("utf-8", "replace")
+            raise OSError(f"GET {target} failed with HTTP {status}: {message}")
+        return response_headers, body
+
+    def _list(self, extensions):
+        try:
+            if time.time() - os.path.getmtime(self._listing_path) < LISTING_TTL:
+                with open(self._listing_path, "r") as f:
+                    return {key: tuple(value) for key, value in json.load(f).items()}
+        except (OSError, ValueError):
+            pass
+
+        members = {}
+        query = {"list-type": "2", "prefix": self.prefix, "max-keys": "1000"}
+        while True:
+            _, body = self._get(query=query)
+            root = ET.fromstring(body)
+            for item in root.iter(_S3_NS + "Contents"):
+                key = item.findtext(_S3_NS + "Key")
+                if key.lower().endswith(extensions):
+                    members[key[len(self.prefix):]] = (int(item.findtext(_S3_NS + "Size")),
+                                                       item.findtext(_S3_NS + "ETag", "").strip('"'))
+            token = root.findtext(_S3_NS + "NextContinuationToken")
+            if root.findtext(_S3_NS + "IsTruncated") != "true" or not token:
+                break
+            query["continuation-token"] = token
+
+        try:
+            os.makedirs(os.path.dirname(self._listing_path), exist_ok=True)
+            tmp_path = self._listing_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(members, f, separators=(",", ":"))
+            os.replace(tmp_path, self._listing_path)
+        except OSError:
+            pass
+        return members
+
+    def keys(self):
+        return list(self.members)
+
+    def _block(self, member, index):
+        size, etag = self.members[member]
+        start = index * BLOCK_SIZE
+        end = min(start + BLOCK_SIZE, size) - 1
+
+        def fetch():
+            _, body = self._get(self.prefix + member, headers={"Range": f"bytes={start}-{end}"})
+            if len(body) != end - start + 1:
+                # E.g. a server that ignored the Range header and sent the whole object
+                raise OSError(f"Expected {end - start + 1} bytes of {member} from {start}, got {len(body)}")
+            return body
+
+        return self.cache.get(_digest(f"{self.url}|{member}|{etag}"), index, fetch)
+
+    def read_range(self, member, offset, length):
+        """Return ``length`` bytes of ``member`` from ``offset``; blocks are fetched in parallel."""
+        size = self.members[member][0]
+        end = min(offset + length, size)
+        if offset >= end:
+            return b""
+        first, last = offset // BLOCK_SIZE, (end - 1) // BLOCK_SIZE
+        if first == last:
+            blocks = [self._block(member, first)]
+        else:
+            blocks = list(self._readers.map(lambda index: self._block(member, index), range(first, last + 1)))
+        data = b"".join(blocks)
+        start = offset - first * BLOCK_SIZE
+        return data[start:start + end - offset]
+
+    def read_bytes(self, member):
+        return self.read_range(member, 0, self.members[member][0])
+
+    def read(self, member):
+        return QImage.fromData(self.read_bytes(member))
+
+    def open_tiled(self, member):
+        return open_tiled_tiff(member, lambda offset, length: self.read_range(member, offset, length))
+
+    def size(self, member):
+        header = parse_image_header(io.BytesIO(self.read_range(member, 0, 64 * 1024)), member)
+        return (header[0], header[1]) if header else None
+
+    def export_name(self, member):
+        return member.replace("/", "_")
+
+    def export(self, member, path):
+        with open(path, "wb") as f:
+            f.write(self.read_bytes(member))
+
+    def close(self):
+        self._readers.shutdown(wait=True)
+        self.pool.close()
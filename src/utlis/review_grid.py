@@ -0,0 +1,269 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import os
+from collections import OrderedDict
+from functools import partial
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QSize, QThreadPool, QRectF, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QImage, QImageReader, QPainter, QPen, QPixmap
+from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QLabel, QPushButton, QScrollArea, QVBoxLayout, QWidget
+
+from tiff_source import BandRenderer, open_tiled_tiff
+
+CELL_SIZE = QSize(240, 180)
+GRID_COLUMNS = 6
+GRID_ROWS = 4
+CAPTION_HEIGHT = 18
+
+# Thumbnails kept in memory: the current page plus a few prefetched ones
+CACHE_PAGES = 4
+
+
+def decode_thumbnail(path, size):
+    """Decode ``path`` scaled to fit ``size``, asking the codec to downscale while decoding."""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    source = reader.size()
+    if source.isValid():
+        reader.setScaledSize(source.scaled(size, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        tiled = open_tiled_tiff(path)
+        if tiled is not None:
+            try:
+                image = BandRenderer().render(tiled.overview(max(size.width(), size.height())))
+            finally:
+                tiled.close()
+        image = image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+def render_thumbnail(path, boxes, size, colors, caption="", reader=None):
+    """Render one grid cell: the downscaled image, its boxes and a caption strip.
+
+    Only QImage and QPainter on a QImage are used, both safe off the GUI thread.
+    ``reader()`` may return an already decoded QImage (a video frame) to use
+    instead of decoding ``path``.
+    """
+    image_size = QSize(size.width(), size.height() - CAPTION_HEIGHT)
+    image = reader() if reader is not None else None
+    if image is not None:
+        image = image.scaled(image_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    else:
+        image = decode_thumbnail(path, image_size)
+    cell = QImage(size, QImage.Format_RGB32)
+    cell.fill(QColor(40, 40, 40))
+
+    painter = QPainter(cell)
+    if not image.isNull():
+        x = (size.width() - image.width()) // 2
+        y = (image_size.height() - image.height()) // 2
+        painter.drawImage(x, y, image)
+        for ann in boxes:
+            cx, cy, w, h = ann['bbox'][:4]
+            color = colors[ann['class'] % len(colors)]
+            painter.setPen(QPen(color, 2))
+            painter.drawRect(QRectF(x + (cx - w / 2) * image.width(), y + (cy - h / 2) * image.height(),
+                                    w * image.width(), h * image.height()))
+    else:
+        painter.setPen(QColor(200, 80, 80))
+        painter.drawText(0, 0, size.width(), image_size.height(), Qt.AlignCenter, "Cannot decode")
+
+    font = QFont()
+    font.setPixelSize(11)
+    painter.setFont(font)
+    painter.setPen(QColor(230, 230, 230))
+    painter.drawText(4, image_size.height(), size.width() - 8, CAPTION_HEIGHT,
+                     Qt.AlignVCenter | Qt.AlignLeft, caption)
+    painter.end()
+    return cell
+
+
+class _TaskSignals(QObject):
+    rendered = pyqtSignal(str, QImage)
+
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, name, path, boxes, size, colors, caption, reader=None):
+        super().__init__()
+        self.name = name
+        self.path = path
+        self.reader = reader
+        # Copy so edits made on the GUI thread meanwhile cannot race the render
+        self.boxes = [{'class': ann['class'], 'bbox': list(ann['bbox'])} for ann in boxes]
+        self.size = size
+        self.colors = colors
+        self.caption = caption
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            image = render_thumbnail(self.path, self.boxes, self.size, self.colors, self.caption, self.reader)
+        except Exception:
+            # Always report back, or the image stays queued and is never requested again
+            image = QImage()
+        self.signals.rendered.emit(self.name, image)
+
+
+class _GridCell(QLabel):
+    clicked = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.name = None
+        self.setFixedSize(CELL_SIZE)
+        self.setAlignment(Qt.AlignCenter)
+        self.setCursor(Qt.PointingHandCursor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.name:
+            self.clicked.emit(self.name)
+
+
+class ReviewGrid(QWidget):
+    """Paged contact sheet of images with their boxes drawn on top.
+
+    Cells are rendered by a thread pool from a reduced-size decode; the next
+    page is queued at a lower priority as soon as the current one is, so
+    paging forward usually shows finished thumbnails. ``image_activated``
+    is emitted with the image name when a cell is clicked. ``image_reader``,
+    if set, is called from the workers with an image name and may return a
+    decoded QImage for names that are not files in the folder.
+    """
+
+    image_activated = pyqtSignal(str)
+
+    def __init__(self, colors, parent=None):
+        super().__init__(parent)
+        self.colors = [QColor(color) for color in colors]
+        self.folder = ""
+        self.names = []
+        self.annotations = {}
+        self.page = 0
+        self.page_size = GRID_COLUMNS * GRID_ROWS
+        self.pool = QThreadPool(self)
+        self.cache = OrderedDict()
+        self._queued = set()
+        self._stale = set()
+        self.image_reader = None
+
+        layout = QVBoxLayout(self)
+        nav_layout = QHBoxLayout()
+        self.prev_btn = QPushButton("Previous Page")
+        self.prev_btn.setShortcut("PgUp")
+        self.prev_btn.clicked.connect(lambda: self.show_page(self.page - 1))
+        self.next_btn = QPushButton("Next Page")
+        self.next_btn.setShortcut("PgDown")
+        self.next_btn.clicked.connect(lambda: self.show_page(self.page + 1))
+        self.page_label = QLabel()
+        nav_layout.addWidget(self.prev_btn)
+        nav_layout.addStretch()
+        nav_layout.addWidget(self.page_label)
+        nav_layout.addStretch()
+        nav_layout.addWidget(self.next_btn)
+        layout.addLayout(nav_layout)
+
+        # The grid scrolls rather than forcing its full width onto the window
+        container = QWidget()
+        grid = QGridLayout(container)
+        grid.setSpacing(4)
+        grid.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.cells = []
+        for index in range(self.page_size):
+            cell = _GridCell()
+            cell.clicked.connect(self.image_activated.emit)
+            grid.addWidget(cell, index // GRID_COLUMNS, index % GRID_COLUMNS)
+            self.cells.append(cell)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(container)
+        layout.addWidget(scroll)
+
+    @property
+    def page_count(self):
+        return max(1, -(-len(self.names) // self.page_size))
+
+    def set_images(self, folder, names, annotations, page=0):
+        if folder != self.folder or annotations is not self.annotations:
+            self.cache.clear()
+            self._stale |= self._queued
+        self.folder = folder
+        self.names = list(names)
+        self.annotations = annotations
+        self.show_page(page)
+
+    def show_page_of(self, name):
+        if name in self.names:
+            self.show_page(self.names.index(name) // self.page_size)
+
+    def invalidate(self, name=None):
+        """Drop the thumbnail of ``name`` (or all of them) after its boxes changed."""
+        names = [name] if name is not None else list(self.cache) + list(self._queued)
+        for name in names:
+            self.cache.pop(name, None)
+            if name in self._queued:
+                self._stale.add(name)
+        if self.isVisible():
+            self.show_page(self.page)
+
+    def show_page(self, page):
+        self.page = max(0, min(page, self.page_count - 1))
+        start = self.page * self.page_size
+        names = self.names[start:start + self.page_size]
+        for cell, name in zip(self.cells, names + [None] * (self.page_size - len(names))):
+            cell.name = name
+            cell.setToolTip(name or "")
+            pixmap = self.cache.get(name) if name else None
+            if pixmap is not None:
+                self.cache.move_to_end(name)
+                cell.setPixmap(pixmap)
+            else:
+                cell.clear()
+                if name:
+                    self._request(name, priority=1)
+
+        # Prefetch the following page behind the visible cells
+        for name in self.names[start + self.page_size:start + 2 * self.page_size]:
+            if name not in self.cache:
+                self._request(name, priority=0)
+
+        self.page_label.setText(f"Page {self.page + 1}/{self.page_count}  ({len(self.names)} images)")
+        self.prev_btn.setEnabled(self.page > 0)
+        self.next_btn.setEnabled(self.page < self.page_count - 1)
+
+    def _request(self, name, priority):
+        if name in self._queued:
+            return
+        self._queued.add(name)
+        boxes = self.annotations.get(name, [])
+        reader = partial(self.image_reader, name) if self.image_reader is not None else None
+        task = ThumbnailTask(name, os.path.join(self.folder, name), boxes, CELL_SIZE, self.colors,
+                             f"{name}  ({len(boxes)})", reader)
+        task.signals.rendered.connect(self._rendered)
+        self.pool.start(task, priority)
+
+    def _rendered(self, name, image):
+        self._queued.discard(name)
+        if name in self._stale:
+            # Rendered from boxes that have changed since; draw it again
+            self._stale.discard(name)
+            self._request(name, priority=1)
+            return
+        pixmap = QPixmap.fromImage(image)
+        self.cache[name] = pixmap
+        self.cache.move_to_end(name)
+        while len(self.cache) > CACHE_PAGES * self.page_size:
+            self.cache.popitem(last=False)
+        for cell in self.cells:
+            if cell.name == name:
+                cell.setPixmap(pixmap)
+
+    def shutdown(self):
+        self.pool.clear()
+        self.pool.waitForDone()
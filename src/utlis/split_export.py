@@ -0,0 +1,147 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import os
+import shutil
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+import yaml
+
+_get_class = itemgetter('class')
+
+
+def stratified_order(box_lists, num_classes, seed=None):
+    """Return a permutation of the images grouped by their rarest class.
+
+    Each image is put in the stratum of the least frequent class it
+    contains (images without boxes form a stratum of their own) and the
+    images are shuffled within each stratum. Dealing this order out
+    round-robin gives every fold about the same share of every stratum.
+    """
+    n = len(box_lists)
+    counts = np.fromiter(map(len, box_lists), np.int64, n)
+    class_ids = np.fromiter(chain.from_iterable(map(_get_class, boxes) for boxes in box_lists),
+                            np.int64, int(counts.sum()))
+    image_ids = np.repeat(np.arange(n), counts)
+    valid = (class_ids >= 0) & (class_ids < num_classes)
+
+    # One (image, class) pair per class present in an image
+    pairs = np.unique(image_ids[valid] * num_classes + class_ids[valid])
+    pair_images, pair_classes = np.divmod(pairs, num_classes)
+    frequency = np.bincount(pair_classes, minlength=num_classes)
+
+    # Rarest class of each image: the first pair after sorting by image, then frequency
+    by_rarity = np.lexsort((frequency[pair_classes], pair_images))
+    images, first = np.unique(pair_images[by_rarity], return_index=True)
+    stratum = np.full(n, num_classes, np.int64)
+    stratum[images] = pair_classes[by_rarity][first]
+
+    shuffled = np.random.default_rng(seed).permutation(n)
+    return shuffled[np.argsort(stratum[shuffled], kind="stable")]
+
+
+def assign_folds(order, folds):
+    """Return the fold (0 to ``folds - 1``) of every image."""
+    fold = np.empty(len(order), np.int64)
+    fold[order] = np.arange(len(order)) % folds
+    return fold
+
+
+def assign_validation(order, train_ratio):
+    """Return a mask of the images in the validation split, ``1 - train_ratio`` of each stratum."""
+    val_ratio = 1.0 - train_ratio
+    position = np.arange(len(order))
+    val = np.empty(len(order), bool)
+    # Every time the running share crosses a whole image, that image goes to validation
+    val[order] = np.floor((position + 1) * val_ratio + 1e-9) > np.floor(position * val_ratio + 1e-9)
+    return val
+
+
+def link_or_copy(src, dst):
+    """Place ``src`` at ``dst`` as a symlink, else a hard link, and copy only as a last resort."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    src = os.path.abspath(src)
+    try:
+        os.symlink(src, dst)
+    except OSError:
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+
+def _write_list(path, names):
+    with open(path, "w", encoding="utf-8") as f:
+        # Ultralytics resolves "./" against the folder of the list file
+        f.writelines(f"./images/{name}\n" for name in names)
+
+
+def _write_yaml(path, dataset_path, train, val, classes):
+    with open(path, "w") as f:
+        yaml.dump({
+            'path': os.path.abspath(dataset_path),
+            'train': train,
+            'val': val,
+            'nc': len(classes),
+            'names': list(classes),
+        }, f, default_flow_style=False)
+
+
+def export_split_lists(dataset_path, annotations, classes, place_image, export_name, label_stem,
+                       folds=5, train_ratio=0.8, seed=None):
+    """Export a YOLO dataset as path lists instead of per-split image copies.
+
+    Every image is placed once in ``images/`` by ``place_image(image_name,
+    path)`` (normally a link to the original) and its labels are written
+    once to ``labels/``. Splits are only lists of image paths: with
+    ``folds`` > 1, ``fold<k>_train.txt``, ``fold<k>_val.txt`` and
+    ``fold<k>.yaml`` for each of the stratified folds, else ``train.txt``,
+    ``val.txt`` and ``<dataset>.yaml`` split by ``train_ratio``.
+
+    Returns ``[(yaml path, train count, val count)]``.
+    """
+    names = sorted(annotations)  # sorted so video frames and archive members are read in file order
+    image_dir = os.path.join(dataset_path, "images")
+    label_dir = os.path.join(dataset_path, "labels")
+    os.makedirs(image_dir, exist_ok=True)
+    os.makedirs(label_dir, exist_ok=True)
+
+    exported = []
+    for image_name in names:
+        file_name = export_name(image_name)
+        place_image(image_name, os.path.join(image_dir, file_name))
+        with open(os.path.join(label_dir, label_stem(image_name) + ".txt"), 'w') as f:
+            for ann in annotations[image_name]:
+                bbox = ann['bbox']
+                f.write(f"{ann['class']} {bbox[0]} {bbox[1]} {bbox[2]} {bbox[3]}\n")
+        exported.append(file_name)
+
+    order = stratified_order([annotations[name] for name in names], len(classes), seed)
+    exported = np.array(exported, dtype=object)
+    splits = []
+    if folds > 1:
+        fold = assign_folds(order, folds)
+        for k in range(folds):
+            train, val = exported[fold != k], exported[fold == k]
+            _write_list(os.path.join(dataset_path, f"fold{k}_train.txt"), train)
+            _write_list(os.path.join(dataset_path, f"fold{k}_val.txt"), val)
+            yaml_path = os.path.join(dataset_path, f"fold{k}.yaml")
+            _write_yaml(yaml_path, dataset_path, f"fold{k}_train.txt", f"fold{k}_val.txt", classes)
+            splits.append((yaml_path, len(train), len(val)))
+    else:
+        val_mask = assign_validation(order, train_ratio)
+        train, val = exported[~val_mask], exported[val_mask]
+        _write_list(os.path.join(dataset_path, "train.txt"), train)
+        _write_list(os.path.join(dataset_path, "val.txt"), val)
+        yaml_path = os.path.join(dataset_path, f"{os.path.basename(dataset_path)}.yaml")
+        _write_yaml(yaml_path, dataset_path, "train.txt", "val.txt", classes)
+        splits.append((yaml_path, len(train), len(val)))
+    return splits
@@ -0,0 +1,65 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import os
+import sys
+import time
+
+STARTUP_BUDGET_MS = 300
+
+
+class StartupProfile:
+    """Collects named timestamps during start-up and prints them as a report.
+
+    Enabled with ``--startup-report`` on the command line or the
+    ``LABELSENSE_STARTUP_REPORT=1`` environment variable; otherwise ``mark``
+    is a no-op. Per-module import costs can be added with ``python -X importtime``.
+    """
+
+    def __init__(self):
+        self.enabled = "--startup-report" in sys.argv or os.environ.get("LABELSENSE_STARTUP_REPORT") == "1"
+        self.start = time.perf_counter()
+        self.marks = []
+
+    def reset(self):
+        """Start a new measurement, e.g. when the annotator is opened from the launcher."""
+        self.start = time.perf_counter()
+        self.marks = []
+
+    def mark(self, name):
+        if self.enabled:
+            self.marks.append((name, time.perf_counter()))
+
+    def mark_first_paint(self, name, callback=None):
+        """Record ``name`` once the event loop has painted the shown window."""
+        if not self.enabled:
+            return
+        from PyQt5.QtCore import QTimer
+
+        def done():
+            self.mark(name)
+            if callback:
+                callback()
+
+        QTimer.singleShot(0, done)
+
+    def report(self, title="LabelSense"):
+        if not self.enabled:
+            return
+        lines = [f"{title} start-up report:"]
+        previous = self.start
+        for name, stamp in self.marks:
+            lines.append(f"  {name:<32} +{(stamp - previous) * 1000:7.1f} ms  {(stamp - self.start) * 1000:7.1f} ms")
+            previous = stamp
+        total = (previous - self.start) * 1000
+        status = "OK" if total <= STARTUP_BUDGET_MS else "OVER BUDGET"
+        lines.append(f"  total {total:.1f} ms / budget {STARTUP_BUDGET_MS} ms: {status}")
+        print("\n".join(lines), file=sys.stderr)
+
+
+startup_profile = StartupProfile()
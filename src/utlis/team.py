@@ -0,0 +1,262 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import getpass
+import json
+import os
+import socket
+import time
+import uuid
+
+TEAM_DIR = ".labelsense-team"
+BATCH_SIZE = 50
+
+# A lease not renewed for LEASE_SECONDS may be taken over by another annotator
+LEASE_SECONDS = 600
+HEARTBEAT_SECONDS = 60
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _create_exclusive(path, data):
+    """Create ``path`` holding ``data`` unless it already exists; returns False if it does.
+
+    The content is written to a temporary file first and hard-linked into
+    place, so other workstations never read a half-written file. Shares
+    without hard links fall back to an exclusive create.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    try:
+        os.link(tmp_path, path)
+        return True
+    except FileExistsError:
+        return False
+    except OSError:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        return True
+    finally:
+        os.remove(tmp_path)
+
+
+def _move_back(src, dst):
+    """Rename ``src`` back to ``dst`` unless ``dst`` has been created again meanwhile."""
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        pass
+    except OSError:
+        os.rename(src, dst)  # shares without hard links
+        return
+    os.remove(src)
+
+
+class TeamSession:
+    """One annotator's membership in a team working on a shared image folder.
+
+    Everything lives in files under ``folder``, so any number of
+    workstations can take part through a shared file system without a
+    server:
+
+    * ``batches/NNNNN.txt`` -- image names handed out together, created
+      once and never rewritten;
+    * ``leases/NNNNN.json`` -- who is working on a batch and until when,
+      created atomically, renewed by ``heartbeat`` and taken over once
+      expired;
+    * ``done/NNNNN`` -- batches that have been finished;
+    * ``shards/<user>@<host>.json`` -- the boxes of every image this
+      annotator edited, with the edit time. Nobody else writes it.
+
+    ``merge_shards`` combines the shards into one set of annotations.
+    """
+
+    def __init__(self, folder, user=None):
+        self.folder = folder
+        self.user = user or getpass.getuser()
+        self.worker = f"{self.user}@{socket.gethostname()}".replace(os.sep, "_")
+        self.session = uuid.uuid4().hex
+        self.batch = None
+        self.edited = {}
+        for name in ("batches", "leases", "done", "shards"):
+            os.makedirs(os.path.join(folder, name), exist_ok=True)
+        self.shard_path = os.path.join(folder, "shards", f"{self.worker}.json")
+        shard = _read_json(self.shard_path) or {}
+        self.edited = {name: entry["time"] for name, entry in shard.get("images", {}).items()}
+
+    def _path(self, kind, batch, suffix=""):
+        return os.path.join(self.folder, kind, f"{batch:05d}{suffix}")
+
+    def batches(self):
+        """Return ``{batch: [image names]}`` for every planned batch."""
+        batches = {}
+        for name in os.listdir(os.path.join(self.folder, "batches")):
+            if name.endswith(".txt") and name[:-4].isdigit():
+                with open(os.path.join(self.folder, "batches", name), "r", encoding="utf-8") as f:
+                    batches[int(name[:-4])] = f.read().splitlines()
+        return batches
+
+    def plan(self, image_names):
+        """Split images that are not in any batch yet into new batches.
+
+        Batch numbers are claimed with exclusive creates, so annotators
+        planning at the same time never overwrite each other's batches.
+        """
+        batches = self.batches()
+        planned = {name for names in batches.values() for name in names}
+        new = [name for name in image_names if name not in planned]
+        number = max(batches, default=-1) + 1
+        for start in range(0, len(new), BATCH_SIZE):
+            chunk = new[start:start + BATCH_SIZE]
+            while True:
+                try:
+                    fd = os.open(self._path("batches", number, ".txt"), os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+                    break
+                except FileExistsError:
+                    number += 1
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write("\n".join(chunk) + "\n")
+            number += 1
+        return len(new)
+
+    def _lease(self, expires=None):
+        now = time.time()
+        return {"user": self.user, "worker": self.worker, "session": self.session,
+                "heartbeat": now, "expires": expires or now + LEASE_SECONDS}
+
+    def acquire(self):
+        """Lease the first unfinished batch nobody holds; returns ``(batch, names)`` or None."""
+        done = {int(name) for name in os.listdir(os.path.join(self.folder, "done")) if name.isdigit()}
+        for batch, names in sorted(self.batches().items()):
+            if batch in done:
+                continue
+            path = self._path("leases", batch, ".json")
+            if _create_exclusive(path, self._lease()):
+                self.batch = batch
+                return batch, names
+            lease = _read_json(path)
+            if lease is None or lease.get("expires", 0) < time.time():
+                # Annotators taking over the same expired lease race to rename
+                # it away. The lease file may have been replaced since it was
+                # read, by a winner's fresh lease or a late heartbeat, so what
+                # was renamed is checked before it is deleted.
+                stale_path = f"{path}.stale-{self.session}"
+                try:
+                    os.rename(path, stale_path)
+                except OSError:
+                    continue
+                if _read_json(stale_path) != lease:
+                    _move_back(stale_path, path)
+                    continue
+                os.remove(stale_path)
+                if _create_exclusive(path, self._lease()):
+                    self.batch = batch
+                    return batch, names
+        return None
+
+    def heartbeat(self):
+        """Renew the current lease; returns False if it was lost to another annotator."""
+        if self.batch is None:
+            return True
+        path = self._path("leases", self.batch, ".json")
+        lease = _read_json(path)
+        if lease is None or lease.get("session") != self.session:
+            self.batch = None
+            return False
+        _write_json(path, self._lease())
+        return True
+
+    def release(self, done=False):
+        if self.batch is None:
+            return
+        if done:
+            with open(self._path("done", self.batch), "w") as f:
+                f.write(f"{self.worker} {time.time():.0f}\n")
+        path = self._path("leases", self.batch, ".json")
+        lease = _read_json(path)
+        if lease is not None and lease.get("session") == self.session:
+            os.remove(path)
+        self.batch = None
+
+    def progress(self):
+        """Return ``(finished, leased, total)`` batch counts."""
+        total = len(self.batches())
+        finished = sum(1 for name in os.listdir(os.path.join(self.folder, "done")) if name.isdigit())
+        leased = sum(1 for name in os.listdir(os.path.join(self.folder, "leases")) if name.endswith(".json"))
+        return finished, leased, total
+
+    def touch(self, image_name):
+        self.edited[image_name] = time.time()
+
+    def write_shard(self, annotations, classes):
+        """Write the boxes of every image this annotator has edited to their own shard."""
+        images = {name: {"time": edited, "boxes": annotations.get(name, [])}
+                  for name, edited in self.edited.items()}
+        _write_json(self.shard_path, {"worker": self.worker, "classes": list(classes), "images": images})
+
+
+def merge_shards(folder):
+    """Combine every shard under ``folder`` into ``(annotations, classes, conflicts)``.
+
+    For each image the most recent edit wins (ties go to the worker name
+    that sorts last), so the result does not depend on the order the shards
+    are read in. Class ids are remapped by class name into one class list.
+    Shards are loaded one at a time. ``conflicts`` counts images edited in
+    more than one shard with different boxes.
+    """
+    shard_dir = os.path.join(folder, "shards")
+    classes = []
+    class_ids = {}
+    annotations = {}
+    versions = {}
+    conflicts = set()
+    for name in sorted(os.listdir(shard_dir)):
+        if not name.endswith(".json"):
+            continue
+        shard = _read_json(os.path.join(shard_dir, name))
+        if not shard:
+            continue
+        mapping = []
+        for class_name in shard.get("classes", []):
+            if class_name not in class_ids:
+                class_ids[class_name] = len(classes)
+                classes.append(class_name)
+            mapping.append(class_ids[class_name])
+        worker = shard.get("worker", name)
+        for image_name, entry in shard.get("images", {}).items():
+            version = (entry["time"], worker)
+            boxes = [
+                {**ann, "class": mapping[ann["class"]] if 0 <= ann["class"] < len(mapping) else ann["class"]}
+                for ann in entry["boxes"]]
+            previous = versions.get(image_name)
+            if previous is not None:
+                if boxes != annotations[image_name]:
+                    conflicts.add(image_name)
+                if previous > version:
+                    continue
+            versions[image_name] = version
+            annotations[image_name] = boxes
+    return annotations, classes, len(conflicts)
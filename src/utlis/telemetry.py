@@ -0,0 +1,161 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import datetime
+import getpass
+import os
+import time
+import uuid
+
+TELEMETRY_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "labelsense", "telemetry")
+FLUSH_EVENTS = 256
+
+# Gaps between events longer than this count as idle rather than working time
+IDLE_GAP = 60.0
+
+EDIT_EVENTS = ("create", "update", "delete", "class")
+
+
+def _clean(text):
+    return str(text).replace("\t", " ").replace("\n", " ")
+
+
+class EventRecorder:
+    """Buffers annotator events and appends them to one TSV file per day.
+
+    ``record`` only appends a tuple to a list; the buffer is written when it
+    reaches ``FLUSH_EVENTS`` events and whenever ``flush`` is called (the
+    annotator does so on a timer and on close). Lines are
+    ``time, user, session, event, image``. Write errors drop the batch so
+    telemetry can never interrupt annotation.
+    """
+
+    def __init__(self, folder=TELEMETRY_DIR, user=None):
+        self.folder = folder
+        self.user = _clean(user or getpass.getuser())
+        self.session = uuid.uuid4().hex[:12]
+        self.enabled = True
+        self._pending = []
+
+    def record(self, event, image=""):
+        if not self.enabled:
+            return
+        self._pending.append((time.time(), event, image))
+        if len(self._pending) >= FLUSH_EVENTS:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        by_day = {}
+        for timestamp, event, image in pending:
+            day = datetime.date.fromtimestamp(timestamp).isoformat()
+            by_day.setdefault(day, []).append(
+                f"{timestamp:.3f}\t{self.user}\t{self.session}\t{event}\t{_clean(image)}\n")
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            for day, lines in by_day.items():
+                with open(os.path.join(self.folder, f"events-{day}.tsv"), "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+        except OSError:
+            pass
+
+
+class _Totals:
+    __slots__ = ("sessions", "images", "counts", "active", "idle")
+
+    def __init__(self):
+        self.sessions = set()
+        self.images = set()
+        self.counts = {}
+        self.active = 0.0
+        self.idle = 0.0
+
+
+def summarize(folder=TELEMETRY_DIR, days=30, idle_gap=IDLE_GAP):
+    """Aggregate the last ``days`` days of events per day and annotator.
+
+    Files are streamed line by line; only the running totals of each
+    (day, user) pair and the last event time of each session are kept.
+    Returns a list of dicts sorted by day (newest first) and user.
+    """
+    first_day = (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+    try:
+        names = sorted(name for name in os.listdir(folder)
+                       if name.startswith("events-") and name.endswith(".tsv") and name[7:-4] >= first_day)
+    except OSError:
+        names = []
+
+    totals = {}
+    last_seen = {}
+    for name in names:
+        day = name[7:-4]
+        with open(os.path.join(folder, name), encoding="utf-8", errors="replace") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 5:
+                    continue
+                try:
+                    timestamp = float(parts[0])
+                except ValueError:
+                    continue
+                _, user, session, event, image = parts
+                group = totals.get((day, user))
+                if group is None:
+                    group = totals[(day, user)] = _Totals()
+                group.sessions.add(session)
+                group.counts[event] = group.counts.get(event, 0) + 1
+                if image:
+                    group.images.add(image)
+                previous = last_seen.get(session)
+                if previous is not None and timestamp >= previous:
+                    gap = timestamp - previous
+                    if gap > idle_gap:
+                        group.idle += gap
+                    else:
+                        group.active += gap
+                last_seen[session] = timestamp if event != "end" else None
+
+    rows = []
+    for (day, user), group in sorted(totals.items(), key=lambda item: (item[0][0], item[0][1]), reverse=True):
+        counts = group.counts
+        created = counts.get("create", 0)
+        edits = sum(counts.get(event, 0) for event in EDIT_EVENTS)
+        tracked = group.active + group.idle
+        rows.append({
+            "day": day,
+            "user": user,
+            "sessions": len(group.sessions),
+            "images": len(group.images),
+            "boxes": created,
+            "active_minutes": group.active / 60,
+            "boxes_per_minute": created / (group.active / 60) if group.active else 0.0,
+            "seconds_per_image": group.active / len(group.images) if group.images else 0.0,
+            "idle_fraction": group.idle / tracked if tracked else 0.0,
+            "edit_ratio": (counts.get("update", 0) + counts.get("class", 0)) / created if created else 0.0,
+            "undo_ratio": counts.get("undo", 0) / edits if edits else 0.0,
+            "saves": counts.get("save", 0),
+        })
+    return rows
+
+
+def format_summary(rows):
+    if not rows:
+        return "No annotator activity recorded yet."
+    width = max([len(row["user"]) for row in rows] + [4])
+    lines = [f"{'Day':<10} {'User':<{width}} {'Sess':>5} {'Images':>7} {'Boxes':>7} {'Active':>8} "
+             f"{'Box/min':>8} {'s/img':>7} {'Idle':>6} {'Edit':>6} {'Undo':>6}"]
+    for row in rows:
+        lines.append(
+            f"{row['day']:<10} {row['user']:<{width}} {row['sessions']:>5} {row['images']:>7} {row['boxes']:>7} "
+            f"{row['active_minutes']:>7.1f}m {row['boxes_per_minute']:>8.1f} {row['seconds_per_image']:>7.1f} "
+            f"{row['idle_fraction']:>6.0%} {row['edit_ratio']:>6.2f} {row['undo_ratio']:>6.2f}")
+    lines += ["", f"Active time excludes gaps longer than {IDLE_GAP:.0f} s between events, which count as idle.",
+              "Edit = (moves/resizes + relabels) per box drawn; Undo = undos per edit."]
+    return "\n".join(lines)
@@ -0,0 +1,422 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+# TIFF tags used by the reader
+IMAGE_WIDTH = 256
+IMAGE_LENGTH = 257
+BITS_PER_SAMPLE = 258
+COMPRESSION = 259
+STRIP_OFFSETS = 273
+SAMPLES_PER_PIXEL = 277
+ROWS_PER_STRIP = 278
+STRIP_BYTE_COUNTS = 279
+PLANAR_CONFIG = 284
+PREDICTOR = 317
+TILE_WIDTH = 322
+TILE_LENGTH = 323
+TILE_OFFSETS = 324
+TILE_BYTE_COUNTS = 325
+SAMPLE_FORMAT = 339
+NEW_SUBFILE_TYPE = 254
+
+# TIFF field type -> (numpy code, size)
+_FIELD_TYPES = {1: ("u1", 1), 2: ("u1", 1), 3: ("u2", 2), 4: ("u4", 4), 6: ("i1", 1),
+                7: ("u1", 1), 8: ("i2", 2), 9: ("i4", 4), 11: ("f4", 4), 12: ("f8", 8),
+                16: ("u8", 8), 17: ("i8", 8)}
+_SAMPLE_KINDS = {1: "u", 2: "i", 3: "f"}
+
+# Compression schemes that can be read: none, LZW, Adobe deflate, deflate
+SUPPORTED_COMPRESSION = (1, 5, 8, 32946)
+
+# Above this many pixels a plain TIFF is read through the tiled path as well
+LARGE_IMAGE_PIXELS = 64 * 1024 * 1024
+
+
+def lzw_decode(data):
+    """Decode one TIFF LZW strip or tile (MSB-first codes of 9 to 12 bits, early change).
+
+    Pure Python, so a tile takes tens of milliseconds; decoded tiles are
+    kept in the tile cache.
+    """
+    data = bytes(data) + b"\0\0\0"
+    end = (len(data) - 3) * 8
+    table = [bytes((i,)) for i in range(256)] + [b"", b""]  # 256 = clear, 257 = end
+    add = table.append
+    out = []
+    emit = out.append
+    previous = None
+    width, mask, limit, pos = 9, 511, 511, 0
+    while pos + width <= end:
+        i = pos >> 3
+        code = ((data[i] << 16 | data[i + 1] << 8 | data[i + 2]) >> (24 - width - (pos & 7))) & mask
+        pos += width
+        size = len(table)
+        if code < 256 or 257 < code < size:
+            entry = table[code]
+            if previous is not None:
+                add(previous + entry[:1])
+                size += 1
+        elif code == 256:
+            del table[258:]
+            width, mask, limit, previous = 9, 511, 511, None
+            continue
+        elif code == 257:
+            break
+        elif previous is not None and code == size:
+            entry = previous + previous[:1]
+            add(entry)
+            size += 1
+        else:
+            raise ValueError("Corrupt LZW data")
+        emit(entry)
+        previous = entry
+        # Codes widen one entry early, as written by libtiff
+        if size >= limit and width < 12:
+            width += 1
+            mask = limit = (limit << 1) + 1
+    return b"".join(out)
+
+
+class TiffLevel:
+    """One resolution level (IFD) of a TIFF: full resolution or an internal overview."""
+
+    def __init__(self, reader, tags):
+        self.reader = reader
+        self.width = int(tags[IMAGE_WIDTH][0])
+        self.height = int(tags[IMAGE_LENGTH][0])
+        self.bands = int(tags.get(SAMPLES_PER_PIXEL, [1])[0])
+        bits = int(tags.get(BITS_PER_SAMPLE, [1])[0])
+        kind = _SAMPLE_KINDS.get(int(tags.get(SAMPLE_FORMAT, [1])[0]), "u")
+        if bits not in (8, 16, 32, 64):
+            raise ValueError(f"Unsupported bit depth: {bits}")
+        self.dtype = np.dtype(f"{reader.endian}{kind}{bits // 8}")
+        self.compression = int(tags.get(COMPRESSION, [1])[0])
+        if self.compression not in SUPPORTED_COMPRESSION:
+            raise ValueError(f"Unsupported TIFF compression: {self.compression}")
+        self.predictor = int(tags.get(PREDICTOR, [1])[0])
+        if self.predictor not in (1, 2):
+            # 3 is the floating point predictor, which is not implemented
+            raise ValueError(f"Unsupported TIFF predictor: {self.predictor}")
+        self.planar = int(tags.get(PLANAR_CONFIG, [1])[0])
+
+        if TILE_OFFSETS in tags:
+            self.tiled = True
+            self.tile_width = int(tags[TILE_WIDTH][0])
+            self.tile_height = int(tags[TILE_LENGTH][0])
+            self.offsets = tags[TILE_OFFSETS]
+            self.byte_counts = tags[TILE_BYTE_COUNTS]
+        else:
+            # Strips are handled as tiles that span the full width
+            self.tiled = False
+            self.tile_width = self.width
+            self.tile_height = min(int(tags.get(ROWS_PER_STRIP, [self.height])[0]), self.height)
+            self.offsets = tags[STRIP_OFFSETS]
+            self.byte_counts = tags[STRIP_BYTE_COUNTS]
+        if self.width <= 0 or self.height <= 0 or self.tile_width <= 0 or self.tile_height <= 0:
+            raise ValueError("Invalid TIFF image or tile size")
+        self.tiles_across = -(-self.width // self.tile_width)
+        self.tiles_down = -(-self.height // self.tile_height)
+        tile_count = self.tiles_across * self.tiles_down * (self.bands if self.planar == 2 else 1)
+        if len(self.offsets) < tile_count or len(self.byte_counts) < tile_count:
+            raise ValueError("TIFF has fewer tile offsets than tiles")
+
+    def tile(self, col, row, band=0):
+        """Return one tile as a ``(tile_height, tile_width, samples)`` array.
+
+        Uncompressed tiles of a local file are zero-copy views into the
+        memory-mapped file.
+        """
+        index = row * self.tiles_across + col
+        samples = self.bands
+        if self.planar == 2:
+            index += band * self.tiles_across * self.tiles_down
+            samples = 1
+        key = (id(self), index)
+        cached = self.reader.tile_cache.get(key)
+        if cached is not None:
+            self.reader.tile_cache.move_to_end(key)
+            return cached
+
+        offset, size = int(self.offsets[index]), int(self.byte_counts[index])
+        rows = self.tile_height
+        if not self.tiled:
+            rows = min(self.tile_height, self.height - row * self.tile_height)
+        count = rows * self.tile_width * samples
+        if self.compression == 1 and self.reader.mapped is not None:
+            data = np.frombuffer(self.reader.mapped, self.dtype, count, offset)
+        elif self.compression == 1:
+            data = np.frombuffer(self.reader.read_bytes(offset, count * self.dtype.itemsize), self.dtype, count)
+        else:
+            raw = self.reader.read_bytes(offset, size)
+            raw = lzw_decode(raw) if self.compression == 5 else zlib.decompress(raw)
+            data = np.frombuffer(raw, self.dtype, count)
+        data = data.reshape(rows, self.tile_width, samples)
+        if self.predictor == 2:
+            data = np.cumsum(data, axis=1, dtype=self.dtype)
+
+        if self.compression != 1 or self.predictor == 2 or self.reader.mapped is None:
+            self.reader.tile_cache[key] = data
+            if len(self.reader.tile_cache) > self.reader.tile_cache_size:
+                self.reader.tile_cache.popitem(last=False)
+        return data
+
+    def read_window(self, x0, y0, x1, y1, step=1):
+        """Read pixels ``[y0:y1:step, x0:x1:step]`` of all bands.
+
+        Only the tiles overlapping the window are touched. Returns an array of
+        shape ``(rows, cols, bands)`` in the file's sample type.
+        """
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        out_h = max(0, -(-(y1 - y0) // step))
+        out_w = max(0, -(-(x1 - x0) // step))
+        out = np.zeros((out_h, out_w, self.bands), self.dtype)
+        if not out_h or not out_w:
+            return out
+
+        tw, th = self.tile_width, self.tile_height
+        for row in range(y0 // th, (y1 - 1) // th + 1):
+            ty = row * th
+            gy = y0 + -(-(max(y0, ty) - y0) // step) * step
+            ly_end = min(y1, ty + th) - ty
+            if gy - ty >= ly_end:
+                continue
+            oy = (gy - y0) // step
+            for col in range(x0 // tw, (x1 - 1) // tw + 1):
+                tx = col * tw
+                gx = x0 + -(-(max(x0, tx) - x0) // step) * step
+                lx_end = min(x1, tx + tw) - tx
+                if gx - tx >= lx_end:
+                    continue
+                ox = (gx - x0) // step
+                if self.planar == 2:
+                    for band in range(self.bands):
+                        part = self.tile(col, row, band)[gy - ty:ly_end:step, gx - tx:lx_end:step, 0]
+                        out[oy:oy + part.shape[0], ox:ox + part.shape[1], band] = part
+                else:
+                    part = self.tile(col, row)[gy - ty:ly_end:step, gx - tx:lx_end:step]
+                    out[oy:oy + part.shape[0], ox:ox + part.shape[1]] = part
+        return out
+
+
+class TiledTiff:
+    """Windowed reader for tiled (and large striped) TIFF / GeoTIFF files.
+
+    The file is memory-mapped; ``levels`` holds the full-resolution image and
+    any internal overviews, largest first. Files that are not on the local
+    disk are read through ``range_reader(offset, size)``, which must return
+    the bytes at that position; only the headers and the tiles in view are
+    then requested.
+    """
+
+    def __init__(self, path, tile_cache_size=256, range_reader=None):
+        self.path = path
+        self.tile_cache = OrderedDict()
+        self.tile_cache_size = tile_cache_size
+        self._overviews = {}
+        self.mapped = None
+        self._file = None
+        self._range_reader = range_reader
+        if range_reader is None:
+            self._file = open(path, "rb")
+        try:
+            if self._file is not None:
+                self.mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.levels = [TiffLevel(self, tags) for tags in self._read_ifds()
+                           if int(tags.get(NEW_SUBFILE_TYPE, [0])[0]) & 4 == 0]
+        except Exception:
+            self.close()
+            raise
+        if not self.levels:
+            raise ValueError("TIFF has no image")
+        self.levels.sort(key=lambda level: level.width, reverse=True)
+
+    @property
+    def width(self):
+        return self.levels[0].width
+
+    @property
+    def height(self):
+        return self.levels[0].height
+
+    @property
+    def bands(self):
+        return self.levels[0].bands
+
+    def close(self):
+        self.tile_cache.clear()
+        self._overviews.clear()
+        if self.mapped is not None:
+            self.mapped.close()
+        if self._file is not None:
+            self._file.close()
+
+    def read_bytes(self, offset, size):
+        if self.mapped is not None:
+            return self.mapped[offset:offset + size]
+        data = self._range_reader(offset, size)
+        if len(data) < size:
+            raise ValueError("TIFF is truncated")
+        return data
+
+    def _read_ifds(self):
+        header = self.read_bytes(0, 16)
+        if header[:2] == b"II":
+            self.endian = "<"
+        elif header[:2] == b"MM":
+            self.endian = ">"
+        else:
+            raise ValueError("Not a TIFF file")
+        version = struct.unpack_from(self.endian + "H", header, 2)[0]
+        big = version == 43
+        if big:
+            offset = struct.unpack_from(self.endian + "Q", header, 8)[0]
+            count_fmt, entry_fmt, entry_size, next_fmt, inline = "Q", "HHQ8s", 20, "Q", 8
+        elif version == 42:
+            offset = struct.unpack_from(self.endian + "I", header, 4)[0]
+            count_fmt, entry_fmt, entry_size, next_fmt, inline = "H", "HHI4s", 12, "I", 4
+        else:
+            raise ValueError("Not a TIFF file")
+        count_size = struct.calcsize(count_fmt)
+        next_size = struct.calcsize(next_fmt)
+
+        ifds = []
+        seen = set()
+        while offset and offset not in seen and len(ifds) < 64:
+            seen.add(offset)
+            count = struct.unpack(self.endian + count_fmt, self.read_bytes(offset, count_size))[0]
+            # The entries and the next IFD offset are read in one request
+            entries = self.read_bytes(offset + count_size, count * entry_size + next_size)
+            tags = {}
+            for i in range(count):
+                tag, field_type, n, raw = struct.unpack_from(self.endian + entry_fmt, entries, i * entry_size)
+                if field_type not in _FIELD_TYPES:
+                    continue
+                code, size = _FIELD_TYPES[field_type]
+                dtype = np.dtype(self.endian + code)
+                if n * size <= inline:
+                    values = np.frombuffer(raw, dtype, n)
+                else:
+                    value_offset = struct.unpack(self.endian + next_fmt, raw[:next_size])[0]
+                    values = np.frombuffer(self.read_bytes(value_offset, n * size), dtype, n)
+                tags[tag] = values
+            ifds.append(tags)
+            offset = struct.unpack_from(self.endian + next_fmt, entries, count * entry_size)[0]
+        return ifds
+
+    def level_for(self, step):
+        """Pick the coarsest level that still has at least 1/``step`` of full resolution.
+
+        Returns ``(level, step within that level)``.
+        """
+        best = self.levels[0]
+        for level in self.levels[1:]:
+            if self.width / level.width <= step:
+                best = level
+        factor = self.width / best.width
+        return best, max(1, int(step / factor))
+
+    def read(self, x0, y0, x1, y1, step=1):
+        """Read a full-resolution window, sampled every ``step`` pixels, from the best level."""
+        level, level_step = self.level_for(step)
+        factor = self.width / level.width
+        return level.read_window(int(x0 / factor), int(y0 / factor),
+                                 int(-(-x1 // factor)), int(-(-y1 // factor)), level_step)
+
+    def overview(self, max_side=2048):
+        """Return the whole image, sampled down to at most ``max_side`` pixels a side.
+
+        Files with internal overviews are read from the closest one. Without
+        them every tile of the full-resolution image has to be decoded, so
+        the first overview of such a file costs as much as reading the whole
+        file; the result is kept, so later calls (e.g. after a band mapping
+        change) are free.
+        """
+        if max_side not in self._overviews:
+            step = max(1, -(-max(self.width, self.height) // max_side))
+            self._overviews[max_side] = self.read(0, 0, self.width, self.height, step)
+        return self._overviews[max_side]
+
+
+class BandRenderer:
+    """Turns multiband samples into 8-bit RGB with a band mapping and percentile stretch.
+
+    ``band_mapping`` lists the zero-based source band shown as red, green and
+    blue (a single band gives grey). The stretch limits are fitted once per
+    image with ``fit`` so that every window is rendered consistently.
+    """
+
+    def __init__(self, band_mapping=None, percentiles=(2, 98)):
+        self.band_mapping = band_mapping
+        self.percentiles = percentiles
+        self.low = None
+        self.high = None
+
+    def _bands(self, data):
+        mapping = self.band_mapping
+        bands = data.shape[2]
+        if not mapping:
+            mapping = (0, 1, 2) if bands >= 3 else (0,)
+        mapping = [min(b, bands - 1) for b in mapping]
+        if len(mapping) == 1:
+            mapping = mapping * 3
+        return data[:, :, mapping]
+
+    def fit(self, data):
+        """Compute per-channel stretch limits from a (downsampled) sample of the image."""
+        sample = self._bands(data).reshape(-1, 3).astype(np.float32)
+        if sample.shape[0] > 1000000:
+            sample = sample[::sample.shape[0] // 1000000]
+        low, high = np.percentile(sample, self.percentiles, axis=0)
+        self.low = low
+        self.high = np.where(high > low, high, low + 1)
+
+    def render(self, data):
+        """Return a QImage (RGB888) for a ``(rows, cols, bands)`` array."""
+        if self.low is None:
+            self.fit(data)
+        rgb = self._bands(data).astype(np.float32)
+        rgb -= self.low
+        rgb *= 255.0 / (self.high - self.low)
+        np.clip(rgb, 0, 255, out=rgb)
+        pixels = np.ascontiguousarray(rgb.astype(np.uint8))
+        height, width = pixels.shape[:2]
+        image = QImage(pixels.data, width, height, width * 3, QImage.Format_RGB888)
+        image._pixels = pixels  # QImage does not own the buffer
+        return image
+
+
+def open_tiled_tiff(path, range_reader=None):
+    """Open ``path`` with TiledTiff when Qt's own TIFF decoder is the wrong tool.
+
+    That is the case for tiled files, more than 8 bits per sample, band
+    counts other than 1, 3 or 4, and very large images. Returns None when the
+    file should simply be loaded with QPixmap.
+    """
+    if os.path.splitext(path)[1].lower() not in (".tif", ".tiff"):
+        return None
+    try:
+        source = TiledTiff(path, range_reader=range_reader)
+    except (OSError, ValueError, KeyError, IndexError, struct.error):
+        # KeyError/IndexError: a required tag (tile size, offsets) is missing or empty
+        return None
+    level = source.levels[0]
+    if (level.tiled or level.dtype.itemsize > 1 or level.bands not in (1, 3, 4)
+            or level.width * level.height > LARGE_IMAGE_PIXELS):
+        return source
+    source.close()
+    return None
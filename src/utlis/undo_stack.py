@@ -0,0 +1,128 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import sys
+from collections import deque
+
+
+class UndoStack:
+    """Undo/redo history of annotation edits.
+
+    Every entry is a small delta tuple ``(kind, image_name, *payload)`` rather
+    than a copy of the image's annotations, so undo and redo cost the same no
+    matter how large the project is. Supported kinds:
+
+    * ``('create', image, index, ann)``
+    * ``('update', image, index, old_bbox, new_bbox)``
+    * ``('delete', image, ((index, ann), ...))``  -- indices ascending
+    * ``('insert', image, ((index, ann), ...))``  -- indices ascending
+    * ``('class', image, ((index, old_class, new_class), ...))``
+
+    The oldest entries are dropped once the estimated size of the history
+    exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._undo = deque()
+        self._redo = []
+        self._bytes = 0
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def push(self, command):
+        """Record a command that has already been applied to the annotations."""
+        self._redo.clear()
+        self._append(command)
+
+    def undo(self, annotations):
+        """Revert the latest command and return the affected image name."""
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        self._bytes -= _command_size(command)
+        _apply(annotations, command, reverse=True)
+        self._redo.append(command)
+        return command[1]
+
+    def redo(self, annotations):
+        """Re-apply the latest undone command and return the affected image name."""
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        _apply(annotations, command, reverse=False)
+        self._append(command)
+        return command[1]
+
+    def rename_image(self, old_name, new_name):
+        """Point the history of ``old_name`` at ``new_name`` after the file was renamed."""
+        def renamed(command):
+            return (command[0], new_name) + command[2:] if command[1] == old_name else command
+
+        self._undo = deque(map(renamed, self._undo))
+        self._redo = list(map(renamed, self._redo))
+
+    def _append(self, command):
+        self._undo.append(command)
+        self._bytes += _command_size(command)
+        while self._bytes > self.max_bytes and len(self._undo) > 1:
+            self._bytes -= _command_size(self._undo.popleft())
+
+
+def _command_size(command):
+    size = sys.getsizeof(command)
+    for part in command[2:]:
+        size += sys.getsizeof(part)
+        if isinstance(part, (tuple, list)):
+            size += sum(sys.getsizeof(item) for item in part)
+    return size
+
+
+def _apply(annotations, command, reverse):
+    kind, image_name = command[0], command[1]
+    boxes = annotations.setdefault(image_name, [])
+
+    if kind == 'create':
+        _, _, index, ann = command
+        if reverse:
+            boxes.pop(index)
+        else:
+            boxes.insert(index, ann)
+    elif kind == 'update':
+        _, _, index, old_bbox, new_bbox = command
+        boxes[index]['bbox'] = list(old_bbox if reverse else new_bbox)
+    elif kind == 'delete':
+        removed = command[2]
+        if reverse:
+            for index, ann in removed:
+                boxes.insert(index, ann)
+        else:
+            for index, _ in reversed(removed):
+                boxes.pop(index)
+    elif kind == 'insert':
+        added = command[2]
+        if reverse:
+            for index, _ in reversed(added):
+                boxes.pop(index)
+        else:
+            for index, ann in added:
+                boxes.insert(index, ann)
+    elif kind == 'class':
+        for index, old_class, new_class in command[2]:
+            boxes[index]['class'] = old_class if reverse else new_class
+    else:
+        raise ValueError(f"Unknown undo command: {kind}")
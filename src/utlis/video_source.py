@@ -0,0 +1,172 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.m4v', '.webm')
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "labelsense", "video")
+
+# Frames decoded ahead of the one requested, and decoded frames kept in memory
+DECODE_AHEAD = 8
+BUFFER_FRAMES = 32
+
+
+def _load_av():
+    try:
+        import av
+    except ImportError:
+        raise ImportError("PyAV is required to open videos (pip install av)") from None
+    return av
+
+
+def build_frame_index(path, cache_dir=CACHE_DIR):
+    """Return ``(pts, keyframes)``: the presentation timestamp of every frame and the keyframe numbers.
+
+    Frame numbers are positions in presentation order. The index is read
+    from the packets only, without decoding, and cached per file under
+    ``cache_dir`` keyed by path, mtime and size.
+    """
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}"
+    cache_path = os.path.join(cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".npz")
+    try:
+        with np.load(cache_path) as cached:
+            return cached["pts"], cached["keyframes"]
+    except (OSError, KeyError, ValueError):
+        pass
+
+    av = _load_av()
+    pts, keys = [], []
+    with av.open(path) as container:
+        stream = container.streams.video[0]
+        for packet in container.demux(stream):
+            timestamp = packet.pts if packet.pts is not None else packet.dts
+            if timestamp is None or packet.size == 0:
+                continue
+            pts.append(timestamp)
+            keys.append(packet.is_keyframe)
+    pts = np.array(pts, dtype=np.int64)
+    order = np.argsort(pts, kind="stable")
+    pts = pts[order]
+    keyframes = np.flatnonzero(np.array(keys, dtype=bool)[order])
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(tmp_path, pts=pts, keyframes=keyframes)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return pts, keyframes
+
+
+class VideoSource:
+    """Random access to the frames of one video file.
+
+    Members are zero-padded frame numbers, so ``clip.mp4#000042`` is the
+    annotation key of frame 42. A single decode thread owns the container:
+    a request for a frame seeks to the nearest keyframe before it unless the
+    decoder is already positioned between that keyframe and the frame, and
+    after every request the next ``DECODE_AHEAD`` frames are decoded in the
+    background so stepping forward is served from memory.
+    """
+
+    def __init__(self, path, cache_dir=CACHE_DIR):
+        av = _load_av()
+        self.path = path
+        self.name = os.path.basename(path)
+        self.pts, self.keyframes = build_frame_index(path, cache_dir)
+        self.frame_count = len(self.pts)
+        self._container = av.open(path)
+        self._stream = self._container.streams.video[0]
+        self._stream.thread_type = "AUTO"
+        self.width = self._stream.codec_context.width
+        self.height = self._stream.codec_context.height
+        self._frames = None
+        self._position = -1
+        self._lock = threading.Lock()
+        self._buffer = OrderedDict()
+        self._decoder = ThreadPoolExecutor(max_workers=1)
+        self._generation = 0
+
+    def keys(self):
+        return [f"{frame:06d}" for frame in range(self.frame_count)]
+
+    def size(self, member):
+        return self.width, self.height
+
+    def open_tiled(self, member):
+        return None
+
+    def export_name(self, member):
+        return f"{os.path.splitext(self.name)[0]}_{member}.jpg"
+
+    def export(self, member, path):
+        if not self.read(member).save(path, "JPG", 95):
+            raise OSError(f"Could not write {path}")
+
+    def read(self, member):
+        """Return frame ``member`` as a QImage (waits for the decoder on a miss)."""
+        frame = int(member)
+        with self._lock:
+            image = self._buffer.get(frame)
+            if image is not None:
+                self._buffer.move_to_end(frame)
+        # Bumping the generation stops a running decode-ahead after its current frame
+        self._generation += 1
+        if image is None:
+            image = self._decoder.submit(self._decode, frame).result()
+        self._decoder.submit(self._decode_ahead, frame + 1, self._generation)
+        return image
+
+    def _decode_ahead(self, start, generation):
+        for frame in range(start, min(start + DECODE_AHEAD, self.frame_count)):
+            if generation != self._generation:
+                return
+            with self._lock:
+                cached = frame in self._buffer
+            if not cached:
+                self._decode(frame)
+
+    def _decode(self, frame):
+        keyframe = self.keyframes[max(np.searchsorted(self.keyframes, frame, side="right") - 1, 0)]
+        if self._frames is None or not keyframe <= self._position < frame:
+            self._container.seek(int(self.pts[keyframe]), stream=self._stream, backward=True, any_frame=False)
+            self._frames = self._container.decode(self._stream)
+            self._position = -1
+
+        target = self.pts[frame]
+        for decoded in self._frames:
+            if decoded.pts is None:
+                continue
+            self._position = int(np.searchsorted(self.pts, decoded.pts))
+            if decoded.pts >= target:
+                break
+        else:
+            self._frames = None
+            return QImage()
+
+        pixels = decoded.to_ndarray(format="rgb24")
+        image = QImage(pixels.data, pixels.shape[1], pixels.shape[0], pixels.strides[0], QImage.Format_RGB888).copy()
+        with self._lock:
+            self._buffer[frame] = image
+            while len(self._buffer) > BUFFER_FRAMES:
+                self._buffer.popitem(last=False)
+        return image
+
+    def close(self):
+        self._generation += 1
+        self._decoder.shutdown(wait=True)
+        self._container.close()
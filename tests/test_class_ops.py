@@ -0,0 +1,98 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "utlis"))
+
+from class_ops import ClassChange  # noqa: E402
+
+CLASSES = ["car", "truck", "bus"]
+
+
+def box(class_id):
+    return {'class': class_id, 'bbox': [0.5, 0.5, 0.1, 0.1]}
+
+
+def project():
+    return {
+        "a.jpg": [box(0), box(1), box(2)],
+        "b.jpg": [box(1), box(1)],
+        "c.jpg": [box(2)],
+    }
+
+
+def class_ids(annotations):
+    return {name: [ann['class'] for ann in boxes] for name, boxes in annotations.items()}
+
+
+def test_remove_deletes_boxes_and_compacts_ids():
+    annotations = project()
+    change = ClassChange.remove(CLASSES, 1)
+    preview = change.preview(annotations)
+    assert preview['deleted'] == 3
+    assert preview['changed'] == 2
+    assert preview['images'] == 3
+    assert preview['per_class'] == [1, 3, 2]
+
+    change.apply(annotations, preview)
+    assert change.new_classes == ["car", "bus"]
+    assert class_ids(annotations) == {"a.jpg": [0, 1], "b.jpg": [], "c.jpg": [1]}
+
+
+def test_merge_moves_boxes_to_target():
+    annotations = project()
+    change = ClassChange.merge(CLASSES, [2], 0)
+    preview = change.preview(annotations)
+    assert preview['deleted'] == 0
+    assert preview['changed'] == 2
+
+    change.apply(annotations)
+    assert change.new_classes == ["car", "truck"]
+    assert class_ids(annotations) == {"a.jpg": [0, 1, 0], "b.jpg": [1, 1], "c.jpg": [0]}
+
+
+def test_preview_does_not_modify_annotations():
+    annotations = project()
+    ClassChange.remove(CLASSES, 0).preview(annotations)
+    assert class_ids(annotations) == class_ids(project())
+
+
+def test_stale_ids_are_kept():
+    annotations = {"a.jpg": [box(0), box(7), box(-1)], "b.jpg": [box(5)]}
+    change = ClassChange.remove(CLASSES, 1)
+    preview = change.preview(annotations)
+    assert preview['deleted'] == 0
+    assert preview['changed'] == 0
+    assert preview['images'] == 0
+
+    change.apply(annotations, preview)
+    assert class_ids(annotations) == {"a.jpg": [0, 7, -1], "b.jpg": [5]}
+
+
+def test_stale_ids_survive_next_to_relabelled_boxes():
+    annotations = {"a.jpg": [box(2), box(9), box(1)]}
+    change = ClassChange.merge(CLASSES, [0], 2)
+    preview = change.preview(annotations)
+    assert preview['deleted'] == 0
+    assert preview['changed'] == 2
+
+    change.apply(annotations, preview)
+    assert class_ids(annotations) == {"a.jpg": [1, 9, 0]}
+
+
+def test_negative_stale_id_is_not_dropped():
+    annotations = {"a.jpg": [box(0), box(-1)]}
+    change = ClassChange.merge(CLASSES, [0], 2)
+    preview = change.preview(annotations)
+    assert preview['deleted'] == 0
+    assert preview['changed'] == 1
+
+    change.apply(annotations, preview)
+    assert class_ids(annotations) == {"a.jpg": [1, -1]}
@@ -0,0 +1,102 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "utlis"))
+
+import pytest  # noqa: E402
+
+import project_diff  # noqa: E402
+from project_diff import ProjectReader, merge_projects  # noqa: E402
+
+
+def box(class_id, x=0.5, y=0.5, w=0.2, h=0.2):
+    return {'class': class_id, 'bbox': [x, y, w, h]}
+
+
+def write_project(path, classes, annotations):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"image_folder": "images", "classes": classes, "annotations": annotations},
+                  f, ensure_ascii=False, indent=4)
+    return str(path)
+
+
+ANNOTATIONS = {
+    "straße/café.jpg": [box(0, 0.123456789012345), box(1, w=1e-7)],
+    "猫.png": [{'class': 1, 'bbox': [0.25, 0.75, 0.5, 0.5], 'note': "ünïcödé"}],
+    "plain.jpg": [],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_reader_handles_values_split_across_chunks(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(project_diff, "CHUNK_SIZE", chunk_size)
+    path = write_project(tmp_path / "p.json", ["voiture", "автобус"], ANNOTATIONS)
+    reader = ProjectReader(path)
+    assert reader.classes == ["voiture", "автобус"]
+    assert reader.header["image_folder"] == "images"
+    assert dict(reader.images()) == ANNOTATIONS
+
+
+def test_reader_index_uses_byte_offsets(tmp_path, monkeypatch):
+    monkeypatch.setattr(project_diff, "CHUNK_SIZE", 5)
+    path = write_project(tmp_path / "p.json", ["car"], ANNOTATIONS)
+    reader = ProjectReader(path)
+    with open(path, "rb") as f:
+        for name in reversed(list(ANNOTATIONS)):
+            assert reader.read(name, f) == ANNOTATIONS[name]
+        assert reader.read("missing.jpg", f) is None
+
+
+def merge(tmp_path, policy):
+    # Same class names in a different order, plus one class only b has
+    a = write_project(tmp_path / "a.json", ["car", "bus"], {
+        "both.jpg": [box(0), box(1, 0.1, 0.1)],
+        "same.jpg": [box(1)],
+    })
+    b = write_project(tmp_path / "b.json", ["bus", "truck", "car"], {
+        "both.jpg": [box(2, 0.51), box(1, 0.9, 0.9)],
+        "same.jpg": [box(0)],
+        "only_b.jpg": [box(1)],
+    })
+    out = str(tmp_path / "merged.json")
+    counts = merge_projects([a, b], out, policy)
+    with open(out, encoding="utf-8") as f:
+        return counts, json.load(f)
+
+
+def test_merge_ours_keeps_first_project(tmp_path):
+    counts, merged = merge(tmp_path, "ours")
+    assert merged["classes"] == ["car", "bus", "truck"]
+    assert counts == (3, 4, 1)
+    assert merged["annotations"] == {
+        "both.jpg": [box(0), box(1, 0.1, 0.1)],
+        "same.jpg": [box(1)],
+        "only_b.jpg": [box(2)],
+    }
+
+
+def test_merge_theirs_keeps_last_project(tmp_path):
+    counts, merged = merge(tmp_path, "theirs")
+    assert counts == (3, 4, 1)
+    assert merged["annotations"]["both.jpg"] == [box(0, 0.51), box(2, 0.9, 0.9)]
+    assert merged["annotations"]["same.jpg"] == [box(1)]
+
+
+def test_merge_union_adds_boxes_that_do_not_overlap(tmp_path):
+    counts, merged = merge(tmp_path, "union")
+    assert counts == (3, 5, 1)
+    assert merged["annotations"]["both.jpg"] == [box(0), box(1, 0.1, 0.1), box(2, 0.9, 0.9)]
+
+
+def test_merge_rejects_unknown_policy(tmp_path):
+    with pytest.raises(ValueError):
+        merge(tmp_path, "newest")
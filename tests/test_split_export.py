@@ -0,0 +1,74 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "utlis"))
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from split_export import assign_folds, assign_validation, stratified_order  # noqa: E402
+
+NUM_CLASSES = 3
+
+
+def box(class_id):
+    return {'class': class_id, 'bbox': [0.5, 0.5, 0.1, 0.1]}
+
+
+def dataset():
+    # Class 0 is everywhere, class 1 in a third of the images, class 2 in ten;
+    # twenty images have no boxes and a few carry a stale class id
+    box_lists = []
+    for i in range(300):
+        boxes = [box(0)]
+        if i % 3 == 0:
+            boxes.append(box(1))
+        if i % 30 == 1:
+            boxes += [box(2), box(2)]
+        if i % 50 == 7:
+            boxes.append(box(9))
+        box_lists.append(boxes)
+    return box_lists + [[] for _ in range(20)]
+
+
+def images_per_class(box_lists, selected):
+    return [sum(1 for boxes, keep in zip(box_lists, selected) if keep and any(b['class'] == c for b in boxes))
+            for c in range(NUM_CLASSES)] + [sum(1 for boxes, keep in zip(box_lists, selected) if keep and not boxes)]
+
+
+def test_order_is_a_seeded_permutation():
+    box_lists = dataset()
+    order = stratified_order(box_lists, NUM_CLASSES, seed=1)
+    assert sorted(order.tolist()) == list(range(len(box_lists)))
+    assert np.array_equal(order, stratified_order(box_lists, NUM_CLASSES, seed=1))
+    assert not np.array_equal(order, stratified_order(box_lists, NUM_CLASSES, seed=2))
+
+
+@pytest.mark.parametrize("folds", [2, 5, 7])
+def test_folds_share_every_class_evenly(folds):
+    box_lists = dataset()
+    fold = assign_folds(stratified_order(box_lists, NUM_CLASSES, seed=0), folds)
+    per_fold = np.array([images_per_class(box_lists, fold == f) for f in range(folds)])
+    spread = per_fold.max(axis=0) - per_fold.min(axis=0)
+    # The rare class and the empty images are strata of their own; classes 0 and 1
+    # also occur in the rarer strata, so allow one image of slack from each
+    assert spread[2] <= 1 and spread[3] <= 1
+    assert spread[0] <= 2 and spread[1] <= 2
+
+
+@pytest.mark.parametrize("train_ratio", [0.8, 0.75, 0.9])
+def test_validation_takes_its_share_of_each_class(train_ratio):
+    box_lists = dataset()
+    val = assign_validation(stratified_order(box_lists, NUM_CLASSES, seed=3), train_ratio)
+    val_ratio = 1 - train_ratio
+    assert abs(val.sum() - len(box_lists) * val_ratio) <= 1
+    for total, selected in zip(images_per_class(box_lists, [True] * len(box_lists)), images_per_class(box_lists, val)):
+        assert abs(selected - total * val_ratio) <= 2
@@ -0,0 +1,73 @@
+"""
+LabelSense Annotator
+Developed by Rahim Biswas
+
+YouTube Channel GISsense
+©LabelSense Annotator 2025
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "utlis"))
+
+import pytest  # noqa: E402
+
+from tiff_source import lzw_decode  # noqa: E402
+
+
+def lzw_encode(data):
+    """TIFF LZW as libtiff writes it: MSB-first codes, widened one entry early, clear at 4094."""
+    codes = []
+    widths = []
+    table = {bytes((i,)): i for i in range(256)}
+    width = 9
+
+    def put(code):
+        codes.append(code)
+        widths.append(width)
+
+    put(256)
+    current = b""
+    for byte in data:
+        candidate = current + bytes((byte,))
+        if candidate in table:
+            current = candidate
+            continue
+        put(table[current])
+        table[candidate] = len(table) + 2
+        if len(table) + 2 >= 4094:
+            put(256)
+            table = {bytes((i,)): i for i in range(256)}
+            width = 9
+        elif len(table) + 2 >= 1 << width:
+            width += 1
+        current = bytes((byte,))
+    if current:
+        put(table[current])
+    put(257)
+
+    bits = "".join(format(code, f"0{width}b") for code, width in zip(codes, widths))
+    bits += "0" * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+
+def test_lzw_known_answer():
+    # A 8x3 RGB strip written by libtiff (through Qt's TIFF plugin)
+    raw = bytes.fromhex("80028281e8141207058440c0202018100a0684c1a251185c361f118c41e150c8701a02")
+    row = bytes([10, 20, 30]) * 6 + bytes([1, 2, 3, 4, 5, 6])
+    assert lzw_decode(raw) == row * 3
+
+
+@pytest.mark.parametrize("size, alphabet", [(100, 4), (20000, 3), (60000, 256)])
+def test_lzw_round_trip_across_code_widths(size, alphabet):
+    rng = random.Random(size)
+    data = bytes(rng.randrange(alphabet) for _ in range(size))
+    assert lzw_decode(lzw_encode(data)) == data
+
+
+def test_lzw_rejects_corrupt_codes():
+    # Clear, then code 300 before any table entry exists
+    with pytest.raises(ValueError):
+        lzw_decode(int("100000000" "100101100" "100000001" "00000", 2).to_bytes(4, "big"))